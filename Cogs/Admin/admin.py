@@ -0,0 +1,240 @@
+import discord
+from discord.ext import commands
+from discord.commands import slash_command, Option
+import logging
+import os
+import sys
+import time
+
+from utils.scheduler import get_scheduler
+from utils.sharding import shard_id_for, shard_status
+from utils.loopmon import get_loop_monitor
+from utils.tracing import INTERACTION_DEADLINE, get_command_tracer
+
+log = logging.getLogger(__name__)
+
+# HOT_RELOAD=1 watches loaded extension files and reloads them when they change
+HOT_RELOAD = os.getenv('HOT_RELOAD', '').lower() in ('1', 'true', 'yes')
+WATCH_INTERVAL_SECONDS = 2
+
+def extension_path(name):
+    """Source file of a loaded extension"""
+    module = sys.modules.get(name)
+    return getattr(module, '__file__', None)
+
+def extension_mtime(name):
+    path = extension_path(name)
+    try:
+        return os.stat(path).st_mtime if path else None
+    except OSError:
+        return None
+
+async def autocomplete_extensions(ctx: discord.AutocompleteContext):
+    """Loaded extensions matching what the user typed"""
+    return [name for name in sorted(ctx.bot.extensions) if ctx.value.lower() in name.lower()][:25]
+
+class Admin(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.scheduler = get_scheduler(bot)
+        self.extension_mtimes = {name: extension_mtime(name) for name in bot.extensions}
+        if HOT_RELOAD and bot.is_ready():
+            self.start_watching()  # Reloaded while running; otherwise on_ready starts it
+
+    def start_watching(self):
+        self.scheduler.schedule(('extension_watch',), WATCH_INTERVAL_SECONDS, watch_extensions, self.bot)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if HOT_RELOAD and not self.scheduler.is_scheduled(('extension_watch',)):
+            self.extension_mtimes = {name: extension_mtime(name) for name in self.bot.extensions}
+            self.start_watching()
+            log.info(f"👀 Watching {len(self.extension_mtimes)} extensions for changes")
+
+    async def ensure_admin(self, ctx):
+        """Respond with an error and return False if the author is not an administrator"""
+        if not ctx.author.guild_permissions.administrator:
+            await ctx.respond("❌ You need administrator permission to use this command!", ephemeral=True)
+            return False
+        return True
+
+    @slash_command(description="⏰ Show pending scheduled jobs (admin only)")
+    async def scheduler_status(self, ctx):
+        """Show how many deferred jobs are waiting in the bot-wide scheduler"""
+        if not await self.ensure_admin(ctx):
+            return
+
+        stats = get_scheduler(self.bot).stats()
+        next_due = stats['next_due_in']
+
+        embed = discord.Embed(
+            title="⏰ Scheduler Status",
+            description=f"**{stats['pending']}** pending jobs • **{stats['fired']}** fired since startup",
+            color=0x3498DB
+        )
+        by_kind = "\n".join(f"`{kind}`: {count}" for kind, count in sorted(stats['by_kind'].items()))
+        embed.add_field(name="📋 Pending by kind", value=by_kind or "Nothing scheduled", inline=False)
+        embed.add_field(name="⏭️ Next job", value=f"in {next_due:.0f}s" if next_due is not None else "—", inline=True)
+        embed.add_field(name="⚙️ Running", value=str(stats['running']), inline=True)
+        embed.add_field(name="🗃️ Heap size", value=str(stats['heap_size']), inline=True)
+
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @slash_command(description="🧩 Show shard latency and load (admin only)")
+    async def shards(self, ctx):
+        """Show latency, guilds and voice sessions for the shards in this process"""
+        if not await self.ensure_admin(ctx):
+            return
+
+        status = shard_status(self.bot)
+        current = ctx.guild.shard_id if ctx.guild.shard_id is not None else shard_id_for(ctx.guild.id, status['shard_count'])
+
+        embed = discord.Embed(
+            title="🧩 Shard Status",
+            description=f"This server is on shard **{current}** of **{status['shard_count']}** • process `{status['pid']}`",
+            color=0x3498DB
+        )
+        lines = []
+        for shard in status['shards'][:25]:
+            latency = f"{shard['latency_ms']:.0f}ms" if shard['latency_ms'] is not None else "—"
+            marker = "📍 " if shard['shard_id'] == current else ""
+            lines.append(f"{marker}`#{shard['shard_id']}` {latency} • {shard['guilds']} servers • {shard['voice_sessions']} voice")
+        if len(status['shards']) > 25:
+            lines.append(f"... and {len(status['shards']) - 25} more")
+        embed.add_field(name="📡 Shards in this process", value="\n".join(lines) or "—", inline=False)
+        embed.set_footer(text="Other shard processes are listed in the launcher's shard report")
+
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @slash_command(description="🐢 Show event loop lag and the calls that blocked it (admin only)")
+    async def loop_lag(self, ctx, reset: Option(bool, "Clear the report after showing it", required=False, default=False)):
+        """Rolling report of event loop lag and blocking call sites"""
+        if not await self.ensure_admin(ctx):
+            return
+
+        monitor = get_loop_monitor(self.bot)
+        report = monitor.snapshot()
+        lag = report['lag']
+
+        embed = discord.Embed(
+            title="🐢 Event Loop Lag",
+            description=(f"p50 **{lag['p50'] * 1000:.0f}ms** • p95 **{lag['p95'] * 1000:.0f}ms** • "
+                         f"max **{lag['max'] * 1000:.0f}ms** over {lag['count']} ticks\n"
+                         f"**{report['stalls']}** stalls over {report['threshold'] * 1000:.0f}ms"),
+            color=0xE67E22 if report['stalls'] else 0x00FF00
+        )
+        sites = [f"`{site['call_site']}`\n{site['count']}× • total {site['total']:.2f}s • max {site['max'] * 1000:.0f}ms"
+                 + (f" • `{site['task']}`" if site['task'] else "")
+                 for site in report['top_call_sites'][:5]]
+        embed.add_field(name="🔥 Top blocking call sites", value="\n".join(sites)[:1024] or "None recorded", inline=False)
+
+        recent = report['recent'][-1:]
+        if recent:
+            event = recent[0]
+            stack = "\n".join(event['stack'][-6:])
+            embed.add_field(name=f"🧵 Last stall ({event['duration'] * 1000:.0f}ms)",
+                            value=f"```\n{stack[-990:]}\n```", inline=False)
+        if report['running_since'] is None:
+            embed.set_footer(text="Monitor not running (LOOP_LAG_MONITOR=0)")
+
+        if reset:
+            monitor.reset()
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @slash_command(description="⏱️ Show per-command response latency (admin only)")
+    async def command_latency(self, ctx, reset: Option(bool, "Clear the report after showing it", required=False, default=False)):
+        """Time-to-first-response and completion per slash command against the 3s deadline"""
+        if not await self.ensure_admin(ctx):
+            return
+
+        tracer = get_command_tracer(self.bot)
+        report = tracer.snapshot()
+        if not report:
+            await ctx.respond("📭 No commands have been traced yet.", ephemeral=True)
+            return
+
+        ordered = sorted(report.items(), key=lambda item: item[1]['first_response']['p95'], reverse=True)
+        lines = []
+        for name, stats in ordered[:15]:
+            first = stats['first_response']
+            warn = "⚠️ " if first['p95'] >= INTERACTION_DEADLINE * 0.66 or stats['deadline_misses'] else ""
+            lines.append(
+                f"{warn}**/{name}** ×{stats['invocations']}\n"
+                f"first reply p50 {first['p50'] * 1000:.0f}ms • p95 {first['p95'] * 1000:.0f}ms • "
+                f"done p95 {stats['completion']['p95']:.1f}s\n"
+                f"defers {stats['deferred']} + {stats['auto_deferred']} auto • "
+                f"misses {stats['deadline_misses']} • failures {stats['failures']}"
+            )
+
+        embed = discord.Embed(
+            title="⏱️ Command Latency",
+            description="\n".join(lines)[:4000],
+            color=0x3498DB
+        )
+        total = sum(stats['invocations'] for stats in report.values())
+        auto = sum(stats['auto_deferred'] for stats in report.values())
+        embed.set_footer(text=f"{total} invocations • {auto} auto-deferred • sorted by p95 time to first reply")
+
+        if reset:
+            tracer.reset()
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    async def reload(self, name):
+        """Reload one extension in place and resync slash commands; returns milliseconds taken"""
+        started = time.perf_counter()
+        self.bot.reload_extension(name)
+        await self.bot.sync_commands()
+        elapsed = (time.perf_counter() - started) * 1000
+        log.info(f"♻️ Reloaded {name} in {elapsed:.0f}ms")
+        return elapsed
+
+    @slash_command(name="reload", description="♻️ Reload a bot extension without restarting (admin only)")
+    async def reload_extension(self, ctx, extension: Option(str, "Extension to reload", autocomplete=autocomplete_extensions)):
+        """Reload a single extension; voice sessions and music queues stay up"""
+        if not await self.ensure_admin(ctx):
+            return
+        if extension not in self.bot.extensions:
+            await ctx.respond(f"❌ `{extension}` is not a loaded extension!", ephemeral=True)
+            return
+
+        await ctx.defer(ephemeral=True)
+        try:
+            # The reload replaces this cog too when reloading Cogs.Admin.admin,
+            # so everything after it only uses locals
+            elapsed = await self.reload(extension)
+        except Exception as e:
+            await ctx.respond(f"❌ Reload of `{extension}` failed, the previous version is still running: `{e}`", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="♻️ Extension Reloaded",
+            description=f"`{extension}` reloaded in **{elapsed:.0f}ms**",
+            color=0x00FF00
+        )
+        await ctx.respond(embed=embed, ephemeral=True)
+
+async def watch_extensions(bot):
+    """Reload extensions whose source file changed, then check again (HOT_RELOAD)"""
+    admin = bot.get_cog('Admin')
+    try:
+        if admin:
+            for name in sorted(bot.extensions):
+                mtime = extension_mtime(name)
+                previous = admin.extension_mtimes.get(name)
+                admin.extension_mtimes[name] = mtime
+                if previous is None or mtime is None or mtime == previous:
+                    continue
+                try:
+                    await admin.reload(name)
+                except Exception as e:
+                    log.error(f"❌ Hot reload of {name} failed, keeping the previous version: {e}")
+                # Reloading the Admin cog replaces it; the new one tracks mtimes from here
+                admin = bot.get_cog('Admin') or admin
+    finally:
+        # Look the watcher up again so a reloaded Admin module's version takes over
+        watcher = getattr(sys.modules.get(__name__), 'watch_extensions', watch_extensions)
+        get_scheduler(bot).schedule(('extension_watch',), WATCH_INTERVAL_SECONDS, watcher, bot)
+
+def setup(bot):
+    bot.add_cog(Admin(bot))
+    log.info("✅ Admin cog loaded successfully")
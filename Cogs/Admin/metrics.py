@@ -0,0 +1,46 @@
+from discord.ext import commands
+import logging
+import os
+
+from utils.metrics import REGISTRY, histogram_collector, start_metrics_server
+from utils.loopmon import get_loop_monitor
+from utils.sharding import shard_latencies, guilds_by_shard
+
+log = logging.getLogger(__name__)
+
+# METRICS_PORT enables the /metrics endpoint (Prometheus text format)
+METRICS_PORT = os.getenv('METRICS_PORT')
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+
+class Metrics(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.register_metrics()
+
+    def register_metrics(self):
+        """Bot-wide gauges, all computed when /metrics is scraped"""
+        bot = self.bot
+        REGISTRY.gauge('bot_gateway_latency_seconds', 'Gateway heartbeat latency per shard', ('shard',),
+                       function=lambda: {(str(shard_id),): latency for shard_id, latency in shard_latencies(bot)
+                                         if latency == latency and latency != float('inf')})
+        REGISTRY.gauge('bot_guilds', 'Guilds served per shard', ('shard',),
+                       function=lambda: {(str(shard_id),): len(guilds) for shard_id, guilds in guilds_by_shard(bot).items()})
+        REGISTRY.gauge('bot_voice_sessions', 'Connected voice clients',
+                       function=lambda: len(bot.voice_clients))
+        REGISTRY.gauge('bot_cached_members', 'Members held in the member cache',
+                       function=lambda: sum(len(guild.members) for guild in bot.guilds))
+        REGISTRY.register_collector('bot_loop_lag_seconds', histogram_collector(
+            'bot_loop_lag_seconds', 'Event loop scheduling lag', lambda: get_loop_monitor(bot).lag))
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if METRICS_PORT and getattr(self.bot, 'metrics_runner', None) is None:
+            try:
+                self.bot.metrics_runner = await start_metrics_server(METRICS_HOST, int(METRICS_PORT))
+                log.info(f"📈 Metrics available at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+            except Exception as e:
+                log.error(f"❌ Could not start metrics server: {e}")
+
+def setup(bot):
+    bot.add_cog(Metrics(bot))
+    log.info("✅ Metrics cog loaded successfully")
@@ -3,9 +3,19 @@ import discord
 from discord.ext import commands
 from discord.commands import slash_command, Option
 import asyncio
-from googlesearch import search
-import requests
-from bs4 import BeautifulSoup
+import logging
+from utils.lazy import lazy_import
+from utils.metrics import REGISTRY
+
+log = logging.getLogger(__name__)
+
+# Imported on first search (or by the warm-up after on_ready) to keep startup fast
+googlesearch = lazy_import('googlesearch')
+requests = lazy_import('requests')
+bs4 = lazy_import('bs4')
+
+SEARCH_FETCHES = REGISTRY.counter('search_fetches_total', 'Result pages fetched by /search', ('result',))
+SEARCH_FETCH_SECONDS = REGISTRY.histogram('search_fetch_seconds', 'Time to fetch one /search result page')
 
 class Search(commands.Cog):
     def __init__(self, bot):
@@ -26,10 +36,12 @@ class Search(commands.Cog):
         try:
             # Perform Google search
             search_results = []
-            for url in search(query, num_results=5):
+            for url in googlesearch.search(query, num_results=5):
                 try:
-                    response = requests.get(url, timeout=3)
-                    soup = BeautifulSoup(response.content, 'html.parser')
+                    with SEARCH_FETCH_SECONDS.time():
+                        response = requests.get(url, timeout=3)
+                    SEARCH_FETCHES.inc('ok')
+                    soup = bs4.BeautifulSoup(response.content, 'html.parser')
                     title = soup.find('title')
                     description = soup.find('meta', attrs={'name': 'description'})
                     
@@ -49,6 +61,7 @@ class Search(commands.Cog):
                         'url': url
                     })
                 except:
+                    SEARCH_FETCHES.inc('failed')
                     search_results.append({
                         'title': url.split('/')[-1][:50],
                         'description': "Could not fetch description",
@@ -84,4 +97,4 @@ class Search(commands.Cog):
 
 def setup(bot):
     bot.add_cog(Search(bot))
-    print("Google Search cog loaded")
+    log.info("Google Search cog loaded")
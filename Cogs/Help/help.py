@@ -1,7 +1,10 @@
 import discord
+import logging
 from discord.ext import commands
 from discord.commands import slash_command
 
+log = logging.getLogger(__name__)
+
 class Help(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -21,11 +24,13 @@ class Help(commands.Cog):
             name="🎵 **Musik**",
             value=(
                 "`/play <lagu>` - Putar musik dari YouTube\n"
+                "`/play local:<lagu>` - Putar dari library musik lokal\n"
                 "`/search <query>` - Cari musik dan pilih\n"
                 "`/queue` - Lihat antrian musik\n"
                 "`/skip` - Lewati lagu\n"
                 "`/stop` - Hentikan musik\n"
                 "`/volume <1-100>` - Atur volume\n"
+                "`/seek <detik>` - Lompat ke posisi lagu\n"
                 "`/pause` - Jeda musik\n"
                 "`/resume` - Lanjutkan musik"
             ),
@@ -37,11 +42,15 @@ class Help(commands.Cog):
             name="🛡️ **Moderasi**",
             value=(
                 "`/ban <user>` - Ban anggota\n"
+                "`/tempban <user> <durasi>` - Ban sementara\n"
+                "`/massban` `/masskick` `/masstimeout` - Aksi massal\n"
                 "`/kick <user>` - Kick anggota\n"
                 "`/warn <user>` - Beri peringatan\n"
                 "`/timeout <user>` - Timeout anggota\n"
                 "`/clear <jumlah>` - Hapus pesan\n"
                 "`/warnings <user>` - Lihat peringatan\n"
+                "`/automod_setup` - Proteksi spam & raid\n"
+                "`/filter_add <kata>` - Filter kata terlarang\n"
                 "`/setjoin` - Set channel welcome"
             ),
             inline=False
@@ -75,4 +84,4 @@ class Help(commands.Cog):
 
 def setup(bot):
     bot.add_cog(Help(bot))
-    print("✅ Help cog loaded successfully")
\ No newline at end of file
+    log.info("✅ Help cog loaded successfully")
\ No newline at end of file
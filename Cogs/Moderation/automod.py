@@ -0,0 +1,454 @@
+import discord
+from discord.ext import commands
+from discord.commands import slash_command, Option
+import collections
+import datetime
+import json
+import logging
+import os
+import time
+
+from utils.metrics import MODERATION_WRITE_SECONDS, MODERATION_WRITES, REGISTRY
+from utils.scheduler import get_scheduler
+from utils.windows import RecentValues, SlidingWindowCounter
+from utils.wordfilter import WordFilter, normalize_term
+
+log = logging.getLogger(__name__)
+
+AUTOMOD_TRIGGERS = REGISTRY.counter('automod_triggers_total', 'Automod detections', ('detector', 'action'))
+AUTOMOD_ACTION_ERRORS = REGISTRY.counter('automod_action_errors_total', 'Automod actions that failed', ('action',))
+# Scans take microseconds, so the buckets start well below the defaults
+SCAN_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+FILTER_SCAN_SECONDS = REGISTRY.histogram('automod_filter_scan_seconds', 'Word filter scan time per message', ('guild',),
+                                         buckets=SCAN_BUCKETS)
+FILTER_MATCHES = REGISTRY.counter('automod_filter_matches_total', 'Messages removed by the word filter', ('guild',))
+
+SETTINGS_FILE = "Cogs/Moderation/data/automod_settings.json"
+# Per guild, only this many recently active members are tracked; the least
+# recently active one is forgotten first
+MAX_TRACKED_USERS = int(os.getenv('AUTOMOD_MAX_TRACKED_USERS', '5000'))
+# Largest `count` a duplicate rule can use; sets the per-user ring size
+MAX_DUPLICATES = 10
+MAX_FILTER_TERMS = 1000
+MAX_FILTER_TERM_LENGTH = 100
+# A lockdown that could not be lifted is tried again this much later
+LOCKDOWN_RETRY_SECONDS = 300
+
+DETECTORS = ('message_rate', 'duplicates', 'mentions', 'join_rate')
+ACTIONS = ('timeout', 'lockdown', 'alert')
+DEFAULT_RULES = {
+    'message_rate': {'count': 8, 'seconds': 5, 'action': 'timeout'},
+    'duplicates': {'count': 4, 'seconds': 30, 'action': 'timeout'},
+    'mentions': {'count': 10, 'seconds': 15, 'action': 'timeout'},
+    'join_rate': {'count': 10, 'seconds': 10, 'action': 'alert'},
+}
+GUILD_DEFAULTS = {
+    'enabled': False,
+    'alert_channel': None,
+    'timeout_minutes': 10,
+    'lockdown_minutes': 15,
+}
+
+class UserWindows:
+    """Sliding-window state for one member"""
+    __slots__ = ('messages', 'mentions', 'contents')
+
+    def __init__(self, rules):
+        self.messages = SlidingWindowCounter(rules['message_rate']['seconds'])
+        self.mentions = SlidingWindowCounter(rules['mentions']['seconds'])
+        self.contents = RecentValues(MAX_DUPLICATES)
+
+class GuildWindows:
+    """Sliding-window state for one guild, bounded by MAX_TRACKED_USERS"""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.rules = settings['rules']
+        self.users = collections.OrderedDict()  # user_id -> UserWindows, least recently active first
+        self.joins = SlidingWindowCounter(self.rules['join_rate']['seconds'])
+        self.cooldowns = {}  # detector -> monotonic time guild-wide actions may fire again
+
+    def user(self, user_id):
+        windows = self.users.get(user_id)
+        if windows is None:
+            if len(self.users) >= MAX_TRACKED_USERS:
+                self.users.popitem(last=False)
+            windows = self.users[user_id] = UserWindows(self.rules)
+        else:
+            self.users.move_to_end(user_id)
+        return windows
+
+class AutoMod(commands.Cog):
+    """Spam and raid detection on sliding-window counters, plus a per-guild word filter"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.scheduler = get_scheduler(bot)
+        self.settings = self.load_settings()
+        self.guilds = {}  # guild_id -> GuildWindows for guilds with automod enabled
+        for guild_id, settings in self.settings['guilds'].items():
+            if settings.get('enabled'):
+                self.guilds[int(guild_id)] = GuildWindows(settings)
+        # guild_id -> WordFilter, compiled here and on every edit, never per message
+        self.filters = {int(guild_id): WordFilter(settings['filter_terms'])
+                        for guild_id, settings in self.settings['guilds'].items() if settings.get('filter_terms')}
+        REGISTRY.gauge('automod_tracked_users', 'Members with automod windows in memory',
+                       function=lambda: sum(len(windows.users) for windows in self.guilds.values()))
+        self.lockdowns_loaded = False
+        if bot.is_ready():
+            self.load_lockdowns()  # Reloaded while running; otherwise on_ready loads them
+
+    def cog_unload(self):
+        self.scheduler.cancel_prefix('automod_lockdown')
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if not self.lockdowns_loaded:
+            self.load_lockdowns()
+
+    def load_lockdowns(self):
+        """Schedule the end of every stored lockdown for this process's guilds"""
+        self.lockdowns_loaded = True
+        for guild_id, settings in self.settings['guilds'].items():
+            lockdown = settings.get('lockdown')
+            if lockdown is None or self.bot.get_guild(int(guild_id)) is None:
+                continue  # Served by another shard process (or the bot was removed)
+            self.scheduler.schedule(('automod_lockdown', int(guild_id)), lockdown['until'] - time.time(),
+                                    self.end_lockdown, int(guild_id))
+
+    def load_settings(self):
+        """Load settings from file"""
+        try:
+            with open(SETTINGS_FILE, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'version': 1, 'guilds': {}}
+        except ValueError as e:
+            log.warning(f"⚠️ Could not read {SETTINGS_FILE}: {e}")
+            return {'version': 1, 'guilds': {}}
+
+    def save_settings(self):
+        """Save settings to file"""
+        os.makedirs(os.path.dirname(SETTINGS_FILE), exist_ok=True)
+        with MODERATION_WRITE_SECONDS.time('automod_settings'), open(SETTINGS_FILE, 'w') as f:
+            json.dump(self.settings, f, indent=2)
+        MODERATION_WRITES.inc('automod_settings')
+
+    def guild_settings(self, guild_id):
+        """This guild's stored settings, created with defaults if missing"""
+        settings = self.settings['guilds'].setdefault(str(guild_id), dict(GUILD_DEFAULTS))
+        rules = settings.setdefault('rules', {})
+        for detector, rule in DEFAULT_RULES.items():
+            rules.setdefault(detector, dict(rule))
+        return settings
+
+    def apply_settings(self, guild_id):
+        """Save and rebuild the guild's windows (thresholds may have changed)"""
+        self.save_settings()
+        settings = self.guild_settings(guild_id)
+        self.guilds.pop(guild_id, None)
+        if settings['enabled']:
+            self.guilds[guild_id] = GuildWindows(settings)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.guild is None or message.author.bot or not isinstance(message.author, discord.Member):
+            return
+        word_filter = self.filters.get(message.guild.id)
+        windows = self.guilds.get(message.guild.id)
+        if word_filter is None and windows is None:
+            return
+        if message.author.guild_permissions.manage_messages:
+            return  # Moderators are exempt
+
+        if word_filter is not None and message.content:
+            started = time.perf_counter()
+            term = word_filter.find(message.content)
+            FILTER_SCAN_SECONDS.observe(time.perf_counter() - started, str(message.guild.id))
+            if term is not None:
+                await self.filtered(message, term)
+                return
+        if windows is None:
+            return
+
+        now = time.monotonic()
+        rules = windows.rules
+        user = windows.user(message.author.id)
+
+        detector = None
+        if user.messages.add(now) >= rules['message_rate']['count']:
+            detector = 'message_rate'
+        elif message.mentions and user.mentions.add(now, len(message.mentions)) >= rules['mentions']['count']:
+            detector = 'mentions'
+        elif message.content:
+            content = hash(message.content.strip().lower())
+            if user.contents.add(now, content, rules['duplicates']['seconds']) >= rules['duplicates']['count']:
+                detector = 'duplicates'
+
+        if detector is not None:
+            del windows.users[message.author.id]  # Start the member over after acting
+            await self.act(windows, detector, message.guild, message.author, message.channel)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        windows = self.guilds.get(member.guild.id)
+        if windows is None:
+            return
+        now = time.monotonic()
+        if windows.joins.add(now) >= windows.rules['join_rate']['count'] and windows.cooldowns.get('join_rate', 0) <= now:
+            # One action per burst: wait out a full window before firing again
+            windows.cooldowns['join_rate'] = now + windows.rules['join_rate']['seconds']
+            await self.act(windows, 'join_rate', member.guild, member)
+
+    async def filtered(self, message, term):
+        """Remove a message with a banned term and warn its author"""
+        FILTER_MATCHES.inc(str(message.guild.id))
+        try:
+            await message.delete()
+        except discord.HTTPException as e:
+            log.warning(f"Could not delete filtered message: {e}", extra={'guild': message.guild.id})
+
+        moderation = self.bot.get_cog('Moderation')
+        if moderation is None:
+            return
+        embed = moderation.warn_member(message.author, message.guild.me, f"Automod: banned word ||{term}||")
+        try:
+            await message.channel.send(embed=embed)
+        except discord.HTTPException as e:
+            log.warning(f"Could not announce automod warning: {e}", extra={'guild': message.guild.id})
+
+    async def act(self, windows, detector, guild, member, channel=None):
+        """Run the configured action for a detector and report it"""
+        rule = windows.rules[detector]
+        action = rule['action']
+        AUTOMOD_TRIGGERS.inc(detector, action)
+        log.info(f"🛡️ Automod {detector} triggered for {member} ({action})", extra={'guild': guild.id})
+
+        result = None
+        try:
+            if action == 'timeout':
+                minutes = windows.settings['timeout_minutes']
+                until = discord.utils.utcnow() + datetime.timedelta(minutes=minutes)
+                await member.timeout(until, reason=f"Automod: {detector}")
+                result = f"Timed out {member.mention} for {minutes} minutes"
+            elif action == 'lockdown':
+                result = await self.lockdown(windows, guild)
+        except discord.HTTPException as e:
+            AUTOMOD_ACTION_ERRORS.inc(action)
+            result = f"❌ Failed to {action}: {e}"
+            log.warning(f"Automod {action} failed: {e}", extra={'guild': guild.id})
+
+        await self.alert(windows, guild, detector, member, channel, rule, result)
+
+    async def lockdown(self, windows, guild):
+        """Raise the verification level to the highest, restored after lockdown_minutes.
+
+        The level to restore and the end time are saved before the level is
+        raised, so a restart or reload mid-lockdown still ends it.
+        """
+        settings = windows.settings
+        minutes = settings['lockdown_minutes']
+        until = time.time() + minutes * 60
+        if settings.get('lockdown') is None:
+            settings['lockdown'] = {'restore': guild.verification_level.value, 'until': until}
+            self.save_settings()
+            try:
+                await guild.edit(verification_level=discord.VerificationLevel.highest, reason="Automod lockdown")
+            except discord.HTTPException:
+                del settings['lockdown']
+                self.save_settings()
+                raise
+        else:
+            settings['lockdown']['until'] = until
+            self.save_settings()
+        self.scheduler.schedule(('automod_lockdown', guild.id), minutes * 60, self.end_lockdown, guild.id)
+        return f"Verification level raised to highest for {minutes} minutes (`/automod_unlock` to end early)"
+
+    async def end_lockdown(self, guild_id):
+        settings = self.settings['guilds'].get(str(guild_id), {})
+        lockdown = settings.get('lockdown')
+        guild = self.bot.get_guild(guild_id)
+        if lockdown is None or guild is None:
+            return False
+        self.scheduler.cancel(('automod_lockdown', guild_id))
+        try:
+            await guild.edit(verification_level=discord.VerificationLevel(lockdown['restore']),
+                             reason="Automod lockdown ended")
+        except discord.HTTPException as e:
+            AUTOMOD_ACTION_ERRORS.inc('unlock')
+            log.warning(f"Could not end automod lockdown, retrying in {LOCKDOWN_RETRY_SECONDS}s: {e}",
+                        extra={'guild': guild_id})
+            self.scheduler.schedule(('automod_lockdown', guild_id), LOCKDOWN_RETRY_SECONDS, self.end_lockdown, guild_id)
+            return False
+        del settings['lockdown']
+        self.save_settings()
+        return True
+
+    async def alert(self, windows, guild, detector, member, channel, rule, result):
+        alert_channel = self.bot.get_channel(windows.settings['alert_channel'] or 0)
+        if alert_channel is None:
+            return
+        embed = discord.Embed(
+            title="🚨 AutoMod",
+            description=f"**{detector.replace('_', ' ').title()}**: {rule['count']} in {rule['seconds']}s",
+            color=0xFF0000
+        )
+        embed.add_field(name="👤 Member", value=member.mention, inline=True)
+        if channel is not None:
+            embed.add_field(name="📝 Channel", value=channel.mention, inline=True)
+        embed.add_field(name="⚙️ Action", value=result or "Alert only", inline=False)
+        embed.set_footer(text=f"User ID: {member.id}")
+        try:
+            await alert_channel.send(embed=embed)
+        except discord.HTTPException as e:
+            log.warning(f"Could not send automod alert: {e}", extra={'guild': guild.id})
+
+    @slash_command(description="🛡️ Set up automatic spam and raid protection")
+    async def automod_setup(self, ctx, enabled: Option(bool, "Turn automod on or off"),
+                            alert_channel: Option(discord.TextChannel, "Where to report detections", required=False, default=None),
+                            timeout_minutes: Option(int, "Timeout length for spammers", min_value=1, max_value=40320, required=False, default=None),
+                            lockdown_minutes: Option(int, "How long a raid lockdown lasts", min_value=1, max_value=1440, required=False, default=None)):
+        if not ctx.author.guild_permissions.manage_guild:
+            await ctx.respond("❌ You don't have permission to manage server settings!", ephemeral=True)
+            return
+
+        settings = self.guild_settings(ctx.guild.id)
+        settings['enabled'] = enabled
+        if alert_channel is not None:
+            settings['alert_channel'] = alert_channel.id
+        if timeout_minutes is not None:
+            settings['timeout_minutes'] = timeout_minutes
+        if lockdown_minutes is not None:
+            settings['lockdown_minutes'] = lockdown_minutes
+        self.apply_settings(ctx.guild.id)
+
+        await ctx.respond(embed=self.status_embed(ctx.guild, "🛡️ AutoMod Setup Complete"))
+
+    @slash_command(description="🛡️ Change an automod detection threshold")
+    async def automod_threshold(self, ctx, detector: Option(str, "What to detect", choices=list(DETECTORS)),
+                                count: Option(int, "How many within the window triggers it", min_value=2, max_value=1000),
+                                seconds: Option(int, "Window length in seconds", min_value=1, max_value=3600),
+                                action: Option(str, "What to do when it triggers", choices=list(ACTIONS))):
+        if not ctx.author.guild_permissions.manage_guild:
+            await ctx.respond("❌ You don't have permission to manage server settings!", ephemeral=True)
+            return
+        if detector == 'duplicates' and count > MAX_DUPLICATES:
+            await ctx.respond(f"❌ The duplicate threshold can be at most {MAX_DUPLICATES}!", ephemeral=True)
+            return
+        if detector == 'join_rate' and action == 'timeout':
+            await ctx.respond("❌ Join raids can only trigger a lockdown or an alert!", ephemeral=True)
+            return
+
+        settings = self.guild_settings(ctx.guild.id)
+        settings['rules'][detector] = {'count': count, 'seconds': seconds, 'action': action}
+        self.apply_settings(ctx.guild.id)
+
+        await ctx.respond(embed=self.status_embed(ctx.guild, "🛡️ AutoMod Threshold Updated"))
+
+    @slash_command(description="🛡️ Show automod settings")
+    async def automod_status(self, ctx):
+        await ctx.respond(embed=self.status_embed(ctx.guild, "🛡️ AutoMod Settings"), ephemeral=True)
+
+    @slash_command(description="🔓 End an automod raid lockdown")
+    async def automod_unlock(self, ctx):
+        if not ctx.author.guild_permissions.manage_guild:
+            await ctx.respond("❌ You don't have permission to manage server settings!", ephemeral=True)
+            return
+        if await self.end_lockdown(ctx.guild.id):
+            await ctx.respond("🔓 Lockdown ended, verification level restored.")
+        else:
+            await ctx.respond("❌ There is no automod lockdown to end.", ephemeral=True)
+
+    def update_filter(self, guild_id, terms):
+        """Store a guild's term list and recompile its filter"""
+        settings = self.guild_settings(guild_id)
+        settings['filter_terms'] = sorted(terms)
+        self.save_settings()
+        if terms:
+            self.filters[guild_id] = WordFilter(terms)
+        else:
+            self.filters.pop(guild_id, None)
+
+    @staticmethod
+    def parse_terms(text):
+        return {normalize_term(term) for term in text.split(',') if normalize_term(term)}
+
+    @slash_command(description="🚫 Add banned words (comma separated; * and ? as wildcards)")
+    async def filter_add(self, ctx, terms: Option(str, "Words or phrases, e.g. badword, spam*, n?b")):
+        if not ctx.author.guild_permissions.manage_guild:
+            await ctx.respond("❌ You don't have permission to manage server settings!", ephemeral=True)
+            return
+
+        new_terms = self.parse_terms(terms)
+        if any(len(term) > MAX_FILTER_TERM_LENGTH for term in new_terms):
+            await ctx.respond(f"❌ Terms can be at most {MAX_FILTER_TERM_LENGTH} characters!", ephemeral=True)
+            return
+        current = set(self.guild_settings(ctx.guild.id).get('filter_terms', []))
+        if len(current | new_terms) > MAX_FILTER_TERMS:
+            await ctx.respond(f"❌ A server can have at most {MAX_FILTER_TERMS} banned terms!", ephemeral=True)
+            return
+        self.update_filter(ctx.guild.id, current | new_terms)
+
+        embed = discord.Embed(
+            title="🚫 Word Filter Updated",
+            description=f"Added **{len(new_terms - current)}** term(s); **{len(current | new_terms)}** in total.",
+            color=0x00FF00
+        )
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @slash_command(description="🚫 Remove banned words (comma separated)")
+    async def filter_remove(self, ctx, terms: Option(str, "Words or phrases to remove")):
+        if not ctx.author.guild_permissions.manage_guild:
+            await ctx.respond("❌ You don't have permission to manage server settings!", ephemeral=True)
+            return
+
+        removed = self.parse_terms(terms)
+        current = set(self.guild_settings(ctx.guild.id).get('filter_terms', []))
+        self.update_filter(ctx.guild.id, current - removed)
+
+        embed = discord.Embed(
+            title="🚫 Word Filter Updated",
+            description=f"Removed **{len(current & removed)}** term(s); **{len(current - removed)}** left.",
+            color=0x00FF00
+        )
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @slash_command(description="🚫 Show the banned word list")
+    async def filter_list(self, ctx):
+        if not ctx.author.guild_permissions.manage_messages:
+            await ctx.respond("❌ You don't have permission to view the word filter!", ephemeral=True)
+            return
+
+        terms = self.guild_settings(ctx.guild.id).get('filter_terms', [])
+        listed = ', '.join(f"||{term}||" for term in terms)
+        if len(listed) > 4000:
+            listed = listed[:4000].rsplit(',', 1)[0] + ", …"
+        embed = discord.Embed(
+            title=f"🚫 Banned Words ({len(terms)})",
+            description=listed or "No banned words set.",
+            color=0xFF0000
+        )
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    def status_embed(self, guild, title):
+        settings = self.guild_settings(guild.id)
+        embed = discord.Embed(
+            title=title,
+            description="✅ Enabled" if settings['enabled'] else "⏸️ Disabled",
+            color=0x00FF00 if settings['enabled'] else 0x808080
+        )
+        for detector in DETECTORS:
+            rule = settings['rules'][detector]
+            embed.add_field(
+                name=detector.replace('_', ' ').title(),
+                value=f"{rule['count']} in {rule['seconds']}s → {rule['action']}",
+                inline=True
+            )
+        channel = guild.get_channel(settings['alert_channel'] or 0)
+        embed.add_field(name="📢 Alerts", value=channel.mention if channel else "Not set", inline=True)
+        embed.set_footer(text=f"Timeout: {settings['timeout_minutes']} min • Lockdown: {settings['lockdown_minutes']} min")
+        return embed
+
+def setup(bot):
+    bot.add_cog(AutoMod(bot))
+    log.info("✅ AutoMod cog loaded successfully")
@@ -2,91 +2,446 @@
 import discord
 from discord.ext import commands
 from discord.commands import slash_command, Option
+import asyncio
+import collections
 import json
+import logging
 import os
+import re
+
+from utils.metrics import MODERATION_WRITE_SECONDS, MODERATION_WRITES, REGISTRY
+from utils.scheduler import get_scheduler
+from utils.templates import TemplateError, compile_template, format_placeholders
+
+log = logging.getLogger(__name__)
+
+SETTINGS_RELOADS = REGISTRY.counter('memberjoin_settings_reloads_total', 'Join settings reloads', ('reason',))
+JOIN_DROPS = REGISTRY.counter('memberjoin_dropped_total', 'Join work dropped because its queue was full', ('queue',))
+WELCOMES = REGISTRY.counter('memberjoin_welcomes_total', 'Welcome messages sent to welcome channels', ('kind',))
+
+# How often to look for edits made to the settings file outside the bot
+SETTINGS_POLL_SECONDS = float(os.getenv('MEMBERJOIN_SETTINGS_POLL', '30'))
+
+# Joins are collected for JOIN_WINDOW seconds after the first one; more than
+# JOIN_BURST_THRESHOLD in one window get a single combined welcome
+JOIN_WINDOW_SECONDS = float(os.getenv('JOIN_WINDOW', '2'))
+JOIN_BURST_THRESHOLD = int(os.getenv('JOIN_BURST_THRESHOLD', '3'))
+JOIN_BUFFER_MAX = int(os.getenv('JOIN_BUFFER_MAX', '1000'))
+# Auto-roles and welcome DMs are sent one at a time per guild, this far apart
+MEMBER_ACTION_INTERVAL = float(os.getenv('MEMBER_ACTION_INTERVAL', '0.5'))
+MEMBER_ACTION_QUEUE_MAX = int(os.getenv('MEMBER_ACTION_QUEUE_MAX', '2000'))
+BURST_MENTIONS = 30  # Mentions listed in a combined welcome before "and N more"
+
+def write_file_atomic(path, text):
+    """Replace a file in one step, so the settings poll and other shard processes never read half of it"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def member_variables(mention):
+    """Placeholders available in join/leave messages, as getters on the member.
+
+    {member} is a mention on join; on leave it is the plain name, since the
+    member can no longer be mentioned in the server.
+    """
+    member = (lambda m: m.mention) if mention else (lambda m: m.name)
+    return {
+        'member': member,
+        'member.mention': lambda m: m.mention,
+        'member.name': lambda m: m.name,
+        'member.id': lambda m: m.id,
+        'guild': lambda m: m.guild.name,
+        'guild.name': lambda m: m.guild.name,
+        'member_count': lambda m: m.guild.member_count,
+        # Older names, kept working for messages set up before {member}/{guild}
+        'user': member,
+        'server': lambda m: m.guild.name,
+    }
+
+class DepartedMember:
+    """A user who left, with the guild they left, for the goodbye template"""
+    __slots__ = ('user', 'guild')
+
+    def __init__(self, user, guild):
+        self.user = user
+        self.guild = guild
+
+    def __getattr__(self, name):
+        return getattr(self.user, name)
+
+WELCOME_VARIABLES = member_variables(mention=True)
+GOODBYE_VARIABLES = member_variables(mention=False)
+PLACEHOLDER_HELP = format_placeholders(name for name in WELCOME_VARIABLES if name not in ('user', 'server'))
+
+# Version 2 stores {"version": 2, "guilds": {guild_id: {...}}} with int ids,
+# {member}/{guild} placeholders and every optional key filled in
+SETTINGS_VERSION = 2
+ID_KEYS = ('welcome_channel', 'goodbye_channel', 'auto_role')
+MESSAGE_KEYS = ('welcome_message', 'goodbye_message')
+GUILD_DEFAULTS = {
+    'welcome_enabled': True,
+    'welcome_channel_enabled': True,
+    'welcome_dm_enabled': False,
+    'welcome_gif': None,
+    'welcome_embed_color': None,
+    'goodbye_enabled': True,
+    'auto_nickname': False,
+}
+LEGACY_PLACEHOLDERS = re.compile(r'\{(user|server)\}')
+
+def optional_id(value):
+    return int(value) if value else None
+
+def parse_color(value, default):
+    """'#800080' (or an int) to an embed colour"""
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).lstrip('#'), 16)
+    except ValueError:
+        return default
+
+def migrate_v1(data):
+    """Unversioned files are the guild map itself"""
+    return {'version': 1, 'guilds': data}
+
+def migrate_v2(data):
+    guilds = {}
+    for guild_id, settings in data['guilds'].items():
+        settings = dict(GUILD_DEFAULTS, **settings)
+        for key in ID_KEYS:
+            settings[key] = optional_id(settings.get(key))
+        for key in MESSAGE_KEYS:
+            if settings.get(key):
+                settings[key] = LEGACY_PLACEHOLDERS.sub(
+                    lambda match: '{member}' if match.group(1) == 'user' else '{guild}', settings[key])
+        guilds[guild_id] = settings
+    return {'version': 2, 'guilds': guilds}
+
+MIGRATIONS = {0: migrate_v1, 1: migrate_v2}
+
+def migrate_settings(data):
+    """Bring settings up to SETTINGS_VERSION; returns (settings, whether anything changed)"""
+    version = data.get('version', 0)
+    start = version
+    while version < SETTINGS_VERSION:
+        data = MIGRATIONS[version](data)
+        version = data['version']
+    return data, version != start
+
+class JoinSettings:
+    """One guild's join/leave settings, with messages compiled for the event handlers"""
+    __slots__ = ('welcome_enabled', 'welcome_channel', 'welcome_dm', 'welcome_message', 'welcome_gif',
+                 'welcome_color', 'goodbye_enabled', 'goodbye_channel', 'goodbye_message', 'auto_role')
+
+    def __init__(self, data):
+        self.welcome_enabled = data.get('welcome_enabled', True)
+        self.welcome_channel = optional_id(data.get('welcome_channel')) if data.get('welcome_channel_enabled', True) else None
+        self.welcome_dm = data.get('welcome_dm_enabled', False)
+        self.welcome_gif = data.get('welcome_gif')
+        self.welcome_color = parse_color(data.get('welcome_embed_color'), 0x00FF00)
+        self.goodbye_enabled = data.get('goodbye_enabled', True)
+        self.goodbye_channel = optional_id(data.get('goodbye_channel'))
+        self.auto_role = optional_id(data.get('auto_role'))
+        # Stored messages are compiled leniently; unknown placeholders stay as text
+        self.welcome_message = compile_template(data['welcome_message'], WELCOME_VARIABLES, strict=False).render if data.get('welcome_message') else None
+        self.goodbye_message = compile_template(data['goodbye_message'], GOODBYE_VARIABLES, strict=False).render if data.get('goodbye_message') else None
+
+class JoinGroup:
+    """Stands in for a member when rendering one welcome for a whole burst"""
+
+    def __init__(self, members):
+        shown = members[:BURST_MENTIONS]
+        more = f" and {len(members) - len(shown)} more" if len(members) > len(shown) else ""
+        self.mention = ', '.join(member.mention for member in shown) + more
+        self.name = ', '.join(member.name for member in shown) + more
+        self.id = ''
+        self.guild = members[0].guild
+
+class JoinDispatcher:
+    """Coalesces join bursts per guild and paces the per-member API calls.
+
+    A raid or a big invite otherwise means one channel message, one role
+    update and one DM per member, all at once, which runs the guild into
+    429s and slows every other request the bot makes for it. Welcomes for a
+    window of joins go out as one message once the burst is large enough;
+    auto-roles and DMs go through one queue per guild, worked at
+    MEMBER_ACTION_INTERVAL.
+    """
+
+    def __init__(self, cog):
+        self.cog = cog
+        self.scheduler = cog.scheduler
+        self.joins = {}  # guild_id -> [member] waiting for the window to close
+        self.actions = {}  # guild_id -> deque of (action, member)
+        self.workers = {}  # guild_id -> worker task
+
+    def queue_depths(self):
+        return {
+            ('joins',): sum(len(members) for members in self.joins.values()),
+            ('member_actions',): sum(len(queue) for queue in self.actions.values()),
+        }
+
+    def member_joined(self, member):
+        guild_id = member.guild.id
+        members = self.joins.setdefault(guild_id, [])
+        if len(members) >= JOIN_BUFFER_MAX:
+            JOIN_DROPS.inc('joins')
+            return
+        members.append(member)
+        if len(members) == 1:
+            self.scheduler.schedule(('join_flush', guild_id), JOIN_WINDOW_SECONDS, self.flush, guild_id)
+
+    async def flush(self, guild_id):
+        """Welcome everyone who joined during the window and queue their member actions"""
+        members = self.joins.pop(guild_id, [])
+        guild_settings = self.cog.guild_settings.get(guild_id)
+        if not members or guild_settings is None:
+            return
+
+        if guild_settings.welcome_enabled and guild_settings.welcome_message:
+            if guild_settings.welcome_channel:
+                channel = self.cog.bot.get_channel(guild_settings.welcome_channel)
+                if channel:
+                    try:
+                        if len(members) > JOIN_BURST_THRESHOLD:
+                            await channel.send(embed=self.cog.welcome_embed(guild_settings, JoinGroup(members), len(members)))
+                            WELCOMES.inc('combined')
+                        else:
+                            for member in members:
+                                await channel.send(embed=self.cog.welcome_embed(guild_settings, member))
+                                WELCOMES.inc('single')
+                    except Exception as e:
+                        log.warning(f"Error sending welcome message: {e}", extra={'guild': guild_id})
+            if guild_settings.welcome_dm:
+                for member in members:
+                    self.enqueue(guild_id, 'dm', member)
+
+        if guild_settings.auto_role:
+            for member in members:
+                self.enqueue(guild_id, 'role', member)
+
+    def enqueue(self, guild_id, action, member):
+        queue = self.actions.setdefault(guild_id, collections.deque())
+        if len(queue) >= MEMBER_ACTION_QUEUE_MAX:
+            JOIN_DROPS.inc('member_actions')
+            return
+        queue.append((action, member))
+        worker = self.workers.get(guild_id)
+        if worker is None or worker.done():
+            self.workers[guild_id] = asyncio.create_task(self.work(guild_id))
+
+    async def work(self, guild_id):
+        """Drain one guild's member actions, spaced out to stay inside its rate limit"""
+        loop = asyncio.get_running_loop()
+        queue = self.actions[guild_id]
+        try:
+            while queue:
+                action, member = queue.popleft()
+                started = loop.time()
+                delay = MEMBER_ACTION_INTERVAL
+                try:
+                    await self.run_action(action, member)
+                except discord.HTTPException as e:
+                    if e.status == 429:
+                        delay = max(delay, float(e.response.headers.get('Retry-After', 5)))
+                    log.warning(f"Error running {action} for new member: {e}", extra={'guild': guild_id})
+                await asyncio.sleep(max(0.0, delay - (loop.time() - started)))
+        finally:
+            if self.workers.get(guild_id) is asyncio.current_task():
+                del self.workers[guild_id]
+                if not queue:
+                    self.actions.pop(guild_id, None)
+
+    async def run_action(self, action, member):
+        guild_settings = self.cog.guild_settings.get(member.guild.id)
+        if guild_settings is None:
+            return  # Settings removed
+        # The member cache can't say whether they are still here (joiners
+        # aren't cached by default); leaves drop their queued actions, and
+        # NotFound covers anyone who left while the request was in flight
+        try:
+            if action == 'role' and guild_settings.auto_role:
+                role = member.guild.get_role(guild_settings.auto_role)
+                if role:
+                    await member.add_roles(role, reason="Auto role on join")
+            elif action == 'dm':
+                await member.send(embed=self.cog.welcome_embed(guild_settings, member))
+        except discord.NotFound:
+            pass  # Already left
+        except discord.Forbidden:
+            if action != 'dm':
+                raise
+            # DMs closed
+
+    def member_left(self, guild_id, user_id):
+        """Forget a departed member's queued joins and actions"""
+        members = self.joins.get(guild_id)
+        if members:
+            members[:] = [member for member in members if member.id != user_id]
+        queue = self.actions.get(guild_id)
+        if queue:
+            remaining = [(action, member) for action, member in queue if member.id != user_id]
+            queue.clear()
+            queue.extend(remaining)
+
+    def close(self):
+        self.scheduler.cancel_prefix('join_flush')
+        for worker in self.workers.values():
+            worker.cancel()
+        self.joins.clear()
+        self.actions.clear()
 
 class MemberJoin(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.scheduler = get_scheduler(bot)
         self.settings_file = "Cogs/Moderation/data/memberjoin_settings.json"
         self.ensure_settings_file()
+        # Raw settings as stored, and the parsed form the event handlers read;
+        # both are only replaced wholesale, never edited in place
+        settings, self.settings_mtime = self.read_settings()
+        self.settings = settings if settings is not None else {'version': SETTINGS_VERSION, 'guilds': {}}
+        self.guild_settings = self.parse_settings(self.settings)
+        self.dispatcher = JoinDispatcher(self)
+        REGISTRY.gauge('memberjoin_queue_depth', 'Joins and member actions waiting to be handled', ('queue',),
+                       function=self.dispatcher.queue_depths)
+        if bot.is_ready():
+            self.start_polling()  # Reloaded while running; otherwise on_ready starts it
+
+    def cog_unload(self):
+        self.scheduler.cancel(('memberjoin_settings_poll',))
+        self.dispatcher.close()
     
     def ensure_settings_file(self):
         """Ensure settings file exists"""
         os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
         if not os.path.exists(self.settings_file):
-            with open(self.settings_file, 'w') as f:
-                json.dump({}, f)
+            write_file_atomic(self.settings_file, json.dumps({'version': SETTINGS_VERSION, 'guilds': {}}))
     
-    def load_settings(self):
-        """Load settings from file"""
+    def settings_file_mtime(self):
+        try:
+            return os.stat(self.settings_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def read_settings(self):
+        """Load (and if needed migrate) settings from file, with the mtime they were read at.
+
+        The settings are None if the file could not be read or parsed.
+        """
+        mtime = self.settings_file_mtime()
         try:
             with open(self.settings_file, 'r') as f:
-                return json.load(f)
-        except:
-            return {}
-    
+                raw = f.read()
+            settings, migrated = migrate_settings(json.loads(raw))
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            log.warning(f"⚠️ Could not read {self.settings_file}: {e}")
+            return None, mtime
+
+        if migrated:
+            write_file_atomic(f"{self.settings_file}.bak", raw)
+            write_file_atomic(self.settings_file, json.dumps(settings, indent=2))
+            mtime = self.settings_file_mtime()
+            log.info(f"📦 Migrated {self.settings_file} to version {SETTINGS_VERSION} (backup in {self.settings_file}.bak)")
+        return settings, mtime
+
+    @staticmethod
+    def parse_settings(settings):
+        parsed = {}
+        for guild_id, data in settings['guilds'].items():
+            try:
+                parsed[int(guild_id)] = JoinSettings(data)
+            except (TypeError, ValueError) as e:
+                log.warning(f"⚠️ Invalid join settings: {e}", extra={'guild': guild_id})
+        return parsed
+
     def save_settings(self, settings):
-        """Save settings to file"""
-        with open(self.settings_file, 'w') as f:
-            json.dump(settings, f, indent=2)
+        """Save settings to file and swap them into the cache"""
+        with MODERATION_WRITE_SECONDS.time('memberjoin_settings'):
+            write_file_atomic(self.settings_file, json.dumps(settings, indent=2))
+        MODERATION_WRITES.inc('memberjoin_settings')
+        self.settings, self.settings_mtime = settings, self.settings_file_mtime()
+        self.guild_settings = self.parse_settings(settings)
+        SETTINGS_RELOADS.inc('setup')
+
+    def edit_guild_settings(self, guild_id):
+        """A copy of the cached settings with this guild's entry ready to change"""
+        guilds = {key: dict(value) for key, value in self.settings['guilds'].items()}
+        settings = {'version': SETTINGS_VERSION, 'guilds': guilds}
+        return settings, guilds.setdefault(str(guild_id), dict(GUILD_DEFAULTS))
+
+    def start_polling(self):
+        self.scheduler.schedule(('memberjoin_settings_poll',), SETTINGS_POLL_SECONDS, self.poll_settings_file)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if not self.scheduler.is_scheduled(('memberjoin_settings_poll',)):
+            self.start_polling()
+
+    async def poll_settings_file(self):
+        """Reload the settings if the file was changed outside the bot"""
+        loop = asyncio.get_running_loop()
+        try:
+            mtime = await loop.run_in_executor(None, self.settings_file_mtime)
+            if mtime != self.settings_mtime:
+                settings, mtime = await loop.run_in_executor(None, self.read_settings)
+                if settings is None:
+                    # Half-written or badly edited; keep serving what was last read
+                    self.settings_mtime = mtime
+                    log.warning(f"⚠️ Keeping the previous join settings until {self.settings_file} is fixed")
+                    return
+                self.settings, self.settings_mtime = settings, mtime
+                self.guild_settings = self.parse_settings(settings)
+                SETTINGS_RELOADS.inc('file_changed')
+                log.info(f"🔄 Reloaded {self.settings_file} after an external change")
+        finally:
+            if self.bot.get_cog('MemberJoin') is self:
+                self.start_polling()
+
+    def welcome_embed(self, guild_settings, member, count=1):
+        """Welcome embed for one member, or for a JoinGroup of `count` members"""
+        embed = discord.Embed(
+            title="🎉 Welcome!" if count == 1 else f"🎉 Welcome, {count} new members!",
+            description=guild_settings.welcome_message(member),
+            color=guild_settings.welcome_color
+        )
+        if count == 1:
+            embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
+            embed.set_footer(text=f"Member #{member.guild.member_count}")
+        else:
+            embed.set_footer(text=f"Members #{member.guild.member_count - count + 1}–#{member.guild.member_count}")
+        if guild_settings.welcome_gif:
+            embed.set_image(url=guild_settings.welcome_gif)
+        return embed
 
     @commands.Cog.listener()
     async def on_member_join(self, member):
         """Handle member join events"""
-        settings = self.load_settings()
-        guild_id = str(member.guild.id)
-        
-        if guild_id not in settings:
-            return
-        
-        guild_settings = settings[guild_id]
-        
-        # Welcome message
-        if 'welcome_channel' in guild_settings and 'welcome_message' in guild_settings:
-            try:
-                channel = self.bot.get_channel(int(guild_settings['welcome_channel']))
-                if channel:
-                    message = guild_settings['welcome_message'].replace('{user}', member.mention).replace('{server}', member.guild.name)
-                    
-                    embed = discord.Embed(
-                        title="🎉 Welcome!",
-                        description=message,
-                        color=0x00FF00
-                    )
-                    embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
-                    embed.set_footer(text=f"Member #{len(member.guild.members)}")
-                    
-                    await channel.send(embed=embed)
-            except Exception as e:
-                print(f"Error sending welcome message: {e}")
-        
-        # Auto role
-        if 'auto_role' in guild_settings:
-            try:
-                role = member.guild.get_role(int(guild_settings['auto_role']))
-                if role:
-                    await member.add_roles(role, reason="Auto role on join")
-            except Exception as e:
-                print(f"Error adding auto role: {e}")
+        if member.guild.id in self.guild_settings:
+            self.dispatcher.member_joined(member)
 
     @commands.Cog.listener()
-    async def on_member_remove(self, member):
-        """Handle member leave events"""
-        settings = self.load_settings()
-        guild_id = str(member.guild.id)
-        
-        if guild_id not in settings:
+    async def on_raw_member_remove(self, payload):
+        """Handle member leave events.
+
+        The raw event fires whether or not the member was cached; with the
+        default voice-only member cache on_member_remove would miss most leaves.
+        """
+        self.dispatcher.member_left(payload.guild_id, payload.user.id)
+        guild_settings = self.guild_settings.get(payload.guild_id)
+        guild = self.bot.get_guild(payload.guild_id)
+        if guild_settings is None or guild is None:
             return
-        
-        guild_settings = settings[guild_id]
+        member = DepartedMember(payload.user, guild)
         
         # Goodbye message
-        if 'goodbye_channel' in guild_settings and 'goodbye_message' in guild_settings:
+        if guild_settings.goodbye_enabled and guild_settings.goodbye_channel and guild_settings.goodbye_message:
             try:
-                channel = self.bot.get_channel(int(guild_settings['goodbye_channel']))
+                channel = self.bot.get_channel(guild_settings.goodbye_channel)
                 if channel:
-                    message = guild_settings['goodbye_message'].replace('{user}', member.name).replace('{server}', member.guild.name)
+                    message = guild_settings.goodbye_message(member)
                     
                     embed = discord.Embed(
                         title="👋 Goodbye",
@@ -97,22 +452,23 @@ class MemberJoin(commands.Cog):
                     
                     await channel.send(embed=embed)
             except Exception as e:
-                print(f"Error sending goodbye message: {e}")
+                log.warning(f"Error sending goodbye message: {e}", extra={'guild': guild.id})
 
     @slash_command(description="🎉 Set up welcome messages")
-    async def welcome_setup(self, ctx, channel: discord.TextChannel, *, message: Option(str, "Welcome message (use {user} for mention, {server} for server name)")):
+    async def welcome_setup(self, ctx, channel: discord.TextChannel, *, message: Option(str, "Welcome message (use {member} for mention, {guild} for server name)")):
         if not ctx.author.guild_permissions.manage_guild:
             await ctx.respond("❌ You don't have permission to manage server settings!", ephemeral=True)
             return
         
-        settings = self.load_settings()
-        guild_id = str(ctx.guild.id)
-        
-        if guild_id not in settings:
-            settings[guild_id] = {}
+        try:
+            compile_template(message, WELCOME_VARIABLES)
+        except TemplateError as e:
+            await ctx.respond(f"❌ {e}. Available: {PLACEHOLDER_HELP}", ephemeral=True)
+            return
         
-        settings[guild_id]['welcome_channel'] = str(channel.id)
-        settings[guild_id]['welcome_message'] = message
+        settings, guild_settings = self.edit_guild_settings(ctx.guild.id)
+        guild_settings['welcome_channel'] = channel.id
+        guild_settings['welcome_message'] = message
         self.save_settings(settings)
         
         embed = discord.Embed(
@@ -126,19 +482,20 @@ class MemberJoin(commands.Cog):
         await ctx.respond(embed=embed)
 
     @slash_command(description="👋 Set up goodbye messages")
-    async def goodbye_setup(self, ctx, channel: discord.TextChannel, *, message: Option(str, "Goodbye message (use {user} for name, {server} for server name)")):
+    async def goodbye_setup(self, ctx, channel: discord.TextChannel, *, message: Option(str, "Goodbye message (use {member} for name, {guild} for server name)")):
         if not ctx.author.guild_permissions.manage_guild:
             await ctx.respond("❌ You don't have permission to manage server settings!", ephemeral=True)
             return
         
-        settings = self.load_settings()
-        guild_id = str(ctx.guild.id)
-        
-        if guild_id not in settings:
-            settings[guild_id] = {}
+        try:
+            compile_template(message, GOODBYE_VARIABLES)
+        except TemplateError as e:
+            await ctx.respond(f"❌ {e}. Available: {PLACEHOLDER_HELP}", ephemeral=True)
+            return
         
-        settings[guild_id]['goodbye_channel'] = str(channel.id)
-        settings[guild_id]['goodbye_message'] = message
+        settings, guild_settings = self.edit_guild_settings(ctx.guild.id)
+        guild_settings['goodbye_channel'] = channel.id
+        guild_settings['goodbye_message'] = message
         self.save_settings(settings)
         
         embed = discord.Embed(
@@ -157,13 +514,8 @@ class MemberJoin(commands.Cog):
             await ctx.respond("❌ You don't have permission to manage roles!", ephemeral=True)
             return
         
-        settings = self.load_settings()
-        guild_id = str(ctx.guild.id)
-        
-        if guild_id not in settings:
-            settings[guild_id] = {}
-        
-        settings[guild_id]['auto_role'] = str(role.id)
+        settings, guild_settings = self.edit_guild_settings(ctx.guild.id)
+        guild_settings['auto_role'] = role.id
         self.save_settings(settings)
         
         embed = discord.Embed(
@@ -176,4 +528,4 @@ class MemberJoin(commands.Cog):
 
 def setup(bot):
     bot.add_cog(MemberJoin(bot))
-    print("✅ Member Join cog loaded successfully")
+    log.info("✅ Member Join cog loaded successfully")
@@ -1,35 +1,172 @@
 import discord
 from discord.ext import commands
-import json
 import datetime
 from discord.commands import slash_command, Option
+import logging
 import os
 import asyncio
+import re
+import time
+
+from utils.actions_db import ActionsStore
+from utils.bulk import BulkJob, CancelView, ConfirmView, Skip, progress_bar
+from utils.metrics import REGISTRY
+from utils.purge import PurgeJob, text_matcher
+from utils.scheduler import get_scheduler
+from utils.sharding import owns_guild
+from utils.warnings_db import WarningsCache, WarningsStore, import_if_empty
+
+log = logging.getLogger(__name__)
+
+MODERATION_DB = os.getenv('MODERATION_DB', 'Cogs/Moderation/data/moderation.db')
+
+SCHEDULED_ACTIONS = REGISTRY.counter('moderation_scheduled_actions_total', 'Scheduled moderation actions run',
+                                     ('kind', 'result'))
+
+# Actions found overdue at startup are started this far apart instead of all at once
+OVERDUE_SPACING_SECONDS = 0.25
+ACTION_RETRY_SECONDS = 300
+# Actions for a guild the bot has left are deleted once they are this overdue
+# (until then a re-invite picks them up again)
+STALE_ACTION_SECONDS = 7 * 86400
+# Warning expiry sweeps run at most this often per guild
+EXPIRY_SWEEP_MIN_SECONDS = 3600
+DURATION_UNITS = {'minutes': 60, 'hours': 3600, 'days': 86400}
+
+MAX_BULK_TARGETS = 1000
+MAX_CLEAR = 50000
+USER_ID = re.compile(r'\d{15,21}')  # Snowflakes, bare or inside <@...> mentions
 
 class Moderation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.warnings_file = "Cogs/Moderation/warnings.json"
-        self.ensure_warnings_file()
-
-    def ensure_warnings_file(self):
-        """Ensure warnings file exists"""
-        if not os.path.exists(self.warnings_file):
-            with open(self.warnings_file, 'w') as f:
-                json.dump({}, f)
-
-    def load_warnings(self):
-        """Load warnings from file"""
+        self.scheduler = get_scheduler(bot)
+        self.warnings_file = "Cogs/Moderation/warnings.json"  # Legacy store, imported once
+        store = WarningsStore(MODERATION_DB)
+        import_if_empty(store, self.warnings_file)
+        self.warnings = WarningsCache(store, self.scheduler)
+        self.actions = ActionsStore(MODERATION_DB)
+        self.action_handlers = {'unban': self.expire_ban, 'expire_warnings': self.expire_warnings}
+        self.actions_loaded = False
+        if bot.is_ready():
+            self.load_actions()  # Reloaded while running; otherwise on_ready loads them
+
+    def cog_unload(self):
+        self.scheduler.cancel_prefix('mod_action')
+        self.warnings.close()
+        self.actions.close()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if not self.actions_loaded:
+            self.load_actions()
+
+    def load_actions(self):
+        """Put every stored action for this process's guilds on the scheduler.
+
+        Rows for guilds on other shard processes are left to those processes.
+        Rows for a guild this process would serve but the bot has left are
+        deleted once they are STALE_ACTION_SECONDS overdue, so the table
+        does not keep them forever.
+        """
+        self.actions_loaded = True
+        now = time.time()
+        scheduled = overdue = 0
+        stale = []
+        for action in self.actions.pending():
+            if self.bot.get_guild(action['guild_id']) is None:
+                if owns_guild(self.bot, action['guild_id']) and now - action['due_at'] > STALE_ACTION_SECONDS:
+                    stale.append(action['id'])
+                continue
+            delay = action['due_at'] - now
+            if delay <= 0:
+                delay = overdue * OVERDUE_SPACING_SECONDS
+                overdue += 1
+            self.schedule_action(action, delay)
+            scheduled += 1
+        if stale:
+            self.actions.remove_many(stale)
+            log.info(f"🧹 Deleted {len(stale)} scheduled moderation actions for servers the bot has left")
+        if scheduled:
+            log.info(f"⏰ Loaded {scheduled} scheduled moderation actions ({overdue} overdue)")
+
+    def schedule_action(self, action, delay):
+        self.scheduler.schedule(('mod_action', action['id']), delay, self.run_action, action)
+
+    async def add_action(self, kind, guild_id, user_id, due_at, payload=None):
+        """Store an action durably, then schedule it"""
+        loop = asyncio.get_running_loop()
+        action = await loop.run_in_executor(None, self.actions.add, kind, guild_id, user_id, due_at, payload)
+        self.schedule_action(action, due_at - time.time())
+        return action
+
+    async def cancel_actions(self, guild_id, kind, user_id=None):
+        """Drop stored actions of a kind for a guild (and user); returns how many there were"""
+        loop = asyncio.get_running_loop()
+        actions = await loop.run_in_executor(None, self.actions.find, guild_id, kind, user_id)
+        for action in actions:
+            self.scheduler.cancel(('mod_action', action['id']))
+            await loop.run_in_executor(None, self.actions.remove, action['id'])
+        return len(actions)
+
+    async def run_action(self, action):
+        """Run a due action; handlers return the next due time for recurring ones"""
+        loop = asyncio.get_running_loop()
+        try:
+            next_due = await self.action_handlers[action['kind']](action)
+        except Exception as e:
+            SCHEDULED_ACTIONS.inc(action['kind'], 'retry')
+            log.warning(f"Scheduled {action['kind']} failed, retrying in {ACTION_RETRY_SECONDS}s: {e}",
+                        extra={'guild': action['guild_id']})
+            next_due = time.time() + ACTION_RETRY_SECONDS
+        else:
+            SCHEDULED_ACTIONS.inc(action['kind'], 'ok')
+
+        if next_due is None:
+            await loop.run_in_executor(None, self.actions.remove, action['id'])
+        else:
+            action['due_at'] = next_due
+            await loop.run_in_executor(None, self.actions.reschedule, action['id'], next_due)
+            self.schedule_action(action, next_due - time.time())
+
+    async def expire_ban(self, action):
+        guild = self.bot.get_guild(action['guild_id'])
+        if guild is None:
+            return None
         try:
-            with open(self.warnings_file, 'r') as f:
-                return json.load(f)
-        except:
-            return {}
+            await guild.unban(discord.Object(id=action['user_id']), reason="Temporary ban expired")
+        except discord.NotFound:
+            pass  # Already unbanned
+        return None
+
+    async def expire_warnings(self, action):
+        """Sweep a guild's expired warnings; the next sweep is when the oldest left expires"""
+        days = action['payload']['days']
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=days)
+        oldest = await self.warnings.expire(action['guild_id'], cutoff.isoformat())
+        if oldest is None:
+            next_due = time.time() + days * 86400
+        else:
+            next_due = (datetime.datetime.fromisoformat(oldest) + datetime.timedelta(days=days)).timestamp()
+        return max(next_due, time.time() + EXPIRY_SWEEP_MIN_SECONDS)
+
+    def warning_embed(self, member, moderator, reason, warning_count):
+        embed = discord.Embed(
+            title="⚠️ Member Warned",
+            description=f"**{member.mention} has been warned**",
+            color=0xFFFF00
+        )
+        embed.add_field(name="👤 Member", value=f"{member.name}#{member.discriminator}", inline=True)
+        embed.add_field(name="🛡️ Moderator", value=moderator.mention, inline=True)
+        embed.add_field(name="📝 Reason", value=reason, inline=False)
+        embed.add_field(name="📊 Total Warnings", value=str(warning_count), inline=True)
+        embed.set_footer(text=f"User ID: {member.id}")
+        return embed
 
-    def save_warnings(self, warnings):
-        """Save warnings to file"""
-        with open(self.warnings_file, 'w') as f:
-            json.dump(warnings, f, indent=2)
+    def warn_member(self, member, moderator, reason):
+        """Record a warning and return the embed announcing it (also used by automod)"""
+        warning_count = self.warnings.add_warning(member.guild.id, member.id, moderator.id, reason)
+        return self.warning_embed(member, moderator, reason, warning_count)
 
     @slash_command(description="🦶 Kick a member from the server")
     async def kick(self, ctx, member: discord.Member, *, reason: Option(str, "Reason for kick", default="No reason provided")):
@@ -79,6 +216,37 @@ class Moderation(commands.Cog):
         except Exception as e:
             await ctx.respond(f"❌ Failed to ban member: {str(e)}", ephemeral=True)
 
+    @slash_command(description="⏳ Ban a member for a limited time")
+    async def tempban(self, ctx, member: discord.Member, duration: Option(int, "How long", min_value=1),
+                      unit: Option(str, "Unit of the duration", choices=list(DURATION_UNITS), default="days"),
+                      *, reason: Option(str, "Reason for ban", default="No reason provided")):
+        if not ctx.author.guild_permissions.ban_members:
+            await ctx.respond("❌ You don't have permission to ban members!", ephemeral=True)
+            return
+
+        try:
+            await member.ban(reason=f"{reason} (temporary: {duration} {unit})")
+        except Exception as e:
+            await ctx.respond(f"❌ Failed to ban member: {str(e)}", ephemeral=True)
+            return
+
+        due_at = time.time() + duration * DURATION_UNITS[unit]
+        await self.cancel_actions(ctx.guild.id, 'unban', member.id)  # A new tempban replaces the old one
+        await self.add_action('unban', ctx.guild.id, member.id, due_at)
+
+        embed = discord.Embed(
+            title="⏳ Member Temporarily Banned",
+            description=f"**{member.mention} has been banned for {duration} {unit}**",
+            color=0xFF0000
+        )
+        embed.add_field(name="👤 Member", value=f"{member.name}#{member.discriminator}", inline=True)
+        embed.add_field(name="🛡️ Moderator", value=ctx.author.mention, inline=True)
+        embed.add_field(name="🔓 Unban", value=f"<t:{int(due_at)}:R>", inline=True)
+        embed.add_field(name="📝 Reason", value=reason, inline=False)
+        embed.set_footer(text=f"User ID: {member.id}")
+
+        await ctx.respond(embed=embed)
+
     @slash_command(description="🔓 Unban a user by their ID")
     async def unban(self, ctx, user_id: Option(str, "User ID to unban")):
         if not ctx.author.guild_permissions.ban_members:
@@ -89,6 +257,7 @@ class Moderation(commands.Cog):
             user_id = int(user_id)
             user = await self.bot.fetch_user(user_id)
             await ctx.guild.unban(user)
+            await self.cancel_actions(ctx.guild.id, 'unban', user_id)
 
             embed = discord.Embed(
                 title="🔓 Member Unbanned",
@@ -111,73 +280,195 @@ class Moderation(commands.Cog):
             await ctx.respond("❌ You don't have permission to warn members!", ephemeral=True)
             return
 
-        warnings = self.load_warnings()
-        guild_id = str(ctx.guild.id)
-        user_id = str(member.id)
-
-        if guild_id not in warnings:
-            warnings[guild_id] = {}
-        if user_id not in warnings[guild_id]:
-            warnings[guild_id][user_id] = []
-
-        warning = {
-            "reason": reason,
-            "moderator": str(ctx.author.id),
-            "timestamp": datetime.datetime.now().isoformat()
-        }
+        await ctx.respond(embed=self.warn_member(member, ctx.author, reason))
 
-        warnings[guild_id][user_id].append(warning)
-        self.save_warnings(warnings)
+    @slash_command(description="⌛ Make warnings expire after a number of days")
+    async def warn_expiry(self, ctx, days: Option(int, "Days a warning lasts (0 = never expire)", min_value=0, max_value=3650)):
+        if not ctx.author.guild_permissions.manage_guild:
+            await ctx.respond("❌ You don't have permission to manage server settings!", ephemeral=True)
+            return
 
-        warning_count = len(warnings[guild_id][user_id])
+        await self.cancel_actions(ctx.guild.id, 'expire_warnings')
+        if days:
+            # Sweep now; the sweep schedules the next one itself
+            await self.add_action('expire_warnings', ctx.guild.id, None, time.time(), {'days': days})
 
         embed = discord.Embed(
-            title="⚠️ Member Warned",
-            description=f"**{member.mention} has been warned**",
-            color=0xFFFF00
+            title="⌛ Warning Expiry Updated",
+            description=f"Warnings now expire after **{days} days**." if days else "Warnings no longer expire.",
+            color=0x00FF00
         )
-        embed.add_field(name="👤 Member", value=f"{member.name}#{member.discriminator}", inline=True)
-        embed.add_field(name="🛡️ Moderator", value=ctx.author.mention, inline=True)
-        embed.add_field(name="📝 Reason", value=reason, inline=False)
-        embed.add_field(name="📊 Total Warnings", value=str(warning_count), inline=True)
-        embed.set_footer(text=f"User ID: {member.id}")
-
         await ctx.respond(embed=embed)
 
     @slash_command(description="📊 View warnings for a member")
     async def warnings(self, ctx, member: discord.Member):
-        warnings = self.load_warnings()
-        guild_id = str(ctx.guild.id)
-        user_id = str(member.id)
-
-        if guild_id not in warnings or user_id not in warnings[guild_id]:
+        total = self.warnings.count_warnings(ctx.guild.id, member.id)
+        if not total:
             await ctx.respond(f"📊 {member.mention} has no warnings.", ephemeral=True)
             return
 
-        user_warnings = warnings[guild_id][user_id]
+        user_warnings = self.warnings.get_warnings(ctx.guild.id, member.id, 5)
 
         embed = discord.Embed(
             title=f"📊 Warnings for {member.name}#{member.discriminator}",
             color=0xFFFF00
         )
 
-        for i, warning in enumerate(user_warnings[-5:], 1):  # Show last 5 warnings
+        for i, warning in enumerate(user_warnings, 1):  # Last 5 warnings
             moderator = self.bot.get_user(int(warning['moderator']))
             moderator_name = moderator.name if moderator else "Unknown"
             timestamp = datetime.datetime.fromisoformat(warning['timestamp']).strftime("%Y-%m-%d %H:%M")
 
             embed.add_field(
-                name=f"Warning #{len(user_warnings) - 5 + i}",
+                name=f"Warning #{total - len(user_warnings) + i}",
                 value=f"**Reason:** {warning['reason']}\n**Moderator:** {moderator_name}\n**Date:** {timestamp}",
                 inline=False
             )
 
-        embed.set_footer(text=f"Total warnings: {len(user_warnings)} • User ID: {member.id}")
+        embed.set_footer(text=f"Total warnings: {total} • User ID: {member.id}")
 
         await ctx.respond(embed=embed)
 
+    async def bulk_targets(self, ctx, user_ids, joined_within):
+        """(user id, member or None) for listed ids and members who joined in the last N minutes"""
+        targets = {int(user_id): None for user_id in USER_ID.findall(user_ids or '')}
+        if joined_within:
+            cutoff = discord.utils.utcnow() - datetime.timedelta(minutes=joined_within)
+            # Most member cache policies do not keep everyone; fetch the list without caching it
+            members = ctx.guild.members if ctx.guild.chunked else await ctx.guild.chunk(cache=False)
+            for member in members:
+                if member.joined_at and member.joined_at >= cutoff:
+                    targets[member.id] = member
+        for protected in (ctx.author.id, self.bot.user.id, ctx.guild.owner_id):
+            targets.pop(protected, None)
+        return list(targets.items())
+
+    @staticmethod
+    def check_hierarchy(ctx, member):
+        if ctx.author.id != ctx.guild.owner_id and member.top_role >= ctx.author.top_role:
+            raise Skip("role is not below yours")
+
+    async def bulk_member(self, ctx, target, missing_ok=False):
+        """Resolve a bulk target to a member the invoker may act on (None if missing_ok and not in the server)"""
+        user_id, member = target
+        member = member or ctx.guild.get_member(user_id)
+        if member is None:
+            try:
+                member = await ctx.guild.fetch_member(user_id)
+            except discord.NotFound:
+                if missing_ok:
+                    return None
+                raise Skip("not in the server")
+        self.check_hierarchy(ctx, member)
+        return member
+
+    def bulk_embed(self, job, title, color):
+        embed = discord.Embed(title=title, description=progress_bar(job.processed, len(job.targets)), color=color)
+        embed.add_field(name="✅ Done", value=str(job.succeeded), inline=True)
+        embed.add_field(name="⏭️ Skipped", value=str(len(job.skipped)), inline=True)
+        embed.add_field(name="❌ Failed", value=str(len(job.failed)), inline=True)
+        if job.finished_at is not None:
+            problems = [f"<@{target[0]}>: {reason}" for target, reason in (job.failed + job.skipped)[:10]]
+            if problems:
+                embed.add_field(name="📋 Details", value="\n".join(problems)[:1024], inline=False)
+            if job.cancelled:
+                embed.add_field(name="⏹️ Stopped", value=f"{len(job.targets) - job.processed} not processed", inline=False)
+        embed.set_footer(text=f"⏱️ {job.elapsed:.0f}s")
+        return embed
+
+    async def run_bulk(self, ctx, name, verb, emoji, user_ids, joined_within, action, route):
+        """Confirm, then run action over the targets with live progress and a summary"""
+        if not user_ids and not joined_within:
+            await ctx.respond("❌ Give user IDs, a joined-within filter, or both!", ephemeral=True)
+            return
+
+        await ctx.defer()
+        targets = await self.bulk_targets(ctx, user_ids, joined_within)
+        if not targets:
+            await ctx.respond("❌ No users matched.")
+            return
+        if len(targets) > MAX_BULK_TARGETS:
+            await ctx.respond(f"❌ {len(targets)} users matched; at most {MAX_BULK_TARGETS} can be handled at once.")
+            return
+
+        preview = discord.Embed(
+            title=f"{emoji} Confirm Mass {verb}",
+            description=f"This will {verb.lower()} **{len(targets)}** users.",
+            color=0xFF9500
+        )
+        listed = ' '.join(f"<@{user_id}>" for user_id, _ in targets[:30])
+        preview.add_field(name="👥 Users", value=listed + (f" and {len(targets) - 30} more" if len(targets) > 30 else ""), inline=False)
+        confirm = ConfirmView(ctx.author, f"{verb} {len(targets)}")
+        message = await ctx.respond(embed=preview, view=confirm)
+        await confirm.wait()
+        if not confirm.confirmed:
+            await message.edit(embed=discord.Embed(title=f"{emoji} Mass {verb} Cancelled", color=0x808080), view=None)
+            return
+
+        job = BulkJob(name, targets, action, route)
+        title = f"{emoji} Mass {verb}"
+
+        async def show(embed, view):
+            try:
+                await message.edit(embed=embed, view=view)
+            except discord.HTTPException:
+                # The interaction token expires after 15 minutes; edit through the channel instead
+                await ctx.channel.get_partial_message(message.id).edit(embed=embed, view=view)
+
+        stop = CancelView(ctx.author, job)
+        await show(self.bulk_embed(job, title, 0xFF9500), stop)
+        await job.run(on_progress=lambda job: show(self.bulk_embed(job, title, 0xFF9500), stop))
+        await show(self.bulk_embed(job, f"{title} {'Stopped' if job.cancelled else 'Complete'}", 0x00FF00), None)
+        log.info(f"{emoji} Mass {verb.lower()} by {ctx.author}: {job.succeeded} done, {len(job.skipped)} skipped, "
+                 f"{len(job.failed)} failed", extra={'guild': ctx.guild.id})
+
+    @slash_command(description="🔨 Ban many users at once")
+    async def massban(self, ctx, user_ids: Option(str, "User IDs or mentions, separated by spaces", required=False, default=None),
+                      joined_within: Option(int, "Everyone who joined in the last N minutes", min_value=1, max_value=10080, required=False, default=None),
+                      *, reason: Option(str, "Reason for ban", default="No reason provided")):
+        if not ctx.author.guild_permissions.ban_members:
+            await ctx.respond("❌ You don't have permission to ban members!", ephemeral=True)
+            return
+
+        async def ban(target):
+            # Members are checked against the invoker's role; anyone not in the server is banned by id
+            await self.bulk_member(ctx, target, missing_ok=True)
+            await ctx.guild.ban(discord.Object(id=target[0]), reason=f"{reason} (mass ban by {ctx.author})")
+
+        await self.run_bulk(ctx, 'ban', "Ban", "🔨", user_ids, joined_within, ban, ('ban', ctx.guild.id))
+
+    @slash_command(description="🦶 Kick many members at once")
+    async def masskick(self, ctx, user_ids: Option(str, "User IDs or mentions, separated by spaces", required=False, default=None),
+                       joined_within: Option(int, "Everyone who joined in the last N minutes", min_value=1, max_value=10080, required=False, default=None),
+                       *, reason: Option(str, "Reason for kick", default="No reason provided")):
+        if not ctx.author.guild_permissions.kick_members:
+            await ctx.respond("❌ You don't have permission to kick members!", ephemeral=True)
+            return
+
+        async def kick(target):
+            member = await self.bulk_member(ctx, target)
+            await member.kick(reason=f"{reason} (mass kick by {ctx.author})")
+
+        await self.run_bulk(ctx, 'kick', "Kick", "🦶", user_ids, joined_within, kick, ('kick', ctx.guild.id))
+
+    @slash_command(description="🔇 Timeout many members at once")
+    async def masstimeout(self, ctx, duration: Option(int, "Duration in minutes (Discord allows up to 28 days)", min_value=1, max_value=40320),
+                          user_ids: Option(str, "User IDs or mentions, separated by spaces", required=False, default=None),
+                          joined_within: Option(int, "Everyone who joined in the last N minutes", min_value=1, max_value=10080, required=False, default=None),
+                          *, reason: Option(str, "Reason for timeout", default="No reason provided")):
+        if not ctx.author.guild_permissions.moderate_members:
+            await ctx.respond("❌ You don't have permission to timeout members!", ephemeral=True)
+            return
+
+        async def timeout(target):
+            member = await self.bulk_member(ctx, target)
+            until = discord.utils.utcnow() + datetime.timedelta(minutes=duration)
+            await member.timeout(until, reason=f"{reason} (mass timeout by {ctx.author})")
+
+        await self.run_bulk(ctx, 'timeout', "Timeout", "🔇", user_ids, joined_within, timeout, ('member_edit', ctx.guild.id))
+
     @slash_command(description="🔇 Timeout a member")
-    async def timeout(self, ctx, member: discord.Member, duration: Option(int, "Duration in minutes"), *, reason: Option(str, "Reason for timeout", default="No reason provided")):
+    async def timeout(self, ctx, member: discord.Member, duration: Option(int, "Duration in minutes (Discord allows up to 28 days)", min_value=1, max_value=40320), *, reason: Option(str, "Reason for timeout", default="No reason provided")):
         if not ctx.author.guild_permissions.moderate_members:
             await ctx.respond("❌ You don't have permission to timeout members!", ephemeral=True)
             return
@@ -202,28 +493,63 @@ class Moderation(commands.Cog):
         except Exception as e:
             await ctx.respond(f"❌ Failed to timeout member: {str(e)}", ephemeral=True)
 
+    def clear_embed(self, job, title, color):
+        embed = discord.Embed(title=title, description=progress_bar(job.deleted, job.limit), color=color)
+        embed.add_field(name="🔍 Scanned", value=str(job.scanned), inline=True)
+        embed.add_field(name="🗑️ Bulk Deleted", value=str(job.bulk_deleted), inline=True)
+        embed.add_field(name="🐢 Deleted Singly", value=str(job.single_deleted), inline=True)
+        if job.failed:
+            embed.add_field(name="❌ Failed", value=str(job.failed), inline=True)
+        embed.set_footer(text=f"⏱️ {job.elapsed:.0f}s • Messages older than 14 days are deleted one at a time")
+        return embed
+
     @slash_command(description="🧹 Clear messages from the channel")
-    async def clear(self, ctx, amount: Option(int, "Number of messages to delete (max 100)", min_value=1, max_value=100)):
+    async def clear(self, ctx, amount: Option(int, f"Number of messages to delete (max {MAX_CLEAR})", min_value=1, max_value=MAX_CLEAR),
+                    user: Option(discord.Member, "Only messages from this member", required=False, default=None),
+                    pattern: Option(str, "Only messages containing this text (* matches anything)", required=False, default=None),
+                    attachments: Option(bool, "Only messages with attachments", required=False, default=False),
+                    bots: Option(bool, "Only messages from bots", required=False, default=False),
+                    include_pinned: Option(bool, "Delete pinned messages too", required=False, default=False)):
         if not ctx.author.guild_permissions.manage_messages:
             await ctx.respond("❌ You don't have permission to manage messages!", ephemeral=True)
             return
 
-        try:
-            deleted = await ctx.channel.purge(limit=amount)
-
-            embed = discord.Embed(
-                title="🧹 Messages Cleared",
-                description=f"**{len(deleted)} messages have been deleted**",
-                color=0x00FF00
-            )
-            embed.add_field(name="🛡️ Moderator", value=ctx.author.mention, inline=True)
-            embed.add_field(name="📝 Channel", value=ctx.channel.mention, inline=True)
+        text = text_matcher(pattern[:200]) if pattern else None
+
+        def check(message):
+            return ((include_pinned or not message.pinned)
+                    and (user is None or message.author.id == user.id)
+                    and (not bots or message.author.bot)
+                    and (not attachments or bool(message.attachments))
+                    and (text is None or text(message.content)))
+
+        # Only messages sent before the command, so the progress message is never in the scan
+        job = PurgeJob(ctx.channel, amount, check, before=discord.Object(id=ctx.interaction.id),
+                       reason=f"/clear by {ctx.author}")
+        stop = CancelView(ctx.author, job)
+        interaction = await ctx.respond(embed=self.clear_embed(job, "🧹 Clearing Messages...", 0xFF9500), view=stop)
+        message = await interaction.original_response() if isinstance(interaction, discord.Interaction) else interaction
+
+        async def show(embed, view):
+            try:
+                await message.edit(embed=embed, view=view)
+            except discord.HTTPException:
+                # The interaction token expires after 15 minutes; edit through the channel instead
+                await ctx.channel.get_partial_message(message.id).edit(embed=embed, view=view)
 
-            await ctx.respond(embed=embed, delete_after=5)
+        try:
+            await job.run(on_progress=lambda job: show(self.clear_embed(job, "🧹 Clearing Messages...", 0xFF9500), stop))
+        except discord.HTTPException as e:
+            await show(discord.Embed(title="❌ Failed to clear messages", description=str(e), color=0xFF0000), None)
+            return
 
-        except Exception as e:
-            await ctx.respond(f"❌ Failed to clear messages: {str(e)}", ephemeral=True)
+        embed = self.clear_embed(job, "🧹 Clearing Stopped" if job.cancelled else "🧹 Messages Cleared", 0x00FF00)
+        embed.description = f"**{job.deleted} messages have been deleted**"
+        embed.add_field(name="🛡️ Moderator", value=ctx.author.mention, inline=True)
+        embed.add_field(name="📝 Channel", value=ctx.channel.mention, inline=True)
+        await show(embed, None)
+        await ctx.channel.get_partial_message(message.id).delete(delay=15)
 
 def setup(bot):
     bot.add_cog(Moderation(bot))
-    print("✅ Moderation cog loaded successfully")
\ No newline at end of file
+    log.info("✅ Moderation cog loaded successfully")
\ No newline at end of file
@@ -2,20 +2,29 @@ import discord
 from discord.ext import commands
 from discord.commands import slash_command, Option
 import asyncio
+import io
+import logging
 import os
 import json
 from datetime import datetime, timedelta
 import time
 import random
 from concurrent.futures import ThreadPoolExecutor
-
-# Try to import yt_dlp with fallback
-try:
-    import yt_dlp
-    YT_DLP_AVAILABLE = True
-except ImportError:
-    print("⚠️ Warning: yt-dlp not available, music functionality will be limited")
-    YT_DLP_AVAILABLE = False
+from utils.metrics import StageTimings, REGISTRY, stage_timings_collector
+from utils.scheduler import get_scheduler
+from utils.library import LocalLibrary, is_local_url
+from utils.audio_workers import AudioWorkerPool
+from utils.sharding import is_primary_process
+from utils.lazy import lazy_import
+
+log = logging.getLogger(__name__)
+
+# yt_dlp takes longer to import than the rest of the bot, so it is only
+# imported on first use or by the background warm-up in main.py
+yt_dlp = lazy_import('yt_dlp')
+YT_DLP_AVAILABLE = yt_dlp.available
+if not YT_DLP_AVAILABLE:
+    log.warning("⚠️ Warning: yt-dlp not available, music functionality will be limited")
 
 # Global flags - will be checked at runtime, not import time
 VOICE_ENABLED = None
@@ -75,6 +84,146 @@ YDL_OPTIONS = {
     'user_agent': 'Mozilla/5.0 (Linux; Android 11; SM-G973F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.120 Mobile Safari/537.36',
 } if YT_DLP_AVAILABLE else {}
 
+# Leave the voice channel after this long with nothing playing
+IDLE_DISCONNECT_SECONDS = 300
+
+# Playback watchdog: how often to check, and how long without frames counts as a stall
+WATCHDOG_INTERVAL_SECONDS = 5
+STALL_THRESHOLD_SECONDS = 10
+FRAME_SECONDS = 0.02  # Each read() from an audio source is one 20ms frame
+
+# Local music library (optional): a directory of audio files indexed in SQLite
+LIBRARY_DIR = os.getenv('MUSIC_LIBRARY_DIR')
+LIBRARY_DB = os.getenv('MUSIC_LIBRARY_DB', 'Cogs/Music/data/library.db')
+LIBRARY_RESCAN_MINUTES = 30
+
+# Optional audio worker processes for FFmpeg decoding and Opus encoding (0 = in-process)
+AUDIO_WORKERS = int(os.getenv('AUDIO_WORKERS', '0'))
+DEFAULT_VOLUME = 0.5  # FFmpeg volume filter applied to every track until /volume changes it
+
+# Quality tiers (kbps) used to match audio to the voice channel bitrate
+QUALITY_TIERS = [48, 64, 96, 128, 160]
+DEFAULT_VOICE_BITRATE = 64000
+
+def get_quality_tier(bitrate):
+    """Return the smallest quality tier that covers a voice channel bitrate (bps)"""
+    kbps = (bitrate or DEFAULT_VOICE_BITRATE) // 1000
+    for tier in QUALITY_TIERS:
+        if tier >= kbps:
+            return tier
+    return QUALITY_TIERS[-1]
+
+def stream_tier(abr):
+    """The tier a downloaded stream actually covers: the highest tier at or below its bitrate.
+
+    Below the lowest tier the bitrate itself is used, which find_cached_file
+    never looks up, so such a file is only played once.
+    """
+    covered = [tier for tier in QUALITY_TIERS if tier <= abr]
+    return covered[-1] if covered else int(abr)
+
+def build_format_selector(tier):
+    """Build a yt-dlp format string preferring the smallest native Opus stream for a tier"""
+    return (
+        f'worstaudio[acodec=opus][abr>={tier}]/'
+        'bestaudio[acodec=opus]/'
+        f'worstaudio[abr>={tier}]/'
+        'bestaudio/best'
+    )
+
+# Pipeline stages timed by the Music cog, in the order a track goes through them
+PIPELINE_STAGES = [
+    'search', 'selection_wait', 'extraction', 'download_queue_wait', 'download',
+    'ffmpeg_spawn', 'first_packet', 'embed_edit', 'track_gap'
+]
+
+# Per-guild player state handed from the old cog to the new one on a hot reload
+HANDOVER_ATTRS = [
+    'queue', 'current_song', 'auto_play_mode', 'last_played', 'downloaded_files', 'download_tasks',
+    'background_tasks', 'executor', 'timings', 'track_ended_at', 'now_playing', 'watchdog_stats',
+    'library', 'audio_workers', 'volumes'
+]
+HANDOVER_TIMEOUT_SECONDS = 30  # Release handed-over resources if no new cog picks them up
+
+def call_music(bot, method, *args):
+    """Call a method on whichever Music cog is loaded when this runs.
+
+    Voice after-callbacks and scheduled jobs go through here instead of
+    holding bound methods, so after a hot reload they reach the new cog.
+    """
+    music_cog = bot.get_cog('Music')
+    if music_cog is None:
+        return None
+    return getattr(music_cog, method)(*args)
+
+def release_handover(bot):
+    """Free handed-over state that no reloaded cog claimed (the cog was unloaded for good)"""
+    state = getattr(bot, 'music_handover', None)
+    if state is None:
+        return
+    del bot.music_handover
+    if state.get('audio_workers'):
+        state['audio_workers'].close()
+    state['executor'].shutdown(wait=False)
+    log.info("🎵 Music cog stayed unloaded, released its player state")
+
+MUSIC_DOWNLOADS = REGISTRY.counter('music_downloads_total', 'Audio download requests by outcome', ('result',))
+
+class TimedAudioSource(discord.AudioSource):
+    """Wraps an audio source, reporting its first packet and counting delivered frames"""
+    def __init__(self, source, on_first_packet):
+        self.source = source
+        self.on_first_packet = on_first_packet
+        self.started = time.perf_counter()
+        self.frames = 0
+        self.offset = 0.0  # Seconds skipped or rewound by /seek
+        self.last_frame_at = time.monotonic()
+        self.replacement = None
+        self.recovering = False
+
+    @property
+    def position(self):
+        """Seconds into the track"""
+        return self.offset + self.frames * FRAME_SECONDS
+
+    def moved_to(self, position):
+        """Record a seek, so position keeps counting from there"""
+        self.offset = position - self.frames * FRAME_SECONDS
+
+    def touch(self):
+        """Reset the stall clock, e.g. while playback is paused"""
+        self.last_frame_at = time.monotonic()
+
+    def replace(self, source):
+        """Swap in a rebuilt source; the stalled one is killed so its read() returns"""
+        old_source = self.source
+        self.replacement = source
+        self.touch()
+        old_source.cleanup()
+
+    def read(self):
+        data = self.source.read()
+        if not data and self.replacement is not None:
+            old_source, self.source, self.replacement = self.source, self.replacement, None
+            old_source.cleanup()
+            data = self.source.read()
+        if data:
+            self.frames += 1
+            self.last_frame_at = time.monotonic()
+            # Only real audio counts; a source that fails at once never reports
+            if self.on_first_packet:
+                callback, self.on_first_packet = self.on_first_packet, None
+                callback(time.perf_counter() - self.started)
+        return data
+
+    def is_opus(self):
+        return self.source.is_opus()
+
+    def cleanup(self):
+        if self.replacement is not None:
+            self.replacement.cleanup()
+        self.source.cleanup()
+
 class MusicControls(discord.ui.View):
     def __init__(self, bot):
         super().__init__(timeout=None)
@@ -86,6 +235,9 @@ class MusicControls(discord.ui.View):
             voice = discord.utils.get(self.bot.voice_clients, guild=interaction.guild)
             if voice and voice.is_playing():
                 voice.pause()
+                music_cog = self.bot.get_cog('Music')
+                if music_cog and music_cog.audio_workers:
+                    music_cog.audio_workers.pause(interaction.guild.id)
                 embed = discord.Embed(
                     title="⏸️ Music Paused",
                     description="Music has been paused. Click ▶️ to resume.",
@@ -98,7 +250,7 @@ class MusicControls(discord.ui.View):
             # Interaction already responded to or expired
             pass
         except Exception as e:
-            print(f"Pause button error: {e}")
+            log.warning(f"Pause button error: {e}")
             await interaction.response.send_message("❌ An error occurred!", ephemeral=True)
 
     @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.success, custom_id="resume")
@@ -107,6 +259,9 @@ class MusicControls(discord.ui.View):
             voice = discord.utils.get(self.bot.voice_clients, guild=interaction.guild)
             if voice and voice.is_paused():
                 voice.resume()
+                music_cog = self.bot.get_cog('Music')
+                if music_cog and music_cog.audio_workers:
+                    music_cog.audio_workers.resume(interaction.guild.id)
                 embed = discord.Embed(
                     title="▶️ Music Resumed",
                     description="Music playback has been resumed!",
@@ -119,7 +274,7 @@ class MusicControls(discord.ui.View):
             # Interaction already responded to or expired
             pass
         except Exception as e:
-            print(f"Resume button error: {e}")
+            log.warning(f"Resume button error: {e}")
             await interaction.response.send_message("❌ An error occurred!", ephemeral=True)
 
     @discord.ui.button(emoji="⏭️", style=discord.ButtonStyle.primary, custom_id="skip")
@@ -145,9 +300,9 @@ class MusicControls(discord.ui.View):
                                 recommendations = await music_cog.get_youtube_recommendations(last_played)
                                 for rec in recommendations[:3]:  # Add 3 more songs to prevent overwhelming
                                     music_cog.queue[interaction.guild.id].append((rec['title'], rec['webpage_url']))
-                                print(f"Auto-play: Added {len(recommendations)} more recommendations")
+                                log.info(f"Auto-play: Added {len(recommendations)} more recommendations")
                         except Exception as rec_error:
-                            print(f"Auto-play recommendation error: {rec_error}")
+                            log.warning(f"Auto-play recommendation error: {rec_error}")
 
                 embed = discord.Embed(
                     title="⏭️ Song Skipped",
@@ -162,7 +317,7 @@ class MusicControls(discord.ui.View):
             # Interaction already responded to or expired
             pass
         except Exception as e:
-            print(f"Skip button error: {e}")
+            log.warning(f"Skip button error: {e}")
             await interaction.response.send_message("❌ An error occurred while skipping!", ephemeral=True)
 
     @discord.ui.button(emoji="⏹️", style=discord.ButtonStyle.danger, custom_id="stop")
@@ -188,7 +343,7 @@ class MusicControls(discord.ui.View):
             # Interaction already responded to or expired
             pass
         except Exception as e:
-            print(f"Stop button error: {e}")
+            log.warning(f"Stop button error: {e}")
             await interaction.response.send_message("❌ An error occurred!", ephemeral=True)
 
     @discord.ui.button(emoji="🎵", style=discord.ButtonStyle.secondary, custom_id="autoplay")
@@ -263,7 +418,7 @@ class MusicControls(discord.ui.View):
                         await interaction.edit_original_response(embed=success_embed, view=self)
 
                     except Exception as rec_error:
-                        print(f"Auto-play recommendation error: {rec_error}")
+                        log.warning(f"Auto-play recommendation error: {rec_error}")
                         error_embed = discord.Embed(
                             title="🎵 Auto-Play Enabled",
                             description="Auto-play mode is now active, but couldn't get recommendations right now. It will try again when songs change.",
@@ -277,7 +432,7 @@ class MusicControls(discord.ui.View):
             # Interaction already responded to or expired
             pass
         except Exception as e:
-            print(f"Auto-play button error: {e}")
+            log.warning(f"Auto-play button error: {e}")
             await interaction.response.send_message("❌ An error occurred!", ephemeral=True)
 
     @discord.ui.button(emoji="🔀", style=discord.ButtonStyle.secondary, custom_id="shuffle")
@@ -301,7 +456,7 @@ class MusicControls(discord.ui.View):
             # Interaction already responded to or expired
             pass
         except Exception as e:
-            print(f"Shuffle button error: {e}")
+            log.warning(f"Shuffle button error: {e}")
             await interaction.response.send_message("❌ An error occurred!", ephemeral=True)
 
 class SearchResultsView(discord.ui.View):
@@ -311,6 +466,7 @@ class SearchResultsView(discord.ui.View):
         self.ctx = ctx
         self.search_results = search_results
         self.voice_channel = voice_channel
+        self.shown_at = time.perf_counter()
 
         # Add buttons for each search result
         for i, result in enumerate(search_results[:5]):
@@ -335,6 +491,7 @@ class SearchResultsView(discord.ui.View):
             # Now play the selected song
             music_cog = self.bot.get_cog('Music')
             if music_cog:
+                music_cog.timings.record('selection_wait', time.perf_counter() - self.shown_at)
                 await music_cog.play_selected_song(self.ctx, selected_song, self.voice_channel)
 
         return song_callback
@@ -389,7 +546,7 @@ class QueueView(discord.ui.View):
         for i, (title, url) in enumerate(page_queue, start=start + 1):
             embed.add_field(
                 name=f"**{i}.** {title[:50]}{'...' if len(title) > 50 else ''}",
-                value=f"[🔗 YouTube Link]({url})",
+                value="💽 Local library" if is_local_url(url) else f"[🔗 YouTube Link]({url})",
                 inline=False
             )
 
@@ -404,39 +561,168 @@ class Music(commands.Cog):
         self.auto_play_mode = {}
         self.downloaded_files = {}  # Track downloaded files per guild
         self.download_tasks = {}    # Track ongoing downloads
-        self.cleanup_tasks = {}     # Track cleanup tasks for auto-deletion
+        self.background_tasks = set()  # Keep references to background download tasks
+        self.scheduler = get_scheduler(bot)  # File expiry and idle disconnects
         self.executor = ThreadPoolExecutor(max_workers=3)  # For concurrent downloads
+        self.timings = StageTimings(PIPELINE_STAGES)
+        self.track_ended_at = {}    # When the previous track finished, for gap timing
+        self.now_playing = {}       # guild_id -> what the watchdog needs to rebuild a source
+        self.watchdog_stats = {}    # guild_id -> stall and recovery counters
+        self.volumes = {}           # guild_id -> volume set with /volume
+
+        # Local library for network-free playback, if configured
+        self.library = None
+        if LIBRARY_DIR:
+            if os.path.isdir(LIBRARY_DIR):
+                self.library = LocalLibrary(LIBRARY_DIR, LIBRARY_DB)
+            else:
+                log.warning(f"⚠️ MUSIC_LIBRARY_DIR does not exist: {LIBRARY_DIR}")
+
+        # Audio worker processes are started lazily, on the first track they decode
+        self.audio_workers = AudioWorkerPool(AUDIO_WORKERS) if AUDIO_WORKERS > 0 else None
+
+        self.take_handover()
+        self.register_metrics()
 
         # Create downloads directory
         if not os.path.exists('downloads'):
             os.makedirs('downloads')
 
-    def get_safe_filename(self, url):
-        """Generate a safe filename from URL"""
+    def register_metrics(self):
+        """Expose queue, playback and pipeline stats; all computed at scrape time"""
+        REGISTRY.gauge('music_queued_tracks', 'Tracks waiting in music queues',
+                       function=lambda: sum(len(queue) for queue in self.queue.values()))
+        REGISTRY.gauge('music_queued_guilds', 'Guilds with a non-empty music queue',
+                       function=lambda: sum(1 for queue in self.queue.values() if queue))
+        REGISTRY.gauge('music_playing_guilds', 'Guilds currently playing a track',
+                       function=lambda: len(self.now_playing))
+        REGISTRY.gauge('music_cached_files', 'Downloaded audio files kept for replay',
+                       function=lambda: sum(len(files) for files in self.downloaded_files.values()))
+        REGISTRY.gauge('music_playback_stalls', 'Playback stalls seen by the watchdog',
+                       function=lambda: sum(stats['stalls'] for stats in self.watchdog_stats.values()))
+        REGISTRY.register_collector('music_stage_seconds', stage_timings_collector(
+            'music_stage_seconds', 'Music pipeline stage durations', self.timings))
+
+    def take_handover(self):
+        """Adopt the player state of the cog instance this one replaces on a hot reload"""
+        state = getattr(self.bot, 'music_handover', None)
+        if state is None:
+            return
+        del self.bot.music_handover
+        self.scheduler.cancel(('music_handover',))
+
+        # Keep the freshly created pool/executor only if the old cog had none
+        if self.audio_workers and state.get('audio_workers'):
+            self.audio_workers.close()
+        elif self.audio_workers:
+            state['audio_workers'] = self.audio_workers
+        self.executor.shutdown(wait=False)
+        for attr, value in state.items():
+            setattr(self, attr, value)
+        log.info(f"🎵 Music cog took over {len(self.now_playing)} playing and {len(self.queue)} queued guilds")
+
+    def cog_unload(self):
+        """Hand player state to the next cog instance; released if none loads in time"""
+        self.bot.music_handover = {attr: getattr(self, attr) for attr in HANDOVER_ATTRS if hasattr(self, attr)}
+        self.scheduler.schedule(('music_handover',), HANDOVER_TIMEOUT_SECONDS, release_handover, self.bot)
+
+    def audio_options(self, guild_id):
+        """FFmpeg output options for a guild, with its volume"""
+        return f'-vn -filter:a "volume={self.volumes.get(guild_id, DEFAULT_VOLUME)}"'
+
+    def create_audio_source(self, guild_id, path_or_url, before_options=None, options=None):
+        """Create an FFmpeg audio source, decoded in an audio worker process when enabled"""
+        if self.audio_workers:
+            return self.audio_workers.create_source(guild_id, path_or_url, before_options, options,
+                                                    bitrate=self.get_guild_bitrate(guild_id))
+        kwargs = {}
+        if before_options:
+            kwargs['before_options'] = before_options
+        if options:
+            kwargs['options'] = options
+        return discord.FFmpegPCMAudio(path_or_url, **kwargs)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Index the local library once the bot is up"""
+        # With several shard processes sharing one library index, only the
+        # process owning shard 0 rescans it; the others just read
+        if self.library and is_primary_process(self.bot) and not self.scheduler.is_scheduled(('library_scan',)):
+            self.scheduler.schedule(('library_scan',), 0, call_music, self.bot, 'scan_library')
+
+    async def scan_library(self, reschedule=True):
+        """Incrementally rescan the local library in the thread pool"""
+        if not self.library:
+            return None
+        try:
+            loop = asyncio.get_event_loop()
+            stats = await loop.run_in_executor(self.executor, self.library.scan)
+            log.info(f"💽 Library scan: {stats['added']} added, {stats['updated']} updated, "
+                  f"{stats['removed']} removed in {stats['seconds']}s")
+            return stats
+        except Exception as e:
+            log.warning(f"Library scan error: {e}")
+            return None
+        finally:
+            if reschedule:
+                self.scheduler.schedule(('library_scan',), LIBRARY_RESCAN_MINUTES * 60,
+                                        call_music, self.bot, 'scan_library')
+
+    async def search_local_library(self, query, max_results=5):
+        """Search the local library index"""
+        if self.library.last_scan is None and is_primary_process(self.bot):
+            await self.scan_library(reschedule=False)
+        loop = asyncio.get_event_loop()
+        with self.timings.span('search', cache_hit=True):
+            return await loop.run_in_executor(self.executor, self.library.search, query, max_results)
+
+    def get_safe_filename(self, url, tier):
+        """Generate a safe filename from URL and quality tier"""
         import hashlib
         url_hash = hashlib.md5(url.encode()).hexdigest()[:10]
-        return f"downloads/audio_{url_hash}.mp3"
+        return f"downloads/audio_{url_hash}_{tier}k.mp3"
+
+    def find_cached_file(self, url, tier):
+        """Find a downloaded file for a URL at this tier or higher"""
+        for cached_tier in QUALITY_TIERS:
+            if cached_tier < tier:
+                continue
+            filename = self.get_safe_filename(url, cached_tier)
+            if os.path.exists(filename):
+                return filename
+        return None
 
-    async def download_audio(self, url, title="Unknown"):
-        """Download audio file from URL"""
+    def get_guild_bitrate(self, guild_id):
+        """Get the bitrate of the voice channel the bot is connected to in a guild"""
+        voice = discord.utils.get(self.bot.voice_clients, guild__id=guild_id)
+        if voice and voice.channel:
+            return getattr(voice.channel, 'bitrate', None)
+        return None
+
+    async def download_audio(self, url, title="Unknown", bitrate=None):
+        """Download audio file from URL, matched to the voice channel bitrate"""
         if not YT_DLP_AVAILABLE:
-            print(f"yt-dlp not available, cannot download: {title}")
+            log.warning(f"yt-dlp not available, cannot download: {title}")
             return None
 
         try:
-            filename = self.get_safe_filename(url)
+            tier = get_quality_tier(bitrate)
 
-            # Check if already downloaded
-            if os.path.exists(filename):
-                return filename
+            # Check if already downloaded at this quality or better
+            cached_file = self.find_cached_file(url, tier)
+            if cached_file:
+                self.timings.record('download', 0.0, cache_hit=True)
+                MUSIC_DOWNLOADS.inc('cache_hit')
+                return cached_file
+
+            filename = self.get_safe_filename(url, tier)
 
             # Download options optimized for speed and reliability
             download_opts = {
-                'format': 'bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio/best',
+                'format': build_format_selector(tier),
                 'outtmpl': filename,
                 'extractaudio': True,
                 'audioformat': 'mp3',
-                'audioquality': '192K',
                 'quiet': True,
                 'no_warnings': True,
                 'ignoreerrors': True,
@@ -451,26 +737,43 @@ class Music(commands.Cog):
 
             # Run download in thread pool to avoid blocking
             loop = asyncio.get_event_loop()
-            await loop.run_in_executor(self.executor, self._download_sync, url, download_opts)
+            info = await loop.run_in_executor(self.executor, self._download_sync, url, download_opts, time.perf_counter())
+
+            # The selector falls back to streams below the tier; name the file by what
+            # was really downloaded so find_cached_file never passes it off as better
+            abr = info.get('abr') if info else None
+            if abr and os.path.exists(filename) and stream_tier(abr) != tier:
+                actual_filename = self.get_safe_filename(url, stream_tier(abr))
+                os.replace(filename, actual_filename)
+                filename = actual_filename
 
             if os.path.exists(filename):
-                print(f"✅ Downloaded: {title}")
+                log.info(f"✅ Downloaded: {title}", extra={'stage': 'download'})
+                MUSIC_DOWNLOADS.inc('downloaded')
                 return filename
             else:
-                print(f"❌ Download failed: {title}")
+                log.warning(f"❌ Download failed: {title}", extra={'stage': 'download'})
+                MUSIC_DOWNLOADS.inc('failed')
                 return None
 
         except Exception as e:
-            print(f"Download error for {title}: {e}")
+            log.warning(f"Download error for {title}: {e}", extra={'stage': 'download'})
+            MUSIC_DOWNLOADS.inc('failed')
             return None
 
-    def _download_sync(self, url, opts):
-        """Synchronous download function for thread pool"""
+    def _download_sync(self, url, opts, submitted_at=None):
+        """Synchronous download function for thread pool; returns the downloaded format's info"""
+        started = time.perf_counter()
+        if submitted_at is not None:
+            self.timings.record('download_queue_wait', started - submitted_at)
         try:
             with yt_dlp.YoutubeDL(opts) as ydl:
-                ydl.download([url])
+                return ydl.extract_info(url, download=True)
         except Exception as e:
-            print(f"Sync download error: {e}")
+            log.warning(f"Sync download error: {e}", extra={'stage': 'download'})
+            return None
+        finally:
+            self.timings.record('download', time.perf_counter() - started, cache_hit=False)
 
     async def download_in_background(self, guild_id, songs_to_download):
         """Download multiple songs in background for auto-play"""
@@ -483,21 +786,22 @@ class Music(commands.Cog):
         for title, url in songs_to_download:
             if url not in self.download_tasks[guild_id]:
                 self.download_tasks[guild_id].add(url)
-                # Start download task
+                # Start download task, keeping a reference until it finishes
                 task = asyncio.create_task(self._background_download_task(guild_id, title, url))
-                # Don't await, let it run in background
+                self.background_tasks.add(task)
+                task.add_done_callback(self.background_tasks.discard)
 
     async def _background_download_task(self, guild_id, title, url):
         """Background task for downloading a single song"""
         try:
-            filename = await self.download_audio(url, title)
+            filename = await self.download_audio(url, title, self.get_guild_bitrate(guild_id))
             if filename:
                 if guild_id not in self.downloaded_files:
                     self.downloaded_files[guild_id] = {}
                 self.downloaded_files[guild_id][url] = filename
-                print(f"🎵 Background downloaded: {title}")
+                log.info(f"🎵 Background downloaded: {title}", extra={'guild': guild_id, 'stage': 'download'})
         except Exception as e:
-            print(f"Background download error for {title}: {e}")
+            log.warning(f"Background download error for {title}: {e}", extra={'guild': guild_id, 'stage': 'download'})
         finally:
             # Remove from active downloads
             if guild_id in self.download_tasks:
@@ -505,42 +809,37 @@ class Music(commands.Cog):
 
     def schedule_file_cleanup(self, guild_id, url, filename, delay_minutes=5):
         """Schedule a file for deletion after specified delay"""
-        if guild_id not in self.cleanup_tasks:
-            self.cleanup_tasks[guild_id] = {}
-
-        # Cancel existing cleanup task if it exists
-        if url in self.cleanup_tasks[guild_id]:
-            self.cleanup_tasks[guild_id][url].cancel()
+        # Rescheduling the same key replaces the previous expiry
+        self.scheduler.schedule(('file_expiry', guild_id, url), delay_minutes * 60,
+                                call_music, self.bot, '_expire_file', guild_id, url, filename)
 
-        # Schedule new cleanup task
-        task = asyncio.create_task(self._cleanup_after_delay(guild_id, url, filename, delay_minutes * 60))
-        self.cleanup_tasks[guild_id][url] = task
-
-    async def _cleanup_after_delay(self, guild_id, url, filename, delay_seconds):
-        """Delete file after delay"""
+    def _expire_file(self, guild_id, url, filename):
+        """Delete an expired downloaded file"""
         try:
-            await asyncio.sleep(delay_seconds)
-
             # Check if file still exists and remove it
             if os.path.exists(filename):
                 os.remove(filename)
-                print(f"🗑️ Auto-deleted: {filename}")
+                log.debug(f"🗑️ Auto-deleted: {filename}", extra={'guild': guild_id, 'stage': 'file_expiry'})
 
             # Remove from tracking
             if (guild_id in self.downloaded_files and
                 url in self.downloaded_files[guild_id]):
                 del self.downloaded_files[guild_id][url]
 
-            # Remove cleanup task from tracking
-            if (guild_id in self.cleanup_tasks and
-                url in self.cleanup_tasks[guild_id]):
-                del self.cleanup_tasks[guild_id][url]
-
-        except asyncio.CancelledError:
-            # Task was cancelled, don't delete file
-            pass
         except Exception as e:
-            print(f"Cleanup error for {filename}: {e}")
+            log.warning(f"Cleanup error for {filename}: {e}", extra={'guild': guild_id, 'stage': 'file_expiry'})
+
+    def schedule_idle_disconnect(self, guild_id, delay_seconds=IDLE_DISCONNECT_SECONDS):
+        """Disconnect from voice if nothing plays for a while"""
+        self.scheduler.schedule(('idle_disconnect', guild_id), delay_seconds,
+                                call_music, self.bot, '_disconnect_if_idle', guild_id)
+
+    async def _disconnect_if_idle(self, guild_id):
+        """Leave the voice channel if playback has not resumed"""
+        voice = discord.utils.get(self.bot.voice_clients, guild__id=guild_id)
+        if voice and voice.is_connected() and not voice.is_playing() and not voice.is_paused():
+            await voice.disconnect()
+            log.info("💤 Disconnected from idle voice channel", extra={'guild': guild_id})
 
     async def search_youtube(self, query):
         """Search for music on YouTube"""
@@ -548,7 +847,7 @@ class Music(commands.Cog):
             return None
 
         try:
-            with yt_dlp.YoutubeDL(YDL_OPTIONS) as ydl:
+            with yt_dlp.YoutubeDL(YDL_OPTIONS) as ydl, self.timings.span('search'):
                 info = ydl.extract_info(f"ytsearch:{query}", download=False)
                 if 'entries' in info and len(info['entries']) > 0:
                     entry = info['entries'][0]
@@ -559,7 +858,7 @@ class Music(commands.Cog):
                         'uploader': entry.get('uploader', 'Unknown')
                     }
         except Exception as e:
-            print(f"Search error: {e}")
+            log.warning(f"Search error: {e}")
             return None
 
     async def search_youtube_multiple(self, query, max_results=5):
@@ -581,7 +880,8 @@ class Music(commands.Cog):
 
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 search_query = f"ytsearch{max_results}:{query}"
-                info = ydl.extract_info(search_query, download=False)
+                with self.timings.span('search'):
+                    info = ydl.extract_info(search_query, download=False)
 
                 if not info or 'entries' not in info or not info['entries']:
                     return []
@@ -599,7 +899,7 @@ class Music(commands.Cog):
 
                 return results
         except Exception as e:
-            print(f"Multiple search error: {e}")
+            log.warning(f"Multiple search error: {e}")
             return []
 
     async def play_selected_song(self, ctx, selected_song, voice_channel):
@@ -613,8 +913,11 @@ class Music(commands.Cog):
             )
             await ctx.edit(embed=download_embed)
 
-            # Download the song first
-            downloaded_file = await self.download_audio(selected_song['url'], selected_song['title'])
+            # Download the song first (local library files are already on disk)
+            if is_local_url(selected_song['url']):
+                downloaded_file = self.library.path_for(selected_song['url']) if self.library else None
+            else:
+                downloaded_file = await self.download_audio(selected_song['url'], selected_song['title'], voice_channel.bitrate)
 
             # Connect to voice channel
             voice = discord.utils.get(self.bot.voice_clients, guild=ctx.guild)
@@ -641,7 +944,7 @@ class Music(commands.Cog):
 
             # Add to queue and track download
             self.queue[ctx.guild.id].append((selected_song['title'], selected_song['url']))
-            if downloaded_file:
+            if downloaded_file and not is_local_url(selected_song['url']):
                 self.downloaded_files[ctx.guild.id][selected_song['url']] = downloaded_file
 
             # Track the song for potential auto-play recommendations
@@ -682,7 +985,8 @@ class Music(commands.Cog):
             await ctx.edit(embed=error_embed)
 
     @slash_command(description="🎵 Play music from YouTube with interactive controls")
-    async def play(self, ctx, *, query: Option(str, "Song name or YouTube URL")):
+    async def play(self, ctx, *, query: Option(str, "Song name, YouTube URL, or local:<search> for the local library"),
+                   source: Option(str, "Where to search", choices=["youtube", "local"], default="youtube")):
         """Play music with interactive controls (use auto-play button to enable auto-play)"""
 
         # Check all dependencies at runtime
@@ -717,8 +1021,22 @@ class Music(commands.Cog):
         # Get voice channel for later use
         voice_channel = ctx.author.voice.channel
 
+        # Local library search via "local:<search>" or source:local
+        use_local = source == "local" or query.lower().startswith('local:')
+        if query.lower().startswith('local:'):
+            query = query[len('local:'):].strip()
+
+        if use_local and not self.library:
+            error_embed = discord.Embed(
+                title="❌ Local Library Unavailable",
+                description="No local music library is configured on this bot (set `MUSIC_LIBRARY_DIR`).",
+                color=0xFF0000
+            )
+            await ctx.edit(embed=error_embed)
+            return
+
         # Check if it's a direct YouTube URL
-        if 'youtube.com' in query or 'youtu.be' in query:
+        if not use_local and ('youtube.com' in query or 'youtu.be' in query):
             # Direct URL - extract info and play immediately
             ydl_opts = {
                 'format': 'bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio/best',
@@ -732,7 +1050,8 @@ class Music(commands.Cog):
 
             try:
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(query, download=False)
+                    with self.timings.span('extraction'):
+                        info = ydl.extract_info(query, download=False)
                     selected_song = {
                         'title': info['title'],
                         'url': info['webpage_url'],
@@ -752,7 +1071,10 @@ class Music(commands.Cog):
                 return
         else:
             # Search query - show multiple results
-            search_results = await self.search_youtube_multiple(query, 5)
+            if use_local:
+                search_results = await self.search_local_library(query, 5)
+            else:
+                search_results = await self.search_youtube_multiple(query, 5)
 
             if not search_results:
                 error_embed = discord.Embed(
@@ -788,11 +1110,173 @@ class Music(commands.Cog):
             await ctx.edit(embed=embed, view=view)
             return
 
+    def _on_first_packet(self, guild_id, elapsed, cache_hit):
+        """Called from the voice thread when a track delivers its first packet"""
+        self.timings.record('first_packet', elapsed, cache_hit)
+        ended_at = self.track_ended_at.pop(guild_id, None)
+        if ended_at is not None:
+            self.timings.record('track_gap', time.perf_counter() - ended_at, cache_hit)
+
+    def _on_track_end(self, ctx, voice, source):
+        """Called from the voice thread when a track finishes"""
+        self.track_ended_at[ctx.guild.id] = time.perf_counter()
+        playing = self.now_playing.get(ctx.guild.id)
+        if playing and playing['source'] is source:
+            del self.now_playing[ctx.guild.id]
+        asyncio.run_coroutine_threadsafe(self.play_next(ctx, voice), self.bot.loop)
+
+    def ensure_watchdog(self):
+        """Start the playback watchdog if it is not already scheduled"""
+        if not self.scheduler.is_scheduled(('playback_watchdog',)):
+            self.scheduler.schedule(('playback_watchdog',), WATCHDOG_INTERVAL_SECONDS,
+                                    call_music, self.bot, '_check_playback')
+
+    def _check_playback(self):
+        """Look for guilds whose voice client is playing but receiving no frames"""
+        now = time.monotonic()
+        for guild_id, playing in list(self.now_playing.items()):
+            source = playing['source']
+            voice = discord.utils.get(self.bot.voice_clients, guild__id=guild_id)
+            if not voice or not voice.is_connected():
+                del self.now_playing[guild_id]
+                continue
+            if voice.is_paused():
+                source.touch()
+                continue
+            if voice.is_playing() and not source.recovering and now - source.last_frame_at > STALL_THRESHOLD_SECONDS:
+                stats = self.watchdog_stats.setdefault(guild_id, {'stalls': 0, 'recoveries': 0, 'failures': 0})
+                stats['stalls'] += 1
+                log.warning(f"⚠️ Playback stalled at {source.position:.1f}s: {playing['title']}", extra={'guild': guild_id, 'stage': 'watchdog'})
+                source.recovering = True
+                task = asyncio.create_task(self._recover_playback(guild_id, voice, playing))
+                self.background_tasks.add(task)
+                task.add_done_callback(self.background_tasks.discard)
+
+        if self.now_playing:
+            self.ensure_watchdog()
+
+    def _resolve_stream_url(self, url, tier):
+        """Resolve a fresh streaming URL (runs in the thread pool)"""
+        ydl_opts = {
+            'format': build_format_selector(tier),
+            'quiet': True,
+            'no_warnings': True,
+            'noplaylist': True,
+            'nocheckcertificate': True,
+            'extractor_args': {
+                'youtube': {
+                    'skip': ['dash', 'hls'],
+                    'player_client': ['android', 'web']
+                }
+            },
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+            return info.get('url') if info else None
+
+    async def _rebuild_source(self, guild_id, voice, playing, position):
+        """A new source for the playing track starting at position, from the cached file or a fresh URL.
+
+        Returns (source, whether it came from a file).
+        """
+        options = self.audio_options(guild_id)
+        tier = get_quality_tier(voice.channel.bitrate if voice.channel else None)
+        if is_local_url(playing['url']):
+            cached_file = self.library.path_for(playing['url']) if self.library else None
+        else:
+            cached_file = self.find_cached_file(playing['url'], tier)
+        if cached_file:
+            return self.create_audio_source(guild_id, cached_file, before_options=f'-ss {position:.2f}', options=options), True
+
+        loop = asyncio.get_event_loop()
+        audio_url = await loop.run_in_executor(self.executor, self._resolve_stream_url, playing['url'], tier)
+        if not audio_url:
+            raise Exception("Could not resolve a fresh stream URL")
+        return self.create_audio_source(
+            guild_id,
+            audio_url,
+            before_options=f'-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -nostdin -ss {position:.2f}',
+            options=options
+        ), False
+
+    async def _recover_playback(self, guild_id, voice, playing):
+        """Rebuild a stalled source at its last position"""
+        source = playing['source']
+        stats = self.watchdog_stats[guild_id]
+        position = source.position
+
+        try:
+            new_source, cached = await self._rebuild_source(guild_id, voice, playing, position)
+
+            if self.now_playing.get(guild_id) is not playing:
+                new_source.cleanup()  # Track changed while we were rebuilding
+                return
+
+            source.replace(new_source)
+            stats['recoveries'] += 1
+            log.info(f"✅ Recovered playback at {position:.1f}s ({'cache' if cached else 'stream'})",
+                     extra={'guild': guild_id, 'stage': 'watchdog'})
+
+        except Exception as e:
+            stats['failures'] += 1
+            log.error(f"❌ Playback recovery failed: {e}", extra={'guild': guild_id, 'stage': 'watchdog'})
+            # Kill the stalled FFmpeg so the track ends and the queue moves on
+            source.source.cleanup()
+        finally:
+            source.recovering = False
+
+    def playing_source(self, guild_id):
+        """The playing TimedAudioSource and its voice client, or (None, None)"""
+        playing = self.now_playing.get(guild_id)
+        voice = discord.utils.get(self.bot.voice_clients, guild__id=guild_id)
+        if not playing or not voice or not voice.is_connected() or playing['source'].recovering:
+            return None, None
+        return playing['source'], voice
+
+    async def seek_playing(self, guild_id, position):
+        """Jump the playing track to position; False if nothing is playing"""
+        source, voice = self.playing_source(guild_id)
+        if source is None:
+            return False
+        # Audio workers restart their own FFmpeg, with no new extraction
+        if self.audio_workers and self.audio_workers.seek(guild_id, position):
+            source.moved_to(position)
+            source.touch()
+            return True
+        return await self.restart_playing(guild_id, voice, position)
+
+    async def apply_volume(self, guild_id):
+        """Apply the guild's volume to the playing track; False if nothing is playing"""
+        source, voice = self.playing_source(guild_id)
+        if source is None:
+            return False
+        # Workers restart FFmpeg where they are, so the buffered audio plays out first
+        if self.audio_workers and self.audio_workers.volume(guild_id, self.volumes.get(guild_id, DEFAULT_VOLUME)):
+            return True
+        return await self.restart_playing(guild_id, voice, source.position)
+
+    async def restart_playing(self, guild_id, voice, position):
+        """Rebuild the playing track's source at position with the guild's current options"""
+        playing = self.now_playing[guild_id]
+        source = playing['source']
+        source.recovering = True  # Keep the watchdog off the source while it restarts
+        try:
+            new_source, _ = await self._rebuild_source(guild_id, voice, playing, position)
+            if self.now_playing.get(guild_id) is not playing:
+                new_source.cleanup()
+                return False
+            source.replace(new_source)
+            source.moved_to(position)
+            return True
+        finally:
+            source.touch()
+            source.recovering = False
+
     async def play_next(self, ctx, voice):
         """Play the next song in queue - using downloaded files when available"""
         # Check if voice is still connected
         if not voice or not voice.is_connected():
-            print("Voice client disconnected, cannot continue playing")
+            log.warning("Voice client disconnected, cannot continue playing")
             return
 
         if ctx.guild.id not in self.queue or not self.queue[ctx.guild.id]:
@@ -800,7 +1284,7 @@ class Music(commands.Cog):
             if hasattr(self, 'auto_play_mode') and ctx.guild.id in getattr(self, 'auto_play_mode', {}):
                 last_played = getattr(self, 'auto_play_mode', {}).get(ctx.guild.id)
                 if last_played:
-                    print(f"Auto-play mode: Getting recommendations for {last_played}")
+                    log.debug(f"Auto-play mode: Getting recommendations for {last_played}", extra={'guild': ctx.guild.id})
                     new_recommendations = await self.get_youtube_recommendations(last_played)
                     if new_recommendations:
                         # Initialize queue if it doesn't exist
@@ -813,7 +1297,7 @@ class Music(commands.Cog):
                             self.queue[ctx.guild.id].append((rec['title'], rec['webpage_url']))
                             songs_to_add.append((rec['title'], rec['webpage_url']))
 
-                        print(f"Auto-play: Added {len(new_recommendations)} recommendations")
+                        log.info(f"Auto-play: Added {len(new_recommendations)} recommendations")
 
                         # Start background downloads for auto-play songs
                         if songs_to_add:
@@ -822,12 +1306,18 @@ class Music(commands.Cog):
                         # Continue playing
                         if self.queue[ctx.guild.id]:
                             await self.play_next(ctx, voice)
+                            return
                     else:
-                        print("Auto-play: No recommendations found, stopping")
+                        log.info("Auto-play: No recommendations found, stopping")
+
+            # Queue finished, so the next track start is not an inter-track gap
+            self.track_ended_at.pop(ctx.guild.id, None)
+            self.schedule_idle_disconnect(ctx.guild.id)
             return
 
         title, url = self.queue[ctx.guild.id].pop(0)
         self.current_song[ctx.guild.id] = title
+        self.scheduler.cancel(('idle_disconnect', ctx.guild.id))
 
         # Track for auto-play mode
         if not hasattr(self, 'auto_play_mode'):
@@ -849,33 +1339,54 @@ class Music(commands.Cog):
 
                     # Start downloading these in background
                     await self.download_in_background(ctx.guild.id, songs_to_add)
-                    print(f"Auto-play: Queued and downloading {len(songs_to_add)} more songs")
+                    log.info(f"Auto-play: Queued and downloading {len(songs_to_add)} more songs")
             except Exception as e:
-                print(f"Auto-play recommendation error: {e}")
+                log.warning(f"Auto-play recommendation error: {e}")
 
         # Check if we have a downloaded file first
         audio_source = None
         duration = 0
         thumbnail = ''
         using_downloaded = False
+        using_local = False
+        tier = get_quality_tier(voice.channel.bitrate if voice.channel else None)
+
+        # Local library tracks play straight from disk, with no extraction
+        if is_local_url(url):
+            local_path = self.library.path_for(url) if self.library else None
+            if not local_path:
+                log.warning(f"⚠️ Local file is no longer in the library: {title}", extra={'guild': ctx.guild.id, 'stage': 'local'})
+                await self.play_next(ctx, voice)
+                return
+            with self.timings.span('ffmpeg_spawn', cache_hit=True):
+                audio_source = self.create_audio_source(ctx.guild.id, local_path, options=self.audio_options(ctx.guild.id))
+            using_local = True
+            local_track = self.library.get(url)
+            duration = local_track['duration'] if local_track else 0
+            log.info(f"💽 Playing from local library: {title}", extra={'guild': ctx.guild.id, 'stage': 'play'})
+
+        # Any cached file at this tier or higher can be reused, even from another guild
+        downloaded_file = None if using_local else self.find_cached_file(url, tier)
+        if downloaded_file:
+            if ctx.guild.id not in self.downloaded_files:
+                self.downloaded_files[ctx.guild.id] = {}
+            self.downloaded_files[ctx.guild.id][url] = downloaded_file
 
-        if (ctx.guild.id in self.downloaded_files and
-            url in self.downloaded_files[ctx.guild.id]):
-
-            downloaded_file = self.downloaded_files[ctx.guild.id][url]
             if os.path.exists(downloaded_file):
                 try:
                     # Use downloaded file - much more reliable!
-                    audio_source = discord.FFmpegPCMAudio(
-                        downloaded_file,
-                        options='-vn -filter:a "volume=0.5"'
-                    )
+                    with self.timings.span('ffmpeg_spawn', cache_hit=True):
+                        audio_source = self.create_audio_source(
+                            ctx.guild.id,
+                            downloaded_file,
+                            options=self.audio_options(ctx.guild.id)
+                        )
                     using_downloaded = True
-                    print(f"✅ Playing from downloaded file: {title}")
+                    log.info(f"✅ Playing from downloaded file: {title}", extra={'guild': ctx.guild.id, 'stage': 'play'})
 
                     # Get metadata from downloaded file for duration
                     try:
-                        with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
+                        with yt_dlp.YoutubeDL({'quiet': True}) as ydl, self.timings.span('extraction', cache_hit=True):
                             info = ydl.extract_info(url, download=False)
                             duration = info.get('duration', 0)
                             thumbnail = info.get('thumbnail', '')
@@ -883,16 +1394,16 @@ class Music(commands.Cog):
                         pass  # Metadata not critical for playback
 
                 except Exception as e:
-                    print(f"Failed to play downloaded file: {e}")
+                    log.warning(f"Failed to play downloaded file: {e}", extra={'guild': ctx.guild.id, 'stage': 'play'})
                     audio_source = None
 
         # Fallback to streaming if download not available
         if not audio_source:
-            print(f"⚠️ No download available for {title}, streaming instead...")
+            log.info(f"⚠️ No download available for {title}, streaming instead...", extra={'guild': ctx.guild.id, 'stage': 'play'})
 
             # Get audio source with streaming fallback
             ydl_opts_play = {
-                'format': 'bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio/best',
+                'format': build_format_selector(tier),
                 'quiet': True,
                 'no_warnings': True,
                 'extractaudio': False,
@@ -930,24 +1441,25 @@ class Music(commands.Cog):
 
             try:
                 with yt_dlp.YoutubeDL(ydl_opts_play) as ydl:
-                    info = ydl.extract_info(url, download=False)
+                    with self.timings.span('extraction', cache_hit=False):
+                        info = ydl.extract_info(url, download=False)
+
+                    # Prefer the format picked by the tier selector
+                    if 'url' in info:
+                        audio_url = info['url']
 
-                    # Get the best audio format
-                    if 'formats' in info:
+                    if not audio_url and 'formats' in info:
                         for format in info['formats']:
                             if format.get('acodec') != 'none' and format.get('url'):
                                 audio_url = format['url']
                                 break
 
-                    if not audio_url and 'url' in info:
-                        audio_url = info['url']
-
                     if audio_url:
                         duration = info.get('duration', 0)
                         thumbnail = info.get('thumbnail', '')
 
             except Exception as extraction_error:
-                print(f"Streaming extraction failed: {str(extraction_error)}")
+                log.warning(f"Streaming extraction failed: {str(extraction_error)}", extra={'guild': ctx.guild.id, 'stage': 'extraction'})
 
             if not audio_url:
                 raise Exception("Could not extract audio URL for streaming")
@@ -957,7 +1469,7 @@ class Music(commands.Cog):
                 ffmpeg_options_list = [
                     {
                         'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -nostdin -user_agent "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"',
-                        'options': '-vn -filter:a "volume=0.5"'
+                        'options': self.audio_options(ctx.guild.id)
                     },
                     {
                         'before_options': '-nostdin',
@@ -968,13 +1480,14 @@ class Music(commands.Cog):
 
                 for i, ffmpeg_options in enumerate(ffmpeg_options_list):
                     try:
-                        if ffmpeg_options:
-                            audio_source = discord.FFmpegPCMAudio(audio_url, **ffmpeg_options)
-                        else:
-                            audio_source = discord.FFmpegPCMAudio(audio_url)
+                        with self.timings.span('ffmpeg_spawn', cache_hit=False):
+                            if ffmpeg_options:
+                                audio_source = self.create_audio_source(ctx.guild.id, audio_url, **ffmpeg_options)
+                            else:
+                                audio_source = self.create_audio_source(ctx.guild.id, audio_url)
                         break
                     except Exception as ffmpeg_error:
-                        print(f"FFmpeg method {i+1} failed: {str(ffmpeg_error)}")
+                        log.warning(f"FFmpeg method {i+1} failed: {str(ffmpeg_error)}", extra={'guild': ctx.guild.id, 'stage': 'ffmpeg_spawn'})
                         continue
 
                 if not audio_source:
@@ -985,8 +1498,14 @@ class Music(commands.Cog):
 
         try:
 
-            # Play audio
-            voice.play(audio_source, after=lambda e: asyncio.run_coroutine_threadsafe(self.play_next(ctx, voice), self.bot.loop))
+            # Play audio, timing the first packet and the gap since the previous track
+            audio_source = TimedAudioSource(
+                audio_source,
+                lambda elapsed, hit=using_downloaded or using_local: call_music(self.bot, '_on_first_packet', ctx.guild.id, elapsed, hit)
+            )
+            voice.play(audio_source, after=lambda e, source=audio_source: call_music(self.bot, '_on_track_end', ctx, voice, source))
+            self.now_playing[ctx.guild.id] = {'title': title, 'url': url, 'source': audio_source}
+            self.ensure_watchdog()
 
             # Schedule file cleanup for downloaded files (5 minutes after song starts)
             if using_downloaded and ctx.guild.id in self.downloaded_files and url in self.downloaded_files[ctx.guild.id]:
@@ -994,11 +1513,14 @@ class Music(commands.Cog):
                 # Calculate cleanup time: song duration + 5 minutes buffer
                 cleanup_delay = max(5, (duration // 60) + 5) if duration else 5
                 self.schedule_file_cleanup(ctx.guild.id, url, downloaded_file, cleanup_delay)
-                print(f"🕒 Scheduled cleanup for {title} in {cleanup_delay} minutes")
+                log.debug(f"🕒 Scheduled cleanup for {title} in {cleanup_delay} minutes", extra={'guild': ctx.guild.id})
 
             # Now playing embed with source status
-            source_icon = "💾" if using_downloaded else "🌐"
-            source_text = "Downloaded" if using_downloaded else "Streaming"
+            if using_local:
+                source_icon, source_text = "💽", "Local library"
+            else:
+                source_icon = "💾" if using_downloaded else "🌐"
+                source_text = "Downloaded" if using_downloaded else "Streaming"
 
             embed = discord.Embed(
                 title="🎵 Now Playing",
@@ -1021,11 +1543,12 @@ class Music(commands.Cog):
             embed.set_footer(text=f"🎵 Use the buttons below to control playback • Mobile optimized{auto_play_status}{cleanup_info}")
 
             view = MusicControls(self.bot)
-            await ctx.edit(embed=embed, view=view)
+            with self.timings.span('embed_edit'):
+                await ctx.edit(embed=embed, view=view)
 
         except Exception as e:
             error_msg = str(e)
-            print(f"Playback error for {title}: {error_msg}")
+            log.warning(f"Playback error for {title}: {error_msg}", extra={'guild': ctx.guild.id, 'stage': 'play'})
 
             # Provide user-friendly error messages
             if "Sign in to confirm you're not a bot" in error_msg or "not a bot" in error_msg.lower():
@@ -1067,8 +1590,7 @@ class Music(commands.Cog):
 
                 # Disconnect after error if no more songs
                 if voice and voice.is_connected():
-                    await asyncio.sleep(5)
-                    await voice.disconnect()
+                    self.schedule_idle_disconnect(ctx.guild.id, 5)
 
     @slash_command(description="📝 View the music queue with interactive navigation")
     async def queue(self, ctx):
@@ -1090,7 +1612,7 @@ class Music(commands.Cog):
             # Interaction already responded to or expired
             pass
         except Exception as e:
-            print(f"Queue command error: {e}")
+            log.warning(f"Queue command error: {e}")
             await ctx.respond("❌ An error occurred while displaying the queue!", ephemeral=True)
 
     @slash_command(description="⏹️ Stop music and clear queue")
@@ -1116,6 +1638,46 @@ class Music(commands.Cog):
             )
             await ctx.respond(embed=embed)
 
+    @slash_command(description="⏩ Jump to a position in the current song")
+    async def seek(self, ctx, seconds: Option(int, "Position in seconds from the start of the song", min_value=0)):
+        """Seek within the playing song"""
+        await ctx.defer()
+        try:
+            moved = await self.seek_playing(ctx.guild.id, seconds)
+        except Exception as e:
+            log.warning(f"Seek failed: {e}", extra={'guild': ctx.guild.id})
+            await ctx.respond("❌ Could not seek in this song!", ephemeral=True)
+            return
+        if not moved:
+            await ctx.respond("❌ Nothing is playing right now!", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="⏩ Seeked",
+            description=f"Now playing from **{seconds // 60}:{seconds % 60:02d}**",
+            color=0x00FF00
+        )
+        await ctx.respond(embed=embed)
+
+    @slash_command(description="🔊 Change the music volume")
+    async def volume(self, ctx, level: Option(int, "Volume from 1 to 100", min_value=1, max_value=100)):
+        """Set the volume for this server's music; applies to the playing song too"""
+        await ctx.defer()
+        self.volumes[ctx.guild.id] = level / 100
+        try:
+            await self.apply_volume(ctx.guild.id)
+        except Exception as e:
+            log.warning(f"Volume change failed: {e}", extra={'guild': ctx.guild.id})
+            await ctx.respond(f"⚠️ Volume set to {level}%, it applies from the next song.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="🔊 Volume",
+            description=f"Volume set to **{level}%**",
+            color=0x00FF00
+        )
+        await ctx.respond(embed=embed)
+
     @slash_command(description="🗑️ Remove a song from the queue")
     async def remove(self, ctx, position: Option(int, "Position of song to remove (starting from 1)")):
         """Remove song from queue by position"""
@@ -1148,6 +1710,11 @@ class Music(commands.Cog):
 
     async def get_youtube_recommendations(self, video_url):
         """Get YouTube recommendations based on a video URL - simplified for better reliability"""
+        # Local library tracks get recommendations from the library itself
+        if is_local_url(video_url) and self.library:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(self.executor, self.library.recommend, video_url)
+
         if not YT_DLP_AVAILABLE:
             return []
 
@@ -1200,14 +1767,14 @@ class Music(commands.Cog):
                                             if len(related_videos) >= 5:
                                                 break
                             except Exception as search_error:
-                                print(f"Search for '{query}' failed: {search_error}")
+                                log.warning(f"Search for '{query}' failed: {search_error}")
                                 continue
 
                             if len(related_videos) >= 5:
                                 break
 
             except Exception as info_error:
-                print(f"Video info extraction failed: {info_error}")
+                log.warning(f"Video info extraction failed: {info_error}")
 
             # Fallback: Search for popular music if no recommendations found
             if not related_videos:
@@ -1223,13 +1790,13 @@ class Music(commands.Cog):
                                         'uploader': entry.get('uploader', 'Unknown')
                                     })
                 except Exception as fallback_error:
-                    print(f"Fallback search failed: {fallback_error}")
+                    log.warning(f"Fallback search failed: {fallback_error}")
 
-            print(f"Found {len(related_videos)} recommendations")
+            log.debug(f"Found {len(related_videos)} recommendations")
             return related_videos[:5]
 
         except Exception as e:
-            print(f"Recommendation error: {e}")
+            log.warning(f"Recommendation error: {e}")
             return []
 
     @slash_command(description="🎲 Advanced auto-play with custom seed song")
@@ -1292,7 +1859,7 @@ class Music(commands.Cog):
         }
 
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl, self.timings.span('extraction'):
                 if 'youtube.com' in seed_query or 'youtu.be' in seed_query:
                     info = ydl.extract_info(seed_query, download=False)
                 else:
@@ -1399,6 +1966,104 @@ class Music(commands.Cog):
         view = MusicControls(self.bot)
         await ctx.edit(embed=embed, view=view)
 
+    @slash_command(description="⏱️ Show music pipeline stage timings (admin only)")
+    async def music_timings(self, ctx, output: Option(str, "Output format", choices=["embed", "json"], default="embed")):
+        """Show per-stage timing histograms for the music pipeline"""
+        if not ctx.author.guild_permissions.administrator:
+            await ctx.respond("❌ You need administrator permission to view music timings!", ephemeral=True)
+            return
+
+        snapshot = self.timings.snapshot()
+
+        if output == "json":
+            dump = {
+                'stages': snapshot,
+                'watchdog': {str(guild_id): stats for guild_id, stats in self.watchdog_stats.items()},
+            }
+            data = json.dumps(dump, indent=2).encode()
+            await ctx.respond(file=discord.File(io.BytesIO(data), filename="music_timings.json"), ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="⏱️ Music Pipeline Timings",
+            description="p50 / p95 / max per stage, split by cache hit" if snapshot else "No timings recorded yet.",
+            color=0x1DB954
+        )
+        for stage, labels in snapshot.items():
+            lines = [
+                f"`{label}` n={hist['count']} • {hist['p50'] * 1000:.0f} / {hist['p95'] * 1000:.0f} / {hist['max'] * 1000:.0f} ms"
+                for label, hist in labels.items()
+            ]
+            embed.add_field(name=stage, value="\n".join(lines), inline=False)
+
+        watchdog = self.watchdog_stats.get(ctx.guild.id)
+        if watchdog:
+            embed.add_field(
+                name="🐕 Watchdog (this server)",
+                value=f"Stalls: {watchdog['stalls']} • Recovered: {watchdog['recoveries']} • Failed: {watchdog['failures']}",
+                inline=False
+            )
+        embed.set_footer(text="🎵 Use output:json for a machine-readable dump")
+
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @slash_command(description="💽 Rescan the local music library (admin only)")
+    async def library_scan(self, ctx):
+        """Incrementally rescan the local music library"""
+        if not ctx.author.guild_permissions.administrator:
+            await ctx.respond("❌ You need administrator permission to rescan the library!", ephemeral=True)
+            return
+
+        if not self.library:
+            await ctx.respond("❌ No local music library is configured (set `MUSIC_LIBRARY_DIR`).", ephemeral=True)
+            return
+
+        await ctx.defer(ephemeral=True)
+        stats = await self.scan_library()
+        if stats is None:
+            await ctx.respond("❌ Library scan failed, check the logs.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="💽 Library Scan Complete",
+            description=f"**{self.library.count()}** tracks indexed in {stats['seconds']}s",
+            color=0x00FF00
+        )
+        embed.add_field(name="➕ Added", value=str(stats['added']), inline=True)
+        embed.add_field(name="✏️ Updated", value=str(stats['updated']), inline=True)
+        embed.add_field(name="➖ Removed", value=str(stats['removed']), inline=True)
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @slash_command(description="🔊 Show audio worker process status (admin only)")
+    async def audio_workers_status(self, ctx):
+        """Show per-process stream counts and CPU for the audio worker pool"""
+        if not ctx.author.guild_permissions.administrator:
+            await ctx.respond("❌ You need administrator permission to view audio workers!", ephemeral=True)
+            return
+
+        if not self.audio_workers:
+            await ctx.respond("ℹ️ Audio workers are disabled; playback runs in the bot process (set `AUDIO_WORKERS` to enable).", ephemeral=True)
+            return
+
+        statuses = await self.audio_workers.status(asyncio.get_event_loop())
+        embed = discord.Embed(
+            title="🔊 Audio Workers",
+            description=f"**{len(statuses)}** of **{self.audio_workers.size}** workers running",
+            color=0x3498DB
+        )
+        for status in statuses:
+            if 'error' in status:
+                embed.add_field(name="⚠️ Worker", value=status['error'], inline=False)
+                continue
+            streams = status['streams']
+            here = [stream for stream in streams if stream['guild_id'] == ctx.guild.id]
+            value = f"PID {status['pid']} • {len(streams)} streams • {status['cpu_seconds']}s CPU"
+            if here:
+                value += f"\nThis server: {here[0]['position']:.0f}s{' (paused)' if here[0]['paused'] else ''}"
+            embed.add_field(name=f"Worker {status['worker']}", value=value, inline=False)
+
+        await ctx.respond(embed=embed, ephemeral=True)
+
     @slash_command(description="🧹 Clean up downloaded music files")
     async def cleanup(self, ctx):
         """Clean up downloaded music files to free space"""
@@ -1420,11 +2085,8 @@ class Music(commands.Cog):
                 if ctx.guild.id in self.downloaded_files:
                     del self.downloaded_files[ctx.guild.id]
 
-                # Cancel all scheduled cleanup tasks for this guild
-                if ctx.guild.id in self.cleanup_tasks:
-                    for task in self.cleanup_tasks[ctx.guild.id].values():
-                        task.cancel()
-                    del self.cleanup_tasks[ctx.guild.id]
+                # Cancel all scheduled cleanups for this guild
+                self.scheduler.cancel_prefix('file_expiry', ctx.guild.id)
 
                 size_mb = total_size / (1024 * 1024)
 
@@ -1454,7 +2116,7 @@ def setup(bot):
     try:
         music_cog = Music(bot)
         bot.add_cog(music_cog)
-        print("✅ Music cog loaded successfully")
-        print("  ↳ Dependencies will be checked when commands are used")
+        log.info("✅ Music cog loaded successfully")
+        log.info("  ↳ Dependencies will be checked when commands are used")
     except Exception as e:
-        print(f"⚠️ Music cog failed to load: {e}")
\ No newline at end of file
+        log.warning(f"⚠️ Music cog failed to load: {e}")
\ No newline at end of file
@@ -0,0 +1,407 @@
+"""Fake yt-dlp, voice client, bot and interactions used by the offline benchmarks"""
+import functools
+import math
+import os
+import re
+import shutil
+import struct
+import sys
+import threading
+import time
+import types
+import wave
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+SAMPLE_RATE = 48000
+FRAME_SECONDS = 0.02  # Discord sends one 20ms Opus frame per packet
+
+
+def write_tone(path, seconds, frequency):
+    """Write a stereo 16-bit sine tone WAV file"""
+    frames = int(SAMPLE_RATE * seconds)
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        chunk = bytearray()
+        for i in range(frames):
+            sample = int(8000 * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE))
+            chunk += struct.pack('<hh', sample, sample)
+        wav.writeframes(bytes(chunk))
+
+
+class AudioServer:
+    """Local HTTP stand-in for the media CDN, serving fixture audio files"""
+
+    def __init__(self, directory):
+        handler = functools.partial(QuietHandler, directory=directory)
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureLibrary:
+    """Canned yt-dlp info dicts backed by local audio files"""
+
+    def __init__(self, audio_dir, base_url, track_count=50, track_seconds=2.0, stream_every=0,
+                 extract_latency=0.05, download_latency=0.2, variants=4):
+        self.audio_dir = audio_dir
+        self.extract_latency = extract_latency
+        self.download_latency = download_latency
+        self.tracks = []
+        self.by_webpage_url = {}
+
+        for n in range(variants):
+            write_tone(os.path.join(audio_dir, f"tone{n}.wav"), track_seconds, 220 * (n + 1))
+
+        for i in range(track_count):
+            video_id = f"fixture{i:04d}"
+            audio_file = f"tone{i % variants}.wav"
+            audio_url = f"{base_url}/{audio_file}"
+            track = {
+                'id': video_id,
+                'title': f"Fixture Track {i}",
+                'uploader': f"Fixture Artist {i % 5}",
+                'duration': int(track_seconds),
+                'thumbnail': '',
+                'webpage_url': f"https://www.youtube.com/watch?v={video_id}",
+                'formats': [
+                    {'format_id': '249', 'acodec': 'opus', 'abr': 50, 'url': audio_url},
+                    {'format_id': '250', 'acodec': 'opus', 'abr': 70, 'url': audio_url},
+                    {'format_id': '140', 'acodec': 'mp4a.40.2', 'abr': 128, 'url': audio_url},
+                    {'format_id': '251', 'acodec': 'opus', 'abr': 130, 'url': audio_url},
+                ],
+                # Tracks that cannot be downloaded exercise the streaming fallback
+                '_stream_only': bool(stream_every) and i % stream_every == stream_every - 1,
+                '_audio_path': os.path.join(audio_dir, audio_file),
+            }
+            self.tracks.append(track)
+            self.by_webpage_url[track['webpage_url']] = track
+
+    def public(self, track):
+        return {key: value for key, value in track.items() if not key.startswith('_')}
+
+    def search(self, terms, count):
+        """Deterministic search results for a query"""
+        start = sum(map(ord, terms)) % len(self.tracks)
+        picked = [self.tracks[(start + i) % len(self.tracks)] for i in range(count)]
+        return [self.public(track) for track in picked]
+
+    def resolve(self, url, format_selector=None):
+        """Return the info dict for a URL with a format picked like yt-dlp would"""
+        track = self.by_webpage_url.get(url)
+        if track is None:
+            raise Exception(f"Video unavailable: {url}")
+
+        info = self.public(track)
+        formats = info['formats']
+        chosen = formats[-1]
+        match = re.search(r'abr>=(\d+)', format_selector or '')
+        if match:
+            wanted = int(match.group(1))
+            opus = [f for f in formats if f['acodec'] == 'opus' and f['abr'] >= wanted]
+            if opus:
+                chosen = min(opus, key=lambda f: f['abr'])
+        info['url'] = chosen['url']
+        info['format_id'] = chosen['format_id']
+        return info
+
+    def download(self, url, destination):
+        """Copy the fixture audio to the download path"""
+        time.sleep(self.download_latency)
+        track = self.by_webpage_url.get(url)
+        if track is None or track['_stream_only']:
+            raise Exception(f"HTTP Error 403: Forbidden ({url})")
+        directory = os.path.dirname(destination)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        shutil.copyfile(track['_audio_path'], destination)
+
+
+class FakeYoutubeDL:
+    """Stand-in for yt_dlp.YoutubeDL driven by a FixtureLibrary"""
+    library = None
+
+    def __init__(self, opts=None):
+        self.opts = opts or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def extract_info(self, query, download=False):
+        time.sleep(self.library.extract_latency)
+        if query.startswith('ytsearch'):
+            prefix, _, terms = query.partition(':')
+            count = int(prefix[len('ytsearch'):] or 1)
+            return {'entries': self.library.search(terms, count)}
+        return self.library.resolve(query, self.opts.get('format'))
+
+    def download(self, urls):
+        for url in urls:
+            self.library.download(url, self.opts['outtmpl'])
+        return 0
+
+
+def install_fake_yt_dlp(library):
+    """Register a fake yt_dlp module so the Music cog imports it instead of the real one"""
+    FakeYoutubeDL.library = library
+    module = types.ModuleType('yt_dlp')
+    module.YoutubeDL = FakeYoutubeDL
+    sys.modules['yt_dlp'] = module
+    return module
+
+
+class PlaybackStats:
+    """Collects per-guild playback timings from the fake voice clients"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requested_at = {}
+        self.track_ended_at = {}
+        self.time_to_first_audio = []
+        self.track_gaps = []
+        self.tracks_started = {}
+
+    def on_request(self, guild_id):
+        self.requested_at.setdefault(guild_id, time.perf_counter())
+
+    def on_first_packet(self, guild_id):
+        now = time.perf_counter()
+        with self.lock:
+            self.tracks_started[guild_id] = self.tracks_started.get(guild_id, 0) + 1
+            requested = self.requested_at.pop(guild_id, None)
+            if requested is not None:
+                self.time_to_first_audio.append(now - requested)
+            ended = self.track_ended_at.pop(guild_id, None)
+            if ended is not None:
+                self.track_gaps.append(now - ended)
+
+    def on_track_end(self, guild_id):
+        with self.lock:
+            self.track_ended_at[guild_id] = time.perf_counter()
+
+
+class FakeVoiceClient:
+    """Voice client that reads audio frames in a thread at (scaled) real-time pace"""
+
+    def __init__(self, bot, channel, stats, speed=1.0):
+        self.bot = bot
+        self.channel = channel
+        self.guild = channel.guild
+        self.stats = stats
+        self.speed = speed
+        self.connected = True
+        self.paused = False
+        self.source = None
+        self.stop_event = None
+        self.frames = 0
+
+    def is_connected(self):
+        return self.connected
+
+    def is_playing(self):
+        return self.source is not None and not self.paused
+
+    def is_paused(self):
+        return self.source is not None and self.paused
+
+    def play(self, source, after=None):
+        if self.source is not None:
+            raise Exception("Already playing audio.")
+        self.source = source
+        self.paused = False
+        self.stop_event = threading.Event()
+        thread = threading.Thread(target=self._run, args=(source, after, self.stop_event), daemon=True)
+        thread.start()
+
+    def _run(self, source, after, stop_event):
+        frame_time = FRAME_SECONDS / self.speed
+        next_frame = time.perf_counter()
+        first = True
+        while not stop_event.is_set():
+            if self.paused:
+                time.sleep(frame_time)
+                next_frame = time.perf_counter()
+                continue
+            data = source.read()
+            if not data:
+                break
+            if first:
+                self.stats.on_first_packet(self.guild.id)
+                first = False
+            self.frames += 1
+            next_frame += frame_time
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        source.cleanup()
+        if self.source is source:
+            self.source = None
+        self.stats.on_track_end(self.guild.id)
+        if after:
+            after(None)
+
+    def stop(self):
+        if self.stop_event:
+            self.stop_event.set()
+        self.source = None
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    async def disconnect(self, force=False):
+        self.stop()
+        self.connected = False
+        if self in self.bot.voice_clients:
+            self.bot.voice_clients.remove(self)
+
+    async def move_to(self, channel):
+        self.channel = channel
+
+
+class FakeVoiceChannel:
+    def __init__(self, bot, guild, stats, speed, bitrate=64000):
+        self.bot = bot
+        self.guild = guild
+        self.stats = stats
+        self.speed = speed
+        self.bitrate = bitrate
+        self.id = guild.id * 10 + 1
+        self.name = "Benchmark Voice"
+        self.mention = f"<#{self.id}>"
+
+    async def connect(self, reconnect=True, timeout=60.0):
+        voice = FakeVoiceClient(self.bot, self, self.stats, self.speed)
+        self.bot.voice_clients.append(voice)
+        return voice
+
+
+class FakeResponse:
+    def __init__(self, owner):
+        self.owner = owner
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def edit_message(self, **kwargs):
+        self.done = True
+        self.owner.record(kwargs)
+
+    async def send_message(self, content=None, **kwargs):
+        self.done = True
+        self.owner.record(dict(kwargs, content=content))
+
+    async def defer(self, **kwargs):
+        self.done = True
+
+
+class FakeInteraction:
+    """Button interaction for a fake guild member"""
+
+    def __init__(self, guild, user):
+        self.guild = guild
+        self.user = user
+        self.response = FakeResponse(self)
+        self.messages = []
+
+    def record(self, kwargs):
+        self.messages.append(kwargs)
+
+    async def edit_original_response(self, **kwargs):
+        self.record(kwargs)
+
+
+class FakeContext:
+    """Application context for a slash command invoked by a fake member"""
+
+    def __init__(self, bot, guild, author):
+        self.bot = bot
+        self.guild = guild
+        self.author = author
+        self.channel = SimpleNamespace(id=guild.id * 10 + 2, mention=f"<#{guild.id * 10 + 2}>")
+        self.interaction = FakeInteraction(guild, author)
+        self.messages = []
+        self.last_view = None
+
+    def record(self, kwargs):
+        self.messages.append(kwargs)
+        if kwargs.get('view') is not None:
+            self.last_view = kwargs['view']
+
+    async def respond(self, content=None, **kwargs):
+        self.record(dict(kwargs, content=content))
+
+    async def edit(self, **kwargs):
+        self.record(kwargs)
+
+    async def defer(self, **kwargs):
+        pass
+
+
+class FakeBot:
+    """Just enough of commands.Bot for the Music cog"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.voice_clients = []
+        self.cogs = {}
+        self.user = SimpleNamespace(id=1, name="Benchmark", avatar=None, mention="<@1>")
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    def get_user(self, user_id):
+        return None
+
+    def get_guild(self, guild_id):
+        return None
+
+
+def make_guild(bot, guild_id, stats, speed, bitrate=64000):
+    """Create a fake guild with one member sitting in its voice channel"""
+    guild = SimpleNamespace(id=guild_id, name=f"Benchmark Guild {guild_id}")
+    channel = FakeVoiceChannel(bot, guild, stats, speed, bitrate)
+    permissions = SimpleNamespace(
+        administrator=True, manage_guild=True, manage_messages=True,
+        kick_members=True, ban_members=True, moderate_members=True, manage_roles=True
+    )
+    author = SimpleNamespace(
+        id=guild_id * 10 + 3, name=f"member{guild_id}", discriminator="0001",
+        mention=f"<@{guild_id * 10 + 3}>", voice=SimpleNamespace(channel=channel),
+        guild_permissions=permissions
+    )
+    return guild, channel, author
+
+
+async def click(view, custom_id, interaction):
+    """Press the button with a custom_id on a view"""
+    for item in view.children:
+        if getattr(item, 'custom_id', None) == custom_id:
+            await item.callback(interaction)
+            return
+    raise KeyError(custom_id)
+
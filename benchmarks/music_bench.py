@@ -0,0 +1,254 @@
+"""Offline benchmark for the Music cog.
+
+Drives /play, play_next, skip, shuffle, auto-play refills and /cleanup across
+simulated guilds with a fake yt-dlp, fake voice clients and fixture audio
+served over local HTTP. Needs py-cord and an ffmpeg binary, but no network
+and no Discord token.
+
+    python -m benchmarks.music_bench --guilds 10 --tracks 4 --json bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.fakes import (
+    AudioServer, FakeBot, FakeContext, FakeInteraction, FixtureLibrary, PlaybackStats,
+    click, install_fake_yt_dlp, make_guild
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LoopBlockMonitor:
+    """Measures how late the event loop wakes up a periodic sleeper"""
+
+    def __init__(self, interval=0.005, threshold=0.005):
+        self.interval = interval
+        self.threshold = threshold
+        self.blocked = 0.0
+        self.worst = 0.0
+        self.stalls = 0
+        self.task = None
+
+    async def run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - expected
+            if lag > self.threshold:
+                self.blocked += lag
+                self.stalls += 1
+                self.worst = max(self.worst, lag)
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+
+
+def summarize(values):
+    """p50/p95/max in milliseconds"""
+    if not values:
+        return {'count': 0, 'p50_ms': None, 'p95_ms': None, 'max_ms': None}
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        'count': len(ordered),
+        'p50_ms': round(statistics.median(ordered) * 1000, 1),
+        'p95_ms': round(p95 * 1000, 1),
+        'max_ms': round(ordered[-1] * 1000, 1),
+    }
+
+
+def cpu_seconds():
+    """CPU used by this process and its reaped children (FFmpeg)"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+async def drive_guild(music_module, cog, bot, library, stats, guild_id, args):
+    """Run one guild through the full scenario"""
+    guild, channel, author = make_guild(bot, guild_id, stats, args.speed, args.bitrate)
+    play = music_module.Music.play.callback
+
+    # /play with a search query, then pick the first result
+    ctx = FakeContext(bot, guild, author)
+    stats.on_request(guild_id)
+    await play(cog, ctx, query=f"fixture song {guild_id}")
+    if ctx.last_view is not None and ctx.last_view.children:
+        await ctx.last_view.children[0].callback(FakeInteraction(guild, author))
+
+    # Queue a few more tracks by URL
+    for offset in range(1, args.tracks):
+        track = library.tracks[(guild_id * args.tracks + offset) % len(library.tracks)]
+        await play(cog, FakeContext(bot, guild, author), query=track['webpage_url'])
+
+    controls = music_module.MusicControls(bot)
+    await wait_for(lambda: stats.tracks_started.get(guild_id, 0) >= 1, args.timeout)
+
+    await click(controls, 'shuffle', FakeInteraction(guild, author))
+    await click(controls, 'skip', FakeInteraction(guild, author))
+
+    # Turn on auto-play so the queue refills from recommendations
+    await click(controls, 'autoplay', FakeInteraction(guild, author))
+
+    target = args.tracks + args.autoplay_tracks
+    await wait_for(lambda: stats.tracks_started.get(guild_id, 0) >= target, args.timeout)
+
+    await click(controls, 'stop', FakeInteraction(guild, author))
+    return ctx
+
+
+async def wait_for(predicate, timeout):
+    deadline = time.perf_counter() + timeout
+    while not predicate() and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+
+
+async def run_benchmark(args, workdir):
+    audio_dir = os.path.join(workdir, 'fixtures')
+    os.makedirs(audio_dir)
+    server = AudioServer(audio_dir)
+    server.start()
+
+    library = FixtureLibrary(
+        audio_dir, server.base_url,
+        track_count=max(50, args.guilds * (args.tracks + args.autoplay_tracks)),
+        track_seconds=args.track_seconds, stream_every=args.stream_every,
+        extract_latency=args.extract_latency, download_latency=args.download_latency
+    )
+    install_fake_yt_dlp(library)
+
+    # Downloads go to ./downloads, so run the cog inside the scratch directory
+    os.chdir(workdir)
+    from Cogs.Music import Music as music_module
+    music_module.check_voice_dependencies = lambda: (True, "Benchmark fakes")
+
+    loop = asyncio.get_running_loop()
+    bot = FakeBot(loop)
+    stats = PlaybackStats()
+    monitor = LoopBlockMonitor()
+
+    tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0]
+    cpu_before, child_cpu_before = cpu_seconds()
+
+    cog = music_module.Music(bot)
+    bot.cogs['Music'] = cog
+
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        drive_guild(music_module, cog, bot, library, stats, guild_id, args)
+        for guild_id in range(1, args.guilds + 1)
+    ])
+    elapsed = time.perf_counter() - started
+    memory_peak = tracemalloc.get_traced_memory()[1]
+
+    # /cleanup once every guild is done
+    guild, _, author = make_guild(bot, 1, stats, args.speed)
+    cleanup_ctx = FakeContext(bot, guild, author)
+    cleanup_started = time.perf_counter()
+    await music_module.Music.cleanup.callback(cog, cleanup_ctx)
+    cleanup_seconds = time.perf_counter() - cleanup_started
+
+    monitor.stop()
+    for voice in list(bot.voice_clients):
+        await voice.disconnect()
+    await asyncio.sleep(0.2)  # Let FFmpeg processes exit and be reaped
+    cog.executor.shutdown(wait=True)
+    tracemalloc.stop()
+    server.stop()
+
+    cpu_after, child_cpu_after = cpu_seconds()
+    streams = sum(stats.tracks_started.values())
+    cpu_total = (cpu_after - cpu_before) + (child_cpu_after - child_cpu_before)
+
+    return {
+        'config': vars(args),
+        'elapsed_s': round(elapsed, 2),
+        'streams': streams,
+        'time_to_first_audio': summarize(stats.time_to_first_audio),
+        'inter_track_gap': summarize(stats.track_gaps),
+        'loop_blocking': {
+            'total_ms': round(monitor.blocked * 1000, 1),
+            'worst_ms': round(monitor.worst * 1000, 1),
+            'stalls': monitor.stalls,
+            'blocked_fraction': round(monitor.blocked / elapsed, 4) if elapsed else 0.0,
+        },
+        'cpu_ms_per_stream': round(cpu_total * 1000 / streams, 1) if streams else None,
+        'python_cpu_ms_per_stream': round((cpu_after - cpu_before) * 1000 / streams, 1) if streams else None,
+        'memory_kb_per_guild': round((memory_peak - memory_before) / 1024 / args.guilds, 1),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'cleanup_ms': round(cleanup_seconds * 1000, 1),
+        'stage_timings': cog.timings.snapshot(),
+    }
+
+
+def print_report(report):
+    print(f"🎵 Music benchmark: {report['config']['guilds']} guilds, {report['streams']} streams in {report['elapsed_s']}s")
+    for name in ('time_to_first_audio', 'inter_track_gap'):
+        row = report[name]
+        print(f"  {name:<22} n={row['count']:<4} p50={row['p50_ms']}ms p95={row['p95_ms']}ms max={row['max_ms']}ms")
+    blocking = report['loop_blocking']
+    print(f"  {'loop_blocking':<22} total={blocking['total_ms']}ms worst={blocking['worst_ms']}ms "
+          f"stalls={blocking['stalls']} ({blocking['blocked_fraction']:.1%} of run)")
+    print(f"  {'cpu_per_stream':<22} {report['cpu_ms_per_stream']}ms (python {report['python_cpu_ms_per_stream']}ms)")
+    print(f"  {'memory_per_guild':<22} {report['memory_kb_per_guild']}KB (max RSS {report['max_rss_mb']}MB)")
+    print(f"  {'cleanup':<22} {report['cleanup_ms']}ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline Music cog benchmark")
+    parser.add_argument('--guilds', type=int, default=5, help="Number of simulated guilds")
+    parser.add_argument('--tracks', type=int, default=3, help="Tracks queued per guild before auto-play")
+    parser.add_argument('--autoplay-tracks', type=int, default=2, help="Extra tracks to play from auto-play refills")
+    parser.add_argument('--track-seconds', type=float, default=2.0, help="Length of each fixture track")
+    parser.add_argument('--speed', type=float, default=4.0, help="Playback speed multiplier for the fake voice client")
+    parser.add_argument('--bitrate', type=int, default=64000, help="Voice channel bitrate in bps")
+    parser.add_argument('--stream-every', type=int, default=3, help="Every Nth fixture can only be streamed (0 = never)")
+    parser.add_argument('--extract-latency', type=float, default=0.05, help="Simulated yt-dlp extraction latency (s)")
+    parser.add_argument('--download-latency', type=float, default=0.2, help="Simulated download latency (s)")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Per-guild wait limit (s)")
+    parser.add_argument('--json', help="Write the full report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not shutil.which('ffmpeg'):
+        print("❌ ffmpeg not found on PATH - it is needed to decode the fixture audio")
+        return 1
+
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    original_cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix='music-bench-')
+    try:
+        report = asyncio.run(run_benchmark(args, workdir))
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Run the bot's shards across several processes.
+
+    python launcher.py --processes 4              # Ask Discord for the shard count
+    python launcher.py --shards 16 --processes 4  # Shards 0-3, 4-7, 8-11, 12-15
+
+Each process runs main.py with SHARD_COUNT and SHARD_IDS set, so it uses an
+AutoShardedBot that only connects its own range. Crashed processes are
+restarted with a backoff. Every process writes per-shard latency, guild and
+voice session counts to the status directory, and the launcher prints a
+combined report from those files.
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+from dotenv import load_dotenv
+
+from utils.sharding import format_shard_ids, read_shard_status, split_shards
+
+RESTART_BACKOFF_SECONDS = [5, 15, 60, 300]
+# A process that ran at least this long before exiting starts the backoff over
+HEALTHY_RUN_SECONDS = 600
+STALE_STATUS_SECONDS = 120
+
+
+def recommended_shard_count(token):
+    """Ask the Discord gateway how many shards it recommends"""
+    request = urllib.request.Request(
+        'https://discord.com/api/v10/gateway/bot',
+        headers={'Authorization': f'Bot {token}', 'User-Agent': 'DiscordBot (launcher, 1.0)'}
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)['shards']
+
+
+class ShardProcess:
+    def __init__(self, index, shard_ids, shard_count):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.process = None
+        self.restarts = 0
+        self.restart_at = None
+        self.started_at = None
+
+    @property
+    def label(self):
+        return f"shards {format_shard_ids(self.shard_ids)}/{self.shard_count}"
+
+    def start(self, status_dir):
+        env = dict(os.environ, SHARD_COUNT=str(self.shard_count), SHARD_IDS=format_shard_ids(self.shard_ids),
+                   SHARD_STATUS_DIR=status_dir)
+        if os.getenv('METRICS_PORT'):
+            # One metrics endpoint per process: METRICS_PORT, METRICS_PORT + 1, ...
+            env['METRICS_PORT'] = str(int(os.getenv('METRICS_PORT')) + self.index)
+        self.process = subprocess.Popen([sys.executable, 'main.py'], env=env)
+        self.restart_at = None
+        self.started_at = time.monotonic()
+        print(f"🚀 Started process {self.index} ({self.label}), pid {self.process.pid}")
+
+    def poll(self, status_dir):
+        """Restart the process with backoff if it exited"""
+        if self.process is None:
+            return
+        if self.restart_at is not None:
+            if time.monotonic() >= self.restart_at:
+                self.start(status_dir)
+            return
+        code = self.process.poll()
+        if code is None:
+            return
+        if time.monotonic() - self.started_at >= HEALTHY_RUN_SECONDS:
+            self.restarts = 0
+        delay = RESTART_BACKOFF_SECONDS[min(self.restarts, len(RESTART_BACKOFF_SECONDS) - 1)]
+        self.restarts += 1
+        self.restart_at = time.monotonic() + delay
+        print(f"⚠️ Process {self.index} ({self.label}) exited with code {code}, restarting in {delay}s")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.send_signal(signal.SIGINT)
+
+
+def print_shard_report(status_dir):
+    """Print latency, guild and voice session counts for every shard"""
+    now = time.time()
+    rows = []
+    for status in read_shard_status(status_dir):
+        stale = now - status['updated_at'] > STALE_STATUS_SECONDS
+        for shard in status['shards']:
+            rows.append((shard['shard_id'], status['pid'], shard, stale))
+    if not rows:
+        print("📊 No shard status reported yet")
+        return
+
+    print("📊 Shard report")
+    print(f"   {'shard':>5} {'pid':>7} {'latency':>9} {'guilds':>7} {'voice':>6}")
+    for shard_id, pid, shard, stale in sorted(rows, key=lambda row: row[0]):
+        latency = f"{shard['latency_ms']:.0f}ms" if shard['latency_ms'] is not None else "—"
+        note = "  (stale)" if stale else ""
+        print(f"   {shard_id:>5} {pid:>7} {latency:>9} {shard['guilds']:>7} {shard['voice_sessions']:>6}{note}")
+    latencies = [shard['latency_ms'] for _, _, shard, stale in rows if not stale and shard['latency_ms'] is not None]
+    if latencies:
+        print(f"   avg {sum(latencies) / len(latencies):.0f}ms • max {max(latencies):.0f}ms • "
+              f"{sum(shard['guilds'] for _, _, shard, _ in rows)} guilds")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run bot shards across processes")
+    parser.add_argument('--shards', type=int, help="Total shard count (default: Discord's recommendation)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help="Number of bot processes")
+    parser.add_argument('--status-dir', default='shard_status', help="Where shard processes write their status")
+    parser.add_argument('--report-every', type=int, default=300, help="Seconds between shard reports (0 disables)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    token = os.getenv('TOKEN')
+    if not token:
+        print("❌ ERROR: TOKEN not found in environment variables!")
+        return 1
+
+    shard_count = args.shards or recommended_shard_count(token)
+    processes = [ShardProcess(index, shard_ids, shard_count)
+                 for index, shard_ids in enumerate(split_shards(shard_count, args.processes))]
+    print(f"🧩 Running {shard_count} shards in {len(processes)} processes")
+
+    stopping = False
+
+    def handle_signal(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    for shard_process in processes:
+        shard_process.start(args.status_dir)
+        time.sleep(5)  # Stagger logins to stay under the identify rate limit
+
+    next_report = time.monotonic() + args.report_every
+    while not stopping:
+        for shard_process in processes:
+            shard_process.poll(args.status_dir)
+        if args.report_every and time.monotonic() >= next_report:
+            print_shard_report(args.status_dir)
+            next_report = time.monotonic() + args.report_every
+        time.sleep(1)
+
+    print("🛑 Stopping shard processes...")
+    for shard_process in processes:
+        shard_process.stop()
+    for shard_process in processes:
+        if shard_process.process:
+            try:
+                shard_process.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                shard_process.process.kill()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,39 +1,112 @@
+import time
+STARTED_AT = time.perf_counter()
+
+import asyncio
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from dotenv import load_dotenv
+import logging
 import os
+import sys
+
+from utils.logs import setup_logging
+from utils.intents import get_bot_options
+from utils.startup import collect_startup_stats, format_comparison, record_startup, record_cog_load, format_cog_report
+from utils.lazy import warm_up
+from utils.loopmon import get_loop_monitor
+from utils.scheduler import get_scheduler
+from utils.tracing import TracedBot, TracedAutoShardedBot
+from utils.sharding import get_shard_config, format_shard_ids, shard_status, write_shard_status
 
 load_dotenv()
+setup_logging()
+log = logging.getLogger('bot')
+
 TOKEN = os.getenv('TOKEN')
 if not TOKEN:
-    print("ERROR: No TOKEN environment variable found!")
+    log.error("ERROR: No TOKEN environment variable found!")
     exit(1)
-intents = discord.Intents.all() #need to enable
-# Ensure voice intents are enabled
-intents.voice_states = True
-intents.guilds = True
+# INTENTS_PROFILE=lean (default) skips presences and member chunking,
+# INTENTS_PROFILE=all restores Intents.all() with every member cached
+intents_profile, member_cache_policy, intent_options = get_bot_options()
+log.info(f"🔌 Intents profile: {intents_profile} • member cache: {member_cache_policy}")
 
-bot = commands.Bot(
+# Sharding: AUTOSHARD=1 lets Discord pick the shard count, SHARD_COUNT/SHARD_IDS
+# pin this process to a range of shards (launcher.py runs one process per range)
+try:
+    shard_config = get_shard_config()
+except ValueError as e:
+    log.error(f"ERROR: {e}")
+    exit(1)
+SHARD_STATUS_DIR = os.getenv('SHARD_STATUS_DIR')
+SHARD_STATUS_SECONDS = 30
+# LOOP_LAG_MONITOR=0 turns off the event loop lag monitor (see /loop_lag)
+LOOP_LAG_MONITOR = os.getenv('LOOP_LAG_MONITOR', '1').lower() not in ('0', 'false', 'no')
+
+bot_options = dict(
     command_prefix='~', 
-    intents=intents,
     help_command=None,
-    case_insensitive=True
+    case_insensitive=True,
+    **intent_options
 )
+if shard_config['autoshard'] or shard_config['shard_count']:
+    if shard_config['shard_count']:
+        bot_options['shard_count'] = shard_config['shard_count']
+    if shard_config['shard_ids'] is not None:
+        bot_options['shard_ids'] = shard_config['shard_ids']
+    bot = TracedAutoShardedBot(**bot_options)
+else:
+    bot = TracedBot(**bot_options)
+
+@tasks.loop(seconds=SHARD_STATUS_SECONDS)
+async def report_shard_status():
+    """Publish per-shard latency for launcher.py"""
+    try:
+        write_shard_status(bot, SHARD_STATUS_DIR)
+    except Exception as e:
+        log.warning(f"⚠️ Gagal menulis status shard: {e}")
+
+@bot.event
+async def on_shard_ready(shard_id):
+    latency = dict(bot.latencies).get(shard_id)
+    latency_text = f"{latency * 1000:.0f}ms" if latency is not None and latency == latency else "?"
+    log.info(f"🧩 Shard {shard_id} siap (latency {latency_text})")
 
 @bot.event
 async def on_ready():
-    print(f'\n🤖 {bot.user} sekarang ONLINE dan siap!')
-    print(f'📱 UI dioptimalkan untuk mobile telah aktif')
-    print(f'🌟 Semua fitur bot All-in-One telah dimuat')
-    print(f'🏠 Terhubung ke {len(bot.guilds)} server')
-    print(f'👥 Melayani {len(bot.users)} pengguna')
+    log.info(f'🤖 {bot.user} sekarang ONLINE dan siap!')
+    if LOOP_LAG_MONITOR:
+        get_loop_monitor(bot).ensure_running()
+    log.info(f'📱 UI dioptimalkan untuk mobile telah aktif')
+    log.info(f'🌟 Semua fitur bot All-in-One telah dimuat')
+    log.info(f'🏠 Terhubung ke {len(bot.guilds)} server')
+    log.info(f'👥 Melayani {len(bot.users)} pengguna')
+
+    # Compare startup time and memory with the last run of other intents profiles
+    if not hasattr(bot, 'startup_stats'):
+        bot.startup_stats = collect_startup_stats(bot, STARTED_AT)
+        runs = record_startup(f"{intents_profile}/{member_cache_policy}", bot.startup_stats)
+        for line in format_comparison(f"{intents_profile}/{member_cache_policy}", runs):
+            log.info(line)
+        bot.startup_stats['cogs'] = cog_load_stats
+        for line in format_cog_report(cog_load_stats, bot.startup_stats['startup_seconds']):
+            log.info(line)
+        # Through the scheduler, which keeps a reference to the task and logs its errors
+        get_scheduler(bot).schedule(('warm_up',), 0, warm_up_heavy_modules)
+    if isinstance(bot, commands.AutoShardedBot):
+        shard_ids = sorted(bot.shards)
+        log.info(f'🧩 Shard {format_shard_ids(shard_ids)} dari {bot.shard_count} berjalan di proses ini')
+        for shard in shard_status(bot)['shards']:
+            log.info(f"   Shard {shard['shard_id']}: {shard['latency_ms']}ms, {shard['guilds']} server")
+        if SHARD_STATUS_DIR and not report_shard_status.is_running():
+            report_shard_status.start()
     
     # Check voice capabilities
     try:
         import nacl
-        print("✅ Dukungan voice diaktifkan (PyNaCl terinstal)")
+        log.info("✅ Dukungan voice diaktifkan (PyNaCl terinstal)")
     except ImportError:
-        print("⚠️ Dukungan voice dinonaktifkan (PyNaCl tidak terinstal)")
+        log.warning("⚠️ Dukungan voice dinonaktifkan (PyNaCl tidak terinstal)")
     
     # Check Opus library
     try:
@@ -44,21 +117,30 @@ async def on_ready():
                 try:
                     discord.opus.load_opus(opus_name)
                     opus_loaded = True
-                    print(f"✅ Library Opus dimuat ({opus_name})")
+                    log.info(f"✅ Library Opus dimuat ({opus_name})")
                     break
                 except:
                     continue
             
             if not opus_loaded:
-                print("⚠️ Library Opus tidak ditemukan - fitur musik mungkin tidak berfungsi")
+                log.warning("⚠️ Library Opus tidak ditemukan - fitur musik mungkin tidak berfungsi")
         else:
-            print("✅ Library Opus sudah dimuat")
+            log.info("✅ Library Opus sudah dimuat")
     except Exception as e:
-        print(f"⚠️ Pemeriksaan Opus gagal: {e}")
+        log.warning(f"⚠️ Pemeriksaan Opus gagal: {e}")
     
     # py-cord automatically syncs slash commands, no manual sync needed
-    print(f"✅ Slash commands ready")
-    print(f'🚀 Bot sepenuhnya operasional dengan fitur interaktif!')
+    log.info(f"✅ Slash commands ready")
+    log.info(f'🚀 Bot sepenuhnya operasional dengan fitur interaktif!')
+
+async def warm_up_heavy_modules():
+    """Import the modules cogs deferred (yt_dlp, requests, bs4, ...) off the event loop"""
+    loop = asyncio.get_event_loop()
+    results = await loop.run_in_executor(None, warm_up)
+    bot.startup_stats['warm_up'] = results
+    log.info(f"🔥 Warm-up selesai {time.perf_counter() - STARTED_AT:.2f}s setelah start")
+    for line in format_cog_report(cog_load_stats, bot.startup_stats['startup_seconds'], results):
+        log.info(line)
 
 @bot.event
 async def on_guild_join(guild):
@@ -108,9 +190,10 @@ async def on_guild_join(guild):
         except:
             pass  # If we can't send, that's okay
 
-print("🔄 Loading cogs...")
+log.info("🔄 Loading cogs...")
+cog_load_stats = {}
 if not os.path.exists('./Cogs'):
-    print("❌ Cogs directory not found!")
+    log.error("❌ Cogs directory not found!")
     exit(1)
 
 for foldername in os.listdir('./Cogs'): #for every folder in cogs
@@ -118,32 +201,32 @@ for foldername in os.listdir('./Cogs'): #for every folder in cogs
         for filename in os.listdir(f'./Cogs/{foldername}'):# for every file in a folder in cogs
             if filename.endswith('.py') and not filename in ['util.py', 'error.py']: #if the file is a python file and if the file is a cog
                 try:
+                    load_started = time.perf_counter()
                     bot.load_extension(f'Cogs.{foldername}.{filename[:-3]}')#load the extension
-                    print(f"✅ Loaded {foldername}.{filename[:-3]}")
+                    load_seconds = time.perf_counter() - load_started
+                    record_cog_load(cog_load_stats, f'{foldername}.{filename[:-3]}',
+                                    sys.modules[f'Cogs.{foldername}.{filename[:-3]}'], STARTED_AT, load_seconds)
+                    log.info(f"✅ Loaded {foldername}.{filename[:-3]} ({load_seconds:.3f}s)")
                 except Exception as e:
-                    print(f"❌ Failed to load {foldername}.{filename[:-3]}: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    log.exception(f"❌ Failed to load {foldername}.{filename[:-3]}: {e}")
 
-print("🚀 Starting bot...")
+log.info("🚀 Starting bot...")
 
 try:
     if not TOKEN:
-        print("❌ ERROR: TOKEN not found in environment variables!")
-        print("📝 Please set your Discord bot token in Replit Secrets:")
-        print("   1. Click on 'Secrets' tab on the left")
-        print("   2. Add key: TOKEN")
-        print("   3. Add value: your_discord_bot_token")
+        log.error("❌ ERROR: TOKEN not found in environment variables!")
+        log.info("📝 Please set your Discord bot token in Replit Secrets:")
+        log.info("   1. Click on 'Secrets' tab on the left")
+        log.info("   2. Add key: TOKEN")
+        log.info("   3. Add value: your_discord_bot_token")
         exit(1)
     
-    print(f"🔑 Token found (length: {len(TOKEN)})")
+    log.info(f"🔑 Token found (length: {len(TOKEN)})")
     bot.run(TOKEN)
 except discord.LoginFailure:
-    print("❌ ERROR: Invalid TOKEN provided!")
-    print("🔧 Please check that your Discord bot token is correct")
+    log.error("❌ ERROR: Invalid TOKEN provided!")
+    log.info("🔧 Please check that your Discord bot token is correct")
 except discord.HTTPException as e:
-    print(f"❌ ERROR: Discord HTTP error: {e}")
+    log.error(f"❌ ERROR: Discord HTTP error: {e}")
 except Exception as e:
-    print(f"❌ ERROR: Bot failed to start: {e}")
-    import traceback
-    traceback.print_exc()
\ No newline at end of file
+    log.exception(f"❌ ERROR: Bot failed to start: {e}")
\ No newline at end of file
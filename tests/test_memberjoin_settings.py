@@ -0,0 +1,32 @@
+from Cogs.Moderation.memberjoin import GUILD_DEFAULTS, SETTINGS_VERSION, migrate_settings
+
+
+def test_unversioned_settings_are_migrated():
+    legacy = {
+        '123': {
+            'welcome_channel': '456',
+            'goodbye_channel': '',
+            'welcome_message': 'Hi {user}, welcome to {server}!',
+            'goodbye_message': '{user} left',
+        },
+    }
+    settings, migrated = migrate_settings(legacy)
+    assert migrated
+    assert settings['version'] == SETTINGS_VERSION
+    guild = settings['guilds']['123']
+    assert guild['welcome_channel'] == 456
+    assert guild['goodbye_channel'] is None
+    assert guild['auto_role'] is None
+    assert guild['welcome_message'] == 'Hi {member}, welcome to {guild}!'
+    assert guild['goodbye_message'] == '{member} left'
+    for key, value in GUILD_DEFAULTS.items():
+        if key not in legacy['123']:
+            assert guild[key] == value
+
+
+def test_current_settings_are_left_alone():
+    current = {'version': SETTINGS_VERSION, 'guilds': {'1': dict(GUILD_DEFAULTS, welcome_message='{user}')}}
+    settings, migrated = migrate_settings(current)
+    assert not migrated
+    assert settings is current
+    assert settings['guilds']['1']['welcome_message'] == '{user}'
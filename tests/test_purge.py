@@ -0,0 +1,27 @@
+import time
+
+from utils.purge import text_matcher
+
+
+def test_text_matcher_is_a_case_insensitive_contains():
+    matches = text_matcher('Free Nitro')
+    assert matches('get FREE nitro here')
+    assert not matches('free  nitro')
+
+
+def test_text_matcher_wildcards_match_in_order():
+    matches = text_matcher('discord*gift*')
+    assert matches('discord.gift/abc')
+    assert matches('Discord Nitro GIFT')
+    assert not matches('gift from discord')
+    assert text_matcher('*')('anything')
+
+
+def test_text_matcher_treats_regex_syntax_literally():
+    assert text_matcher('(a+)+$')('x (a+)+$ y')
+    assert not text_matcher('(a+)+$')('aaaa')
+
+    matches = text_matcher('a*a*a*a*a*a*b')
+    start = time.perf_counter()
+    assert not matches('a' * 20000)
+    assert time.perf_counter() - start < 0.5
@@ -0,0 +1,75 @@
+import asyncio
+
+from utils.scheduler import Scheduler
+
+
+def test_jobs_fire_in_due_order():
+    async def scenario():
+        scheduler = Scheduler()
+        fired = []
+        scheduler.schedule(('late', 1), 0.05, fired.append, 'late')
+        scheduler.schedule(('early', 1), 0.01, fired.append, 'early')
+        await asyncio.sleep(0.1)
+        scheduler.stop()
+        return fired, scheduler.stats()
+
+    fired, stats = asyncio.run(scenario())
+    assert fired == ['early', 'late']
+    assert stats['pending'] == 0
+    assert stats['fired'] == 2
+
+
+def test_rescheduling_a_key_replaces_it():
+    async def scenario():
+        scheduler = Scheduler()
+        fired = []
+        scheduler.schedule(('job', 1), 0.01, fired.append, 'first')
+        scheduler.schedule(('job', 1), 0.02, fired.append, 'second')
+        await asyncio.sleep(0.06)
+        scheduler.stop()
+        return fired
+
+    assert asyncio.run(scenario()) == ['second']
+
+
+def test_cancel_and_cancel_prefix():
+    async def scenario():
+        scheduler = Scheduler()
+        fired = []
+        scheduler.schedule(('expiry', 1, 'a'), 0.01, fired.append, 'a')
+        scheduler.schedule(('expiry', 1, 'b'), 0.01, fired.append, 'b')
+        scheduler.schedule(('expiry', 2, 'c'), 0.01, fired.append, 'c')
+        scheduler.schedule('other', 0.01, fired.append, 'other')
+        assert scheduler.pending_counts() == {'expiry': 3, 'other': 1}
+        assert scheduler.cancel_prefix('expiry', 1) == 2
+        assert scheduler.cancel('other')
+        assert not scheduler.cancel('other')
+        assert not scheduler.is_scheduled(('expiry', 1, 'a'))
+        assert scheduler.is_scheduled(('expiry', 2, 'c'))
+        await asyncio.sleep(0.05)
+        scheduler.stop()
+        return fired
+
+    assert asyncio.run(scenario()) == ['c']
+
+
+def test_coroutine_jobs_run_and_failures_do_not_stop_the_loop():
+    async def scenario():
+        scheduler = Scheduler()
+        fired = []
+
+        async def record(value):
+            fired.append(value)
+
+        def broken():
+            raise RuntimeError("boom")
+
+        scheduler.schedule('broken', 0, broken)
+        scheduler.schedule('coro', 0.01, record, 'ran')
+        await asyncio.sleep(0.05)
+        scheduler.stop()
+        return fired, scheduler.next_due_in()
+
+    fired, next_due = asyncio.run(scenario())
+    assert fired == ['ran']
+    assert next_due is None
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils.sharding import (format_shard_ids, get_shard_config, owns_guild, parse_shard_ids, shard_id_for,
+                            split_shards)
+
+
+def test_parse_shard_ids():
+    assert parse_shard_ids(None) is None
+    assert parse_shard_ids('') is None
+    assert parse_shard_ids('0-3, 8,2,') == [0, 1, 2, 3, 8]
+
+
+def test_format_shard_ids_round_trips():
+    assert format_shard_ids([]) == ''
+    assert format_shard_ids([0, 1, 2, 3, 8]) == '0-3,8'
+    assert format_shard_ids([5]) == '5'
+    assert parse_shard_ids(format_shard_ids([0, 2, 3, 4, 9, 10])) == [0, 2, 3, 4, 9, 10]
+
+
+def test_split_shards():
+    assert split_shards(10, 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert split_shards(2, 5) == [[0], [1]]
+    assert split_shards(4, 0) == [[0, 1, 2, 3]]
+
+
+def test_shard_id_for():
+    guild_id = (123 << 22) | 0x3FFFFF
+    assert shard_id_for(guild_id, 10) == 3
+    assert shard_id_for(guild_id, 0) == 0
+
+
+def test_owns_guild():
+    guild_id = 5 << 22
+    assert owns_guild(SimpleNamespace(shard_ids=None, shard_count=None), guild_id)
+    assert owns_guild(SimpleNamespace(shard_ids=[4, 5], shard_count=8), guild_id)
+    assert not owns_guild(SimpleNamespace(shard_ids=[0, 1], shard_count=8), guild_id)
+
+
+def test_get_shard_config(monkeypatch):
+    monkeypatch.setenv('AUTOSHARD', 'yes')
+    monkeypatch.setenv('SHARD_COUNT', '4')
+    monkeypatch.setenv('SHARD_IDS', '2-3')
+    assert get_shard_config() == {'autoshard': True, 'shard_count': 4, 'shard_ids': [2, 3]}
+
+    monkeypatch.setenv('SHARD_IDS', '3-4')
+    with pytest.raises(ValueError):
+        get_shard_config()
+
+    monkeypatch.delenv('SHARD_COUNT')
+    with pytest.raises(ValueError):
+        get_shard_config()
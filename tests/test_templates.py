@@ -0,0 +1,37 @@
+import pytest
+
+from utils.templates import TemplateError, compile_template, format_placeholders
+
+VARIABLES = {
+    'member': lambda subject: subject['name'],
+    'guild': lambda subject: subject['guild'],
+    'member.id': lambda subject: subject['id'],
+}
+
+
+def test_render_fills_placeholders():
+    template = compile_template("Hi {member} ({member.id}), welcome to {guild}!", VARIABLES)
+    assert template.names == ('member', 'member.id', 'guild')
+    assert template.render({'name': 'Ana', 'guild': 'Dhanse', 'id': 7}) == "Hi Ana (7), welcome to Dhanse!"
+
+
+def test_literal_braces_survive_rendering():
+    template = compile_template("{member} says {Hi} {0} and {NotAPlaceholder}", VARIABLES)
+    assert template.render({'name': 'Ana'}) == "Ana says {Hi} {0} and {NotAPlaceholder}"
+
+
+def test_unknown_placeholders_raise_when_strict():
+    with pytest.raises(TemplateError) as error:
+        compile_template("{member} {nope} {missing}", VARIABLES)
+    assert error.value.unknown == ['nope', 'missing']
+    assert error.value.available == sorted(VARIABLES)
+    assert str(error.value) == "Unknown placeholders {nope}, {missing}"
+
+
+def test_unknown_placeholders_kept_when_not_strict():
+    template = compile_template("{user} joined {guild}", VARIABLES, strict=False)
+    assert template.render({'guild': 'Dhanse'}) == "{user} joined Dhanse"
+
+
+def test_format_placeholders():
+    assert format_placeholders(['member', 'guild']) == "`{member}`, `{guild}`"
@@ -0,0 +1,28 @@
+from utils.windows import RecentValues, SlidingWindowCounter
+
+
+def test_sliding_window_counts_recent_events():
+    counter = SlidingWindowCounter(10, buckets=10)
+    assert counter.add(0.5) == 1
+    assert counter.add(3.0, amount=2) == 3
+    assert counter.count(9.9) == 3
+    # The bucket holding the first event has left the window
+    assert counter.count(10.5) == 2
+    assert counter.add(13.5) == 1
+
+
+def test_sliding_window_resets_after_a_long_gap():
+    counter = SlidingWindowCounter(10)
+    counter.add(1.0, amount=5)
+    assert counter.count(500.0) == 0
+    assert counter.add(500.0) == 1
+
+
+def test_recent_values_counts_repeats_within_window():
+    recent = RecentValues(3)
+    assert recent.add(0.0, 'spam', 5) == 1
+    assert recent.add(1.0, 'spam', 5) == 2
+    assert recent.add(2.0, 'other', 5) == 1
+    assert recent.add(7.0, 'spam', 5) == 1  # The first two are older than the window
+    # Only the last three values are kept
+    assert recent.add(8.0, 'spam', 100) == 2
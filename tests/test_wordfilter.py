@@ -0,0 +1,43 @@
+import time
+
+from utils.wordfilter import AhoCorasick, WordFilter, normalize_term
+
+
+def test_aho_corasick_finds_every_occurrence():
+    automaton = AhoCorasick(['he', 'she', 'hers'])
+    found = [(automaton.terms[index], start, end) for index, start, end in automaton.matches('ushers')]
+    assert found == [('she', 1, 4), ('he', 2, 4), ('hers', 2, 6)]
+
+
+def test_normalize_term():
+    assert normalize_term('  Bad \n  WORD ') == 'bad word'
+
+
+def test_plain_terms_match_whole_words_only():
+    word_filter = WordFilter(['ass', 'bad word'])
+    assert word_filter.find('what a CLASS act') is None
+    assert word_filter.find('you ass!') == 'ass'
+    assert word_filter.find('a bad  \n word') == 'bad word'
+    assert word_filter.find('my_ass') is None  # Underscores are word characters
+
+
+def test_wildcard_terms():
+    word_filter = WordFilter(['spam*', 'n?b', 'bad* wo?d', 'c*t!'])
+    assert word_filter.find('SPAMMING here') == 'spamming'
+    assert word_filter.find('total nub.') == 'nub'
+    assert word_filter.find('nb') is None
+    assert word_filter.find('so badly word') == 'badly word'
+    assert word_filter.find('badly, word') is None
+    assert word_filter.find('cat!') == 'cat!'
+    assert word_filter.find('cat') is None
+    assert word_filter.find('_spam') is None
+
+
+def test_pathological_wildcard_is_fast():
+    # As a backtracking regex this entry took seconds on a 301-character message
+    word_filter = WordFilter(['*a*a*a*a*a', 'a*?*?*?*a'])
+    started = time.perf_counter()
+    assert word_filter.find('a' * 4000 + 'b') is None
+    assert word_filter.find(' '.join(['a' * 300 + 'b'] * 10)) is None
+    assert time.perf_counter() - started < 0.5
+    assert word_filter.find('say abracadabra') == 'abracadabra'
@@ -0,0 +1,85 @@
+"""Durable moderation actions that are due later (unbans, warning expiry sweeps).
+
+Rows live in the same SQLite database as the warnings. Only the table is
+persistent; timing is done by utils.scheduler, which keeps every pending
+action on one heap with a single wakeup loop.
+"""
+import json
+import threading
+import time
+
+from utils.warnings_db import connect
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scheduled_actions (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER,
+    due_at REAL NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scheduled_actions_target ON scheduled_actions (guild_id, kind, user_id);
+"""
+
+
+class ActionsStore:
+    """Pending scheduled actions, in SQLite"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.db = connect(db_path, SCHEMA)
+
+    @staticmethod
+    def to_action(row):
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'guild_id': row['guild_id'],
+            'user_id': row['user_id'],
+            'due_at': row['due_at'],
+            'payload': json.loads(row['payload']),
+        }
+
+    def add(self, kind, guild_id, user_id, due_at, payload=None):
+        """Store an action and return it"""
+        payload = payload or {}
+        with self.lock, self.db:
+            cursor = self.db.execute(
+                "INSERT INTO scheduled_actions (kind, guild_id, user_id, due_at, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, guild_id, user_id, due_at, json.dumps(payload), time.time())
+            )
+        return {'id': cursor.lastrowid, 'kind': kind, 'guild_id': guild_id, 'user_id': user_id,
+                'due_at': due_at, 'payload': payload}
+
+    def pending(self):
+        """Every stored action, soonest first"""
+        with self.lock:
+            rows = self.db.execute("SELECT * FROM scheduled_actions ORDER BY due_at").fetchall()
+        return [self.to_action(row) for row in rows]
+
+    def find(self, guild_id, kind, user_id=None):
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT * FROM scheduled_actions WHERE guild_id=? AND kind=? AND user_id IS ?",
+                (guild_id, kind, user_id)
+            ).fetchall()
+        return [self.to_action(row) for row in rows]
+
+    def reschedule(self, action_id, due_at):
+        with self.lock, self.db:
+            self.db.execute("UPDATE scheduled_actions SET due_at=? WHERE id=?", (due_at, action_id))
+
+    def remove(self, action_id):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM scheduled_actions WHERE id=?", (action_id,))
+
+    def remove_many(self, action_ids):
+        with self.lock, self.db:
+            self.db.executemany("DELETE FROM scheduled_actions WHERE id=?", [(action_id,) for action_id in action_ids])
+
+    def close(self):
+        with self.lock:
+            self.db.close()
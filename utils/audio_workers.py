@@ -0,0 +1,461 @@
+"""Audio worker processes: FFmpeg decoding and Opus encoding outside the main process.
+
+Each worker process owns the FFmpeg readers and Opus encoders for a group of
+guilds (guild_id % pool size) and ships encoded 20ms packets back over a pipe.
+The main process only forwards ready-made Opus packets to the voice
+connection, so decode/encode work scales across cores and a busy guild only
+competes with the guilds in its own worker.
+"""
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import queue
+import re
+import resource
+import shlex
+import subprocess
+import threading
+
+import discord
+
+log = logging.getLogger(__name__)
+
+FRAME_SIZE = 3840          # 20ms of 48kHz stereo s16le PCM
+SAMPLES_PER_FRAME = 960
+FRAME_SECONDS = 0.02
+PREBUFFER_FRAMES = 50      # Credits a stream starts with (1s of audio)
+CREDIT_BATCH = 10          # The main process returns credits in batches of this size
+PACKET_BATCH = 5           # Packets sent per pipe message
+# A read waiting this long for a packet ends the track, so a dead worker or a
+# stuck pipe can't hang the player thread. It is well past the Music watchdog's
+# stall threshold, which gets the first chance to rebuild the source.
+READ_TIMEOUT_SECONDS = 30
+OPUS_NAMES = ['libopus.so.0', 'libopus.so', 'opus', 'libopus', 'libopus-0.dll', 'opus.dll']
+
+
+def load_opus():
+    """Load libopus in a worker process"""
+    if discord.opus.is_loaded():
+        return True
+    for opus_name in OPUS_NAMES:
+        try:
+            discord.opus.load_opus(opus_name)
+            if discord.opus.is_loaded():
+                return True
+        except Exception:
+            continue
+    return False
+
+
+def with_volume(options, volume):
+    """Set the FFmpeg volume filter in an options string"""
+    options = options or ''
+    if re.search(r'volume=[0-9.]+', options):
+        return re.sub(r'volume=[0-9.]+', f'volume={volume}', options)
+    return f'{options} -filter:a "volume={volume}"'.strip()
+
+
+class WorkerStream:
+    """One guild's FFmpeg reader and Opus encoder, running in a worker process thread"""
+
+    def __init__(self, stream_id, guild_id, source, before_options, options, bitrate, send, on_done):
+        self.stream_id = stream_id
+        self.guild_id = guild_id
+        self.source = source
+        self.before_options = before_options or ''
+        self.options = options or ''
+        self.bitrate = bitrate
+        self.send = send
+        self.on_done = on_done
+        self.credits = PREBUFFER_FRAMES
+        self.cond = threading.Condition()
+        self.paused = False
+        self.stopped = False
+        self.restart_at = None
+        self.start_offset = 0.0
+        self.frames = 0
+        self.process = None
+
+    @property
+    def position(self):
+        return self.start_offset + self.frames * FRAME_SECONDS
+
+    def spawn(self, start=0.0):
+        before = shlex.split(self.before_options)
+        if start > 0:
+            before += ['-ss', f'{start:.2f}']
+        args = ['ffmpeg', *before, '-i', self.source, '-f', 's16le', '-ar', '48000', '-ac', '2',
+                '-loglevel', 'warning', *shlex.split(self.options), 'pipe:1']
+        self.process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE)
+        self.start_offset = start
+        self.frames = 0
+
+    def kill(self):
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def add_credit(self, count):
+        with self.cond:
+            self.credits += count
+            self.cond.notify()
+
+    def set_paused(self, paused):
+        with self.cond:
+            self.paused = paused
+            self.cond.notify()
+
+    def restart(self, position, options=None):
+        """Restart FFmpeg at a position, e.g. for seek or volume changes"""
+        with self.cond:
+            if options is not None:
+                self.options = options
+            self.restart_at = position
+            self.cond.notify()
+            process = self.process
+        # Unblock a pending stdout read on the process being replaced
+        if process and process.poll() is None:
+            process.kill()
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
+        self.kill()
+
+    def run(self):
+        error = None
+        batch = []
+        try:
+            encoder = discord.opus.Encoder()
+            if self.bitrate:
+                encoder.set_bitrate(self.bitrate)
+            self.spawn()
+
+            while True:
+                with self.cond:
+                    while not self.stopped and self.restart_at is None and (self.paused or self.credits <= 0):
+                        self.cond.wait()
+                    if self.stopped:
+                        break
+                    restart_at, self.restart_at = self.restart_at, None
+                if restart_at is not None:
+                    self.kill()
+                    self.spawn(restart_at)
+                    continue
+
+                pcm = self.process.stdout.read(FRAME_SIZE)
+                if len(pcm) != FRAME_SIZE:
+                    if self.restart_at is not None:
+                        continue  # Killed for a restart, not the end of the track
+                    break
+
+                batch.append(encoder.encode(pcm, SAMPLES_PER_FRAME))
+                self.frames += 1
+                with self.cond:
+                    self.credits -= 1
+                    credits_left = self.credits
+                if len(batch) >= PACKET_BATCH or credits_left <= 0:
+                    self.send(('packets', self.stream_id, batch))
+                    batch = []
+        except Exception as e:
+            error = str(e)
+        finally:
+            if batch:
+                self.send(('packets', self.stream_id, batch))
+            self.kill()
+            self.send(('ended', self.stream_id, error))
+            self.on_done(self.stream_id)
+
+    def status(self):
+        return {
+            'stream_id': self.stream_id,
+            'guild_id': self.guild_id,
+            'position': round(self.position, 2),
+            'paused': self.paused,
+            'credits': self.credits,
+            'bitrate': self.bitrate,
+        }
+
+
+def worker_main(conn, worker_index):
+    """Entry point of an audio worker process"""
+    if not load_opus():
+        conn.send(('fatal', 'Opus library not available in audio worker'))
+        return
+
+    streams = {}
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            try:
+                conn.send(message)
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        kind = message[0]
+        if kind == 'shutdown':
+            break
+        if kind == 'play':
+            _, stream_id, guild_id, source, before_options, options, bitrate = message
+            stream = WorkerStream(stream_id, guild_id, source, before_options, options, bitrate,
+                                  send, lambda finished_id: streams.pop(finished_id, None))
+            streams[stream_id] = stream
+            stream.start()
+        elif kind == 'status':
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            children = resource.getrusage(resource.RUSAGE_CHILDREN)
+            send(('status', message[1], {
+                'worker': worker_index,
+                'pid': multiprocessing.current_process().pid,
+                'streams': [stream.status() for stream in list(streams.values())],
+                'cpu_seconds': round(usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime, 2),
+            }))
+        else:
+            stream = streams.get(message[1])
+            if stream is None:
+                continue
+            if kind == 'credit':
+                stream.add_credit(message[2])
+            elif kind == 'pause':
+                stream.set_paused(True)
+            elif kind == 'resume':
+                stream.set_paused(False)
+            elif kind == 'stop':
+                stream.stop()
+            elif kind == 'seek':
+                stream.restart(message[2])
+            elif kind == 'volume':
+                stream.restart(stream.position, with_volume(stream.options, message[2]))
+
+    for stream in list(streams.values()):
+        stream.stop()
+
+
+class WorkerAudioSource(discord.AudioSource):
+    """Opus packets produced by an audio worker process"""
+
+    def __init__(self, pool, worker, stream_id, guild_id):
+        self.pool = pool
+        self.worker = worker
+        self.stream_id = stream_id
+        self.guild_id = guild_id
+        self.packets = queue.Queue()
+        self.consumed = 0
+        self.ended = False
+        self.closed = False
+
+    def feed(self, packets):
+        for packet in packets:
+            self.packets.put(packet)
+
+    def end(self):
+        self.packets.put(None)
+
+    def read(self):
+        if self.ended:
+            return b''
+        try:
+            packet = self.packets.get(timeout=READ_TIMEOUT_SECONDS)  # Blocks like an FFmpeg pipe would
+        except queue.Empty:
+            log.warning(f"Audio worker stream {self.stream_id} sent nothing for {READ_TIMEOUT_SECONDS}s, ending it",
+                        extra={'guild': self.guild_id})
+            packet = None
+        if packet is None:
+            self.ended = True
+            return b''
+        self.consumed += 1
+        if self.consumed % CREDIT_BATCH == 0:
+            self.worker.send(('credit', self.stream_id, CREDIT_BATCH))
+        return packet
+
+    def drain(self):
+        """Drop buffered packets, returning their credits to the worker"""
+        dropped = 0
+        while True:
+            try:
+                packet = self.packets.get_nowait()
+            except queue.Empty:
+                break
+            if packet is None:
+                self.packets.put(None)
+                break
+            dropped += 1
+        if dropped:
+            self.worker.send(('credit', self.stream_id, dropped))
+
+    def is_opus(self):
+        return True
+
+    def cleanup(self):
+        if not self.closed:
+            self.closed = True
+            self.worker.send(('stop', self.stream_id))
+            self.pool.sources.pop(self.stream_id, None)
+            self.end()
+
+
+class AudioWorker:
+    """Main-process handle for one worker process"""
+
+    def __init__(self, pool, index):
+        self.pool = pool
+        self.index = index
+        self.conn = None
+        self.process = None
+        self.send_lock = threading.Lock()
+
+    def start(self):
+        context = multiprocessing.get_context('spawn')  # Never fork the bot's sockets
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn, self.index),
+                                       name=f'audio-worker-{self.index}', daemon=True)
+        self.process.start()
+        child_conn.close()
+        threading.Thread(target=self.read_loop, args=(self.conn,), daemon=True).start()
+        log.info(f"🔊 Audio worker {self.index} started (pid {self.process.pid})")
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def send(self, message):
+        with self.send_lock:
+            try:
+                self.conn.send(message)
+            except (BrokenPipeError, EOFError, OSError) as e:
+                log.warning(f"Audio worker {self.index} send failed: {e}")
+
+    def read_loop(self, conn):
+        """Dispatch packets and replies from the worker (runs in a thread)"""
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            kind = message[0]
+            if kind == 'packets':
+                source = self.pool.sources.get(message[1])
+                if source:
+                    source.feed(message[2])
+            elif kind == 'ended':
+                source = self.pool.sources.pop(message[1], None)
+                if source:
+                    if message[2]:
+                        log.warning(f"Audio worker {self.index} stream error: {message[2]}")
+                    source.end()
+            elif kind == 'status':
+                self.pool.resolve_status(message[1], message[2])
+            elif kind == 'fatal':
+                log.error(f"❌ Audio worker {self.index}: {message[1]}")
+
+        # Worker died: end every stream it was serving so playback moves on
+        for stream_id, source in list(self.pool.sources.items()):
+            if source.worker is self:
+                self.pool.sources.pop(stream_id, None)
+                source.end()
+
+    def close(self):
+        if self.is_alive():
+            self.send(('shutdown',))
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+
+
+class AudioWorkerPool:
+    """Pool of audio worker processes, controlled over pipes"""
+
+    def __init__(self, size):
+        self.size = size
+        self.workers = [AudioWorker(self, index) for index in range(size)]
+        self.sources = {}  # stream_id -> WorkerAudioSource
+        self.stream_ids = itertools.count(1)
+        self.status_ids = itertools.count(1)
+        self.status_waiters = {}
+
+    def worker_for(self, guild_id):
+        """Guilds are grouped onto workers by id; dead workers are restarted"""
+        worker = self.workers[guild_id % self.size]
+        if not worker.is_alive():
+            worker.start()
+        return worker
+
+    def create_source(self, guild_id, source, before_options=None, options=None, bitrate=None):
+        """Start decoding a file or URL in a worker and return an Opus audio source (play)"""
+        worker = self.worker_for(guild_id)
+        stream_id = next(self.stream_ids)
+        audio_source = WorkerAudioSource(self, worker, stream_id, guild_id)
+        self.sources[stream_id] = audio_source
+        bitrate_kbps = max(16, min(512, bitrate // 1000)) if bitrate else None
+        worker.send(('play', stream_id, guild_id, source, before_options, options, bitrate_kbps))
+        return audio_source
+
+    def sources_for(self, guild_id):
+        return [source for source in list(self.sources.values()) if source.guild_id == guild_id]
+
+    def control(self, guild_id, command, *args):
+        """Send pause/resume/seek/volume to a guild's active streams (stop goes through cleanup)"""
+        sources = self.sources_for(guild_id)
+        for source in sources:
+            if command == 'seek':
+                source.drain()
+            source.worker.send((command, source.stream_id, *args))
+        return len(sources)
+
+    def pause(self, guild_id):
+        return self.control(guild_id, 'pause')
+
+    def resume(self, guild_id):
+        return self.control(guild_id, 'resume')
+
+    def seek(self, guild_id, seconds):
+        return self.control(guild_id, 'seek', seconds)
+
+    def volume(self, guild_id, value):
+        return self.control(guild_id, 'volume', value)
+
+    async def status(self, loop, timeout=2.0):
+        """Collect status from every live worker"""
+        futures = []
+        for worker in self.workers:
+            if not worker.is_alive():
+                continue
+            request_id = next(self.status_ids)
+            future = loop.create_future()
+            self.status_waiters[request_id] = (loop, future)
+            worker.send(('status', request_id))
+            futures.append((request_id, future))
+
+        results = []
+        for request_id, future in futures:
+            try:
+                results.append(await asyncio.wait_for(future, timeout))
+            except asyncio.TimeoutError:
+                results.append({'error': 'timeout'})
+            finally:
+                self.status_waiters.pop(request_id, None)
+        return results
+
+    def resolve_status(self, request_id, data):
+        waiter = self.status_waiters.get(request_id)
+        if waiter:
+            loop, future = waiter
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(data))
+
+    def close(self):
+        for source in list(self.sources.values()):
+            source.end()
+        self.sources.clear()
+        for worker in self.workers:
+            worker.close()
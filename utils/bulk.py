@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import os
+import time
+
+import discord
+
+from utils.metrics import REGISTRY
+
+log = logging.getLogger(__name__)
+
+BULK_CONCURRENCY = int(os.getenv('BULK_CONCURRENCY', '4'))
+# Progress embeds are edited at most this often
+PROGRESS_INTERVAL = 2.0
+RATE_LIMIT_RETRIES = 3
+
+BULK_ACTIONS = REGISTRY.counter('bulk_actions_total', 'Targets processed by bulk moderation jobs', ('action', 'result'))
+RATE_LIMIT_WAITS = REGISTRY.counter('bulk_rate_limit_waits_total', 'Times a bulk job paused a route after a 429', ('route',))
+
+# route key -> monotonic time the route may be used again
+route_gates = {}
+
+
+async def wait_for_route(route):
+    while True:
+        delay = route_gates.get(route, 0) - time.monotonic()
+        if delay <= 0:
+            return
+        await asyncio.sleep(delay)
+
+
+def close_route(route, retry_after):
+    """Hold every worker on a route until its bucket has reset"""
+    route_gates[route] = max(route_gates.get(route, 0), time.monotonic() + retry_after)
+    RATE_LIMIT_WAITS.inc(route[0])
+
+
+class Skip(Exception):
+    """Raised by an action to leave a target alone (counted separately from failures)"""
+
+
+class BulkJob:
+    """Runs an async action over many targets with a fixed number of workers.
+
+    Workers on the same route (e.g. ('ban', guild_id)) share a gate: a 429
+    closes it for the Retry-After, so the pool backs off together instead of
+    piling more requests onto an exhausted bucket. py-cord already waits for
+    buckets it has seen the headers of; the gate covers the rest.
+    """
+
+    def __init__(self, name, targets, action, route, concurrency=BULK_CONCURRENCY):
+        self.name = name
+        self.targets = list(targets)
+        self.action = action
+        self.route = route
+        self.concurrency = concurrency
+        self.next_index = 0
+        self.succeeded = 0
+        self.skipped = []  # (target, reason)
+        self.failed = []  # (target, error)
+        self.cancelled = False
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def processed(self):
+        return self.succeeded + len(self.skipped) + len(self.failed)
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def cancel(self):
+        self.cancelled = True
+
+    async def run(self, on_progress=None):
+        """Process every target; on_progress(job) is awaited every PROGRESS_INTERVAL"""
+        self.started_at = time.monotonic()
+        reporter = asyncio.create_task(self.report(on_progress)) if on_progress else None
+        try:
+            await asyncio.gather(*(self.worker() for _ in range(min(self.concurrency, len(self.targets)))))
+        finally:
+            self.finished_at = time.monotonic()
+            if reporter:
+                reporter.cancel()
+        return self
+
+    async def report(self, on_progress):
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            try:
+                await on_progress(self)
+            except Exception as e:
+                log.debug(f"Bulk progress update failed: {e}")
+
+    async def worker(self):
+        while not self.cancelled and self.next_index < len(self.targets):
+            target = self.targets[self.next_index]
+            self.next_index += 1
+            await self.process(target)
+
+    async def process(self, target):
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            await wait_for_route(self.route)
+            try:
+                await self.action(target)
+            except Skip as e:
+                self.skipped.append((target, str(e)))
+                BULK_ACTIONS.inc(self.name, 'skipped')
+                return
+            except discord.HTTPException as e:
+                if e.status == 429 and attempt < RATE_LIMIT_RETRIES:
+                    close_route(self.route, float(e.response.headers.get('Retry-After', 5)))
+                    continue
+                self.failed.append((target, e.text or str(e)))
+                BULK_ACTIONS.inc(self.name, 'failed')
+                return
+            self.succeeded += 1
+            BULK_ACTIONS.inc(self.name, 'ok')
+            return
+
+
+def progress_bar(done, total, width=20):
+    filled = int(width * done / total) if total else width
+    return f"`{'█' * filled}{'░' * (width - filled)}` {done}/{total}"
+
+
+class ConfirmView(discord.ui.View):
+    """Confirm / cancel buttons only the invoking user can press"""
+
+    def __init__(self, author, confirm_label="Confirm", timeout=60):
+        super().__init__(timeout=timeout)
+        self.author = author
+        self.confirmed = False
+        self.children[0].label = confirm_label
+
+    async def interaction_check(self, interaction):
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message("❌ Only the person who ran the command can use this!", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger)
+    async def confirm_button(self, button: discord.ui.Button, interaction: discord.Interaction):
+        self.confirmed = True
+        await interaction.response.defer()
+        self.stop()
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel_button(self, button: discord.ui.Button, interaction: discord.Interaction):
+        await interaction.response.defer()
+        self.stop()
+
+
+class CancelView(discord.ui.View):
+    """A stop button for a running job; only the invoking user can press it"""
+
+    def __init__(self, author, job):
+        super().__init__(timeout=None)
+        self.author = author
+        self.job = job
+
+    async def interaction_check(self, interaction):
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message("❌ Only the person who ran the command can use this!", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Stop", emoji="⏹️", style=discord.ButtonStyle.danger)
+    async def stop_button(self, button: discord.ui.Button, interaction: discord.Interaction):
+        self.job.cancel()
+        button.disabled = True
+        button.label = "Stopping..."
+        await interaction.response.edit_message(view=self)
@@ -0,0 +1,81 @@
+import logging
+import os
+
+import discord
+
+log = logging.getLogger(__name__)
+
+# Profiles for INTENTS_PROFILE:
+#   lean - what the cogs use: guilds, members (join/leave), guild messages (automod),
+#          voice states; no presences
+#   all  - every intent with full member chunking at startup (the old behaviour)
+INTENTS_PROFILES = ('lean', 'all')
+
+# Policies for MEMBER_CACHE:
+#   voice  - only members in voice channels (and the bot itself) stay cached
+#   joined - also keep members seen joining while the bot is running
+#   all    - cache every member the gateway sends
+# py-cord only dispatches on_member_remove for cached members, so leave
+# handling listens to on_raw_member_remove, which fires under every policy.
+MEMBER_CACHE_POLICIES = ('voice', 'joined', 'all')
+
+
+def get_intents_profile():
+    profile = os.getenv('INTENTS_PROFILE', 'lean').lower()
+    if profile not in INTENTS_PROFILES:
+        log.warning(f"⚠️ Unknown INTENTS_PROFILE '{profile}', using 'lean'")
+        profile = 'lean'
+    return profile
+
+
+def get_member_cache_policy(profile):
+    default = 'all' if profile == 'all' else 'voice'
+    policy = os.getenv('MEMBER_CACHE', default).lower()
+    if policy not in MEMBER_CACHE_POLICIES:
+        log.warning(f"⚠️ Unknown MEMBER_CACHE '{policy}', using '{default}'")
+        policy = default
+    return policy
+
+
+def build_intents(profile):
+    """Gateway intents for a profile"""
+    if profile == 'all':
+        return discord.Intents.all()
+
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.members = True        # on_member_join / on_raw_member_remove
+    intents.voice_states = True   # Music needs to see who is in voice
+    intents.bans = True           # Ban and unban events
+    intents.guild_messages = True  # Automod sees every guild message
+    intents.message_content = True  # ...and needs the text for duplicate detection
+    return intents
+
+
+def build_member_cache_flags(policy, intents):
+    """Member cache flags for a policy; the bot's own member is always cached"""
+    if policy == 'all':
+        return discord.MemberCacheFlags.from_intents(intents)
+
+    flags = discord.MemberCacheFlags.none()
+    flags.voice = intents.voice_states
+    if policy == 'joined':
+        flags.joined = intents.members
+    return flags
+
+
+def get_bot_options():
+    """Intents, member cache and chunking options for the bot constructor.
+
+    Chunking at startup downloads every member of every guild before
+    on_ready, so it is only done for the 'all' member cache policy. Other
+    policies fetch members on demand (guild.chunk() or fetch_member).
+    """
+    profile = get_intents_profile()
+    policy = get_member_cache_policy(profile)
+    intents = build_intents(profile)
+    return profile, policy, {
+        'intents': intents,
+        'member_cache_flags': build_member_cache_flags(policy, intents),
+        'chunk_guilds_at_startup': policy == 'all',
+    }
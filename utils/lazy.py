@@ -0,0 +1,79 @@
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+
+# Every lazy module created so far, by name
+LAZY_MODULES = {}
+
+
+class LazyModule:
+    """Stand-in for a heavy module that is only imported on first use.
+
+    Cogs bind the proxy at module level as if it were the real import, so
+    their slash commands register straight away while the import cost moves
+    to the first command that needs it or to the background warm-up.
+    """
+
+    def __init__(self, name):
+        self.__dict__['name'] = name
+        self.__dict__['module'] = None
+        self.__dict__['import_seconds'] = None
+        self.__dict__['lock'] = threading.Lock()
+
+    @property
+    def available(self):
+        """Whether the module is installed, without importing it"""
+        if self.module is not None or self.name in sys.modules:
+            return True
+        try:
+            return importlib.util.find_spec(self.name) is not None
+        except (ImportError, ValueError):
+            return False
+
+    @property
+    def loaded(self):
+        return self.module is not None
+
+    def load(self):
+        """Import the module once, thread-safe"""
+        if self.module is None:
+            with self.lock:
+                if self.module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self.name)
+                    self.__dict__['import_seconds'] = time.perf_counter() - started
+                    self.__dict__['module'] = module
+        return self.module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<LazyModule {self.name} ({state})>"
+
+
+def lazy_import(name):
+    """Return the shared LazyModule for name"""
+    if name not in LAZY_MODULES:
+        LAZY_MODULES[name] = LazyModule(name)
+    return LAZY_MODULES[name]
+
+
+def warm_up(names=None):
+    """Import lazy modules now (meant for a worker thread); returns {name: seconds or error}"""
+    results = {}
+    for name, module in list(LAZY_MODULES.items()):
+        if names is not None and name not in names:
+            continue
+        if not module.available:
+            results[name] = 'not installed'
+            continue
+        try:
+            module.load()
+            results[name] = round(module.import_seconds, 3)
+        except Exception as e:
+            results[name] = f"failed: {e}"
+    return results
@@ -0,0 +1,234 @@
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import wave
+
+log = logging.getLogger(__name__)
+
+# Try to import mutagen for tags and durations, with fallback to file names
+try:
+    import mutagen
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
+
+AUDIO_EXTENSIONS = {'.mp3', '.flac', '.ogg', '.opus', '.m4a', '.aac', '.wav', '.webm'}
+LOCAL_PREFIX = 'local://'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    artist TEXT NOT NULL DEFAULT '',
+    album TEXT NOT NULL DEFAULT '',
+    duration INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_tracks_artist ON tracks (artist COLLATE NOCASE);
+"""
+
+# Full-text index kept in sync with the tracks table by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5(
+    title, artist, album, content='tracks', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS tracks_ai AFTER INSERT ON tracks BEGIN
+    INSERT INTO tracks_fts (rowid, title, artist, album) VALUES (new.id, new.title, new.artist, new.album);
+END;
+CREATE TRIGGER IF NOT EXISTS tracks_ad AFTER DELETE ON tracks BEGIN
+    INSERT INTO tracks_fts (tracks_fts, rowid, title, artist, album) VALUES ('delete', old.id, old.title, old.artist, old.album);
+END;
+CREATE TRIGGER IF NOT EXISTS tracks_au AFTER UPDATE ON tracks BEGIN
+    INSERT INTO tracks_fts (tracks_fts, rowid, title, artist, album) VALUES ('delete', old.id, old.title, old.artist, old.album);
+    INSERT INTO tracks_fts (rowid, title, artist, album) VALUES (new.id, new.title, new.artist, new.album);
+END;
+"""
+
+
+def is_local_url(url):
+    return isinstance(url, str) and url.startswith(LOCAL_PREFIX)
+
+
+def read_tags(path):
+    """Read (title, artist, album, duration) from an audio file"""
+    title = os.path.splitext(os.path.basename(path))[0].replace('_', ' ')
+    artist = album = ''
+    duration = 0
+
+    if MUTAGEN_AVAILABLE:
+        try:
+            audio = mutagen.File(path, easy=True)
+            if audio is not None:
+                tags = audio.tags or {}
+                title = (tags.get('title') or [title])[0]
+                artist = (tags.get('artist') or [''])[0]
+                album = (tags.get('album') or [''])[0]
+                if audio.info and getattr(audio.info, 'length', None):
+                    duration = int(audio.info.length)
+        except Exception as e:
+            log.warning(f"Could not read tags for {path}: {e}")
+    elif path.lower().endswith('.wav'):
+        try:
+            with wave.open(path) as wav:
+                duration = int(wav.getnframes() / wav.getframerate())
+        except Exception:
+            pass
+
+    return title, artist, album, duration
+
+
+class LocalLibrary:
+    """A directory of audio files indexed in SQLite for network-free playback"""
+
+    def __init__(self, root, db_path):
+        self.root = os.path.abspath(root)
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.scan_lock = threading.Lock()  # One scan at a time; lookups only wait on self.lock
+        self.last_scan = None
+        self.last_scan_stats = {}
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+        try:
+            self.db.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False  # SQLite built without FTS5, fall back to LIKE
+        self.db.commit()
+
+    def scan(self):
+        """Incrementally index the library, re-reading only new or changed files.
+
+        The walk and tag reads happen without holding self.lock, so lookups
+        from the event loop are not blocked by a scan; the lock is only
+        held for the read of known files and the final write transaction.
+        """
+        started = time.perf_counter()
+        stats = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+
+        with self.scan_lock:
+            with self.lock:
+                known = {row['path']: (row['mtime'], row['size'])
+                         for row in self.db.execute("SELECT path, mtime, size FROM tracks")}
+            seen = set()
+            changed = []  # (rel_path, mtime, size, title, artist, album, duration)
+
+            for dirpath, _, filenames in os.walk(self.root):
+                for filename in filenames:
+                    if os.path.splitext(filename)[1].lower() not in AUDIO_EXTENSIONS:
+                        continue
+                    full_path = os.path.join(dirpath, filename)
+                    rel_path = os.path.relpath(full_path, self.root)
+                    seen.add(rel_path)
+                    try:
+                        st = os.stat(full_path)
+                    except OSError:
+                        continue
+
+                    if known.get(rel_path) == (st.st_mtime, st.st_size):
+                        stats['unchanged'] += 1
+                        continue
+                    changed.append((rel_path, st.st_mtime, st.st_size) + read_tags(full_path))
+
+            removed = [path for path in known if path not in seen]
+            with self.lock, self.db:
+                for rel_path, mtime, size, title, artist, album, duration in changed:
+                    if rel_path in known:
+                        self.db.execute(
+                            "UPDATE tracks SET mtime=?, size=?, title=?, artist=?, album=?, duration=? WHERE path=?",
+                            (mtime, size, title, artist, album, duration, rel_path)
+                        )
+                        stats['updated'] += 1
+                    else:
+                        self.db.execute(
+                            "INSERT INTO tracks (path, mtime, size, title, artist, album, duration) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (rel_path, mtime, size, title, artist, album, duration)
+                        )
+                        stats['added'] += 1
+                for path in removed:
+                    self.db.execute("DELETE FROM tracks WHERE path=?", (path,))
+            stats['removed'] = len(removed)
+
+        stats['seconds'] = round(time.perf_counter() - started, 3)
+        self.last_scan = time.time()
+        self.last_scan_stats = stats
+        return stats
+
+    def to_result(self, row):
+        """Convert a row into the search result shape used by the Music cog"""
+        return {
+            'title': row['title'],
+            'url': LOCAL_PREFIX + row['path'],
+            'webpage_url': LOCAL_PREFIX + row['path'],
+            'duration': row['duration'],
+            'uploader': row['artist'] or 'Local library',
+            'thumbnail': ''
+        }
+
+    def search(self, query, limit=5):
+        """Search titles, artists and albums"""
+        words = [word for word in query.replace('"', ' ').split() if word]
+        if not words:
+            return []
+        with self.lock:
+            if self.fts:
+                match = ' '.join(f'"{word}"*' for word in words)
+                rows = self.db.execute(
+                    "SELECT tracks.* FROM tracks_fts JOIN tracks ON tracks.id = tracks_fts.rowid "
+                    "WHERE tracks_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (match, limit)
+                ).fetchall()
+            else:
+                clauses = " AND ".join("(title || ' ' || artist || ' ' || album) LIKE ?" for _ in words)
+                rows = self.db.execute(
+                    f"SELECT * FROM tracks WHERE {clauses} LIMIT ?",
+                    [f"%{word}%" for word in words] + [limit]
+                ).fetchall()
+        return [self.to_result(row) for row in rows]
+
+    def get(self, url):
+        """Look up an indexed track by its local:// URL"""
+        if not is_local_url(url):
+            return None
+        with self.lock:
+            row = self.db.execute("SELECT * FROM tracks WHERE path=?", (url[len(LOCAL_PREFIX):],)).fetchone()
+        return self.to_result(row) if row else None
+
+    def path_for(self, url):
+        """Absolute file path for a local:// URL, refusing paths outside the library"""
+        if not is_local_url(url):
+            return None
+        full_path = os.path.abspath(os.path.join(self.root, url[len(LOCAL_PREFIX):]))
+        if os.path.commonpath([full_path, self.root]) != self.root or not os.path.isfile(full_path):
+            return None
+        return full_path
+
+    def recommend(self, url, limit=5):
+        """Pick other tracks by the same artist, topped up with random ones"""
+        track = self.get(url)
+        with self.lock:
+            rows = []
+            if track and track['uploader'] != 'Local library':
+                rows = self.db.execute(
+                    "SELECT * FROM tracks WHERE artist = ? COLLATE NOCASE AND path != ? ORDER BY RANDOM() LIMIT ?",
+                    (track['uploader'], url[len(LOCAL_PREFIX):], limit)
+                ).fetchall()
+            if len(rows) < limit:
+                rows += self.db.execute(
+                    "SELECT * FROM tracks ORDER BY RANDOM() LIMIT ?", (limit - len(rows),)
+                ).fetchall()
+        results = [self.to_result(row) for row in rows if row['path'] != url[len(LOCAL_PREFIX):]]
+        random.shuffle(results)
+        return results[:limit]
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
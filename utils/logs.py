@@ -0,0 +1,165 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+# LOG_LEVEL sets the default level; LOG_LEVELS overrides it per module, e.g.
+# "Cogs.Music=DEBUG,discord=WARNING". LOG_FORMAT=json emits one JSON object per line.
+DEFAULT_LEVELS = 'discord=WARNING,aiohttp=WARNING'
+
+# Records below WARNING from one call site are limited to SAMPLE_BURST per
+# SAMPLE_WINDOW seconds; the rest are counted and reported with the next one
+SAMPLE_BURST = int(os.getenv('LOG_SAMPLE_BURST', '20'))
+SAMPLE_WINDOW = float(os.getenv('LOG_SAMPLE_WINDOW', '60'))
+
+# Structured fields callers can pass with extra={...}
+CONTEXT_FIELDS = ('guild', 'command', 'stage', 'user', 'shard')
+
+listener = None
+
+
+class SamplingFilter(logging.Filter):
+    """Rate-limit noisy hot-path records per call site, before they are queued"""
+
+    def __init__(self, burst=SAMPLE_BURST, window=SAMPLE_WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.sites = {}  # (pathname, lineno) -> [window start, passed, suppressed]
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.burst <= 0:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self.lock:
+            site = self.sites.get(key)
+            if site is None or now - site[0] >= self.window:
+                suppressed = site[2] if site else 0
+                self.sites[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if site[1] < self.burst:
+                site[1] += 1
+                return True
+            site[2] += 1
+            return False
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines with structured fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s: %(message)s', '%Y-%m-%d %H:%M:%S')
+
+    def format(self, record):
+        line = super().format(record)
+        fields = [f"{name}={getattr(record, name)}" for name in CONTEXT_FIELDS if getattr(record, name, None) is not None]
+        if getattr(record, 'suppressed', 0):
+            fields.append(f"suppressed={record.suppressed}")
+        if fields:
+            first, newline, rest = line.partition('\n')
+            line = f"{first} [{' '.join(fields)}]{newline}{rest}"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record for log shippers"""
+
+    def format(self, record):
+        data = {
+            'time': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                data[name] = value
+        if getattr(record, 'suppressed', 0):
+            data['suppressed'] = record.suppressed
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exception'] = record.exc_text  # Rendered by DeferredQueueHandler
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """A QueueHandler that leaves formatting to the listener thread.
+
+    The stock prepare() formats the record in the caller's thread and drops
+    exc_info, so formatters on the listener never see the exception. Only
+    the traceback is rendered here, into exc_text (the frames it refers to
+    may be gone by the time the listener runs); the message is left as
+    msg and args.
+    """
+
+    exception_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(value):
+    """Parse "Cogs.Music=DEBUG,discord=WARNING" into {logger: level}"""
+    levels = {}
+    for part in (value or '').split(','):
+        if '=' in part:
+            name, level = part.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging():
+    """Route all logging through a queue drained by a background thread.
+
+    Callers only pay for building the record (plus rendering a traceback,
+    if any) and a queue put; message formatting and the stdout write happen
+    on the listener thread. Safe to call more than once.
+    """
+    global listener
+    if listener is not None:
+        return listener
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if os.getenv('LOG_FORMAT', '').lower() == 'json' else TextFormatter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+    levels = parse_levels(DEFAULT_LEVELS)
+    levels.update(parse_levels(os.getenv('LOG_LEVELS')))
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_logging)
+    return listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
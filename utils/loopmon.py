@@ -0,0 +1,194 @@
+import asyncio
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from utils.metrics import Histogram
+
+log = logging.getLogger(__name__)
+
+# Scheduling lag buckets in seconds; finer at the low end than the default buckets
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def is_project_frame(filename):
+    """Whether a frame belongs to the bot's own code rather than the stdlib or a dependency"""
+    filename = os.path.abspath(filename)
+    if not filename.startswith(PROJECT_ROOT + os.sep) or filename == os.path.abspath(__file__):
+        return False
+    # Virtualenvs and Replit's .pythonlibs live inside the project too
+    parts = os.path.relpath(filename, PROJECT_ROOT).split(os.sep)
+    return 'site-packages' not in parts and not any(part.startswith('.') for part in parts)
+
+
+class BlockingEvent:
+    """One stretch of time the event loop spent blocked"""
+    __slots__ = ('started_at', 'duration', 'call_site', 'task', 'stack')
+
+    def __init__(self, started_at, call_site, task, stack):
+        self.started_at = started_at
+        self.duration = None
+        self.call_site = call_site
+        self.task = task
+        self.stack = stack
+
+    def to_dict(self):
+        return {
+            'started_at': self.started_at,
+            'duration': round(self.duration, 3) if self.duration is not None else None,
+            'call_site': self.call_site,
+            'task': self.task,
+            'stack': self.stack,
+        }
+
+
+class LoopLagMonitor:
+    """Measures event loop scheduling lag and captures what blocked it.
+
+    A heartbeat coroutine sleeps for ``interval`` and records how late it
+    woke up. A watcher thread checks the heartbeat; once the loop has not
+    ticked for ``threshold`` seconds it grabs the loop thread's stack with
+    sys._current_frames(), so the report names the call that is blocking
+    while it is still blocking.
+    """
+
+    def __init__(self, threshold=0.25, interval=0.05, history=50):
+        self.threshold = threshold
+        self.interval = interval
+        self.lag = Histogram(LAG_BUCKETS)
+        self.events = collections.deque(maxlen=history)
+        self.call_sites = {}  # call site -> {'count', 'total', 'max', 'task'}
+        self.lock = threading.Lock()
+        self.loop = None
+        self.loop_thread_id = None
+        self.last_beat = None
+        self.current = None  # BlockingEvent for a stall in progress
+        self.task = None
+        self.thread = None
+        self.stopping = threading.Event()
+        self.started_at = None
+
+    def ensure_running(self):
+        """Start the heartbeat on the running loop and the watcher thread"""
+        if self.task is not None and not self.task.done():
+            return
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.started_at = time.time()
+        self.task = self.loop.create_task(self.heartbeat())
+        if self.thread is None or not self.thread.is_alive():
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self.watch, name='loop-lag-watcher', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            with self.lock:
+                self.lag.observe(lag)
+                self.last_beat = now
+                if self.current is not None:
+                    self.finish(self.current, lag)
+                    self.current = None
+
+    def watch(self):
+        """Watcher thread: capture the loop's stack once it stops ticking"""
+        while not self.stopping.wait(self.threshold / 2):
+            with self.lock:
+                stalled_for = time.monotonic() - self.last_beat - self.interval
+                if self.current is None and stalled_for >= self.threshold:
+                    self.current = self.capture()
+
+    def capture(self):
+        """Snapshot the loop thread's stack and the task it is running"""
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return BlockingEvent(time.time(), 'unknown', None, [])
+
+        summary = traceback.extract_stack(frame)
+        stack = [f"{os.path.relpath(entry.filename, PROJECT_ROOT) if is_project_frame(entry.filename) else entry.filename}"
+                 f":{entry.lineno} in {entry.name}" for entry in summary[-12:]]
+
+        # The innermost frame in our own code is the call to fix
+        call_site = None
+        for entry in reversed(summary):
+            if is_project_frame(entry.filename):
+                call_site = f"{os.path.relpath(entry.filename, PROJECT_ROOT)}:{entry.lineno} in {entry.name}"
+                break
+        if call_site is None and summary:
+            call_site = f"{summary[-1].filename}:{summary[-1].lineno} in {summary[-1].name}"
+
+        task = asyncio.tasks._current_tasks.get(self.loop)
+        task_name = None
+        if task is not None:
+            coro = task.get_coro()
+            task_name = getattr(coro, '__qualname__', None) or task.get_name()
+        return BlockingEvent(time.time(), call_site, task_name, stack)
+
+    def finish(self, event, lag):
+        """Record a stall once the loop is running again"""
+        event.duration = lag
+        self.events.append(event)
+        site = self.call_sites.setdefault(event.call_site, {'count': 0, 'total': 0.0, 'max': 0.0, 'task': event.task})
+        site['count'] += 1
+        site['total'] += lag
+        site['max'] = max(site['max'], lag)
+        site['task'] = event.task or site['task']
+        log.warning(f"🐢 Event loop blocked for {lag * 1000:.0f}ms at {event.call_site}"
+              + (f" (task {event.task})" if event.task else ""))
+
+    def top_call_sites(self, limit=10):
+        """Call sites ordered by total time spent blocking the loop"""
+        with self.lock:
+            sites = [dict(site, call_site=name) for name, site in self.call_sites.items()]
+        sites.sort(key=lambda site: site['total'], reverse=True)
+        return sites[:limit]
+
+    def recent(self, limit=10):
+        with self.lock:
+            return [event.to_dict() for event in list(self.events)[-limit:]]
+
+    def snapshot(self):
+        with self.lock:
+            lag = self.lag.snapshot()
+            stalls = sum(site['count'] for site in self.call_sites.values())
+        return {
+            'threshold': self.threshold,
+            'interval': self.interval,
+            'running_since': self.started_at,
+            'lag': lag,
+            'stalls': stalls,
+            'top_call_sites': self.top_call_sites(),
+            'recent': self.recent(),
+        }
+
+    def reset(self):
+        with self.lock:
+            self.lag = Histogram(LAG_BUCKETS)
+            self.events.clear()
+            self.call_sites.clear()
+
+
+def get_loop_monitor(bot):
+    """Return the bot-wide loop lag monitor, creating it on first use"""
+    monitor = getattr(bot, 'loop_monitor', None)
+    if monitor is None:
+        monitor = LoopLagMonitor(threshold=int(os.getenv('LOOP_LAG_THRESHOLD_MS', '250')) / 1000)
+        bot.loop_monitor = monitor
+    return monitor
@@ -0,0 +1,315 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+# Bucket upper bounds in seconds, shared by every histogram
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        """Record a single observation"""
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction):
+        """Approximate a percentile using bucket upper bounds"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self):
+        """Return a JSON-serialisable summary"""
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'avg': round(self.total / self.count, 6) if self.count else 0.0,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'max': round(self.max, 6),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets + ('+Inf',), self.counts)},
+        }
+
+
+class StageTimings:
+    """Per-stage duration histograms, labelled by cache hit or miss"""
+
+    def __init__(self, stages=()):
+        self.stages = list(stages)
+        self.histograms = {}
+        self.lock = threading.Lock()  # Audio threads record too
+
+    def record(self, stage, seconds, cache_hit=None):
+        """Record how long a stage took"""
+        label = 'hit' if cache_hit else ('miss' if cache_hit is not None else 'n/a')
+        with self.lock:
+            key = (stage, label)
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+                if stage not in self.stages:
+                    self.stages.append(stage)
+            self.histograms[key].observe(seconds)
+
+    @contextmanager
+    def span(self, stage, cache_hit=None):
+        """Time the body of a with-block as one stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, cache_hit)
+
+    def snapshot(self):
+        """Return {stage: {label: histogram summary}} in pipeline order"""
+        with self.lock:
+            result = {}
+            for stage in self.stages:
+                labels = {label: hist.snapshot() for (name, label), hist in self.histograms.items() if name == stage}
+                if labels:
+                    result[stage] = labels
+            return result
+
+    def reset(self):
+        """Drop every recorded observation"""
+        with self.lock:
+            self.histograms.clear()
+
+
+def format_labels(labelnames, values, extra=()):
+    """Render {name="value",...} for the exposition format"""
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def histogram_lines(name, labelnames, values, histogram):
+    """Exposition lines for one Histogram: cumulative buckets, sum and count"""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{format_labels(labelnames, values, [('le', bound)])} {cumulative}")
+    lines.append(f"{name}_sum{format_labels(labelnames, values)} {histogram.total}")
+    lines.append(f"{name}_count{format_labels(labelnames, values)} {histogram.count}")
+    return lines
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values"""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def lines(self):
+        with self.lock:
+            items = list(self.values.items())
+        return [f"{self.name}{format_labels(self.labelnames, labels)} {value}" for labels, value in items]
+
+
+class Gauge:
+    """Value that goes up and down.
+
+    Either set it directly, or give it a function that is only called at
+    scrape time (returning a number, or {label values tuple: number}), which
+    keeps things like queue lengths off the hot path entirely.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.function = function
+        self.lock = threading.Lock()
+
+    def set(self, value, *labels):
+        with self.lock:
+            self.values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set_function(self, function):
+        self.function = function
+
+    def lines(self):
+        if self.function is not None:
+            try:
+                result = self.function()
+            except Exception as e:
+                log.warning(f"Gauge {self.name} failed: {e}")
+                return []
+            items = result.items() if isinstance(result, dict) else [((), result)]
+        else:
+            with self.lock:
+                items = list(self.values.items())
+        return [f"{self.name}{format_labels(self.labelnames, labels)} {value}"
+                for labels, value in items if value is not None]
+
+
+class HistogramMetric:
+    """Histogram split by label values"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        self.children = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self.lock:
+            child = self.children.get(labels)
+            if child is None:
+                child = self.children[labels] = Histogram(self.buckets)
+            child.observe(value)
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def lines(self):
+        with self.lock:
+            items = list(self.children.items())
+        lines = []
+        for labels, histogram in items:
+            lines.extend(histogram_lines(self.name, self.labelnames, labels, histogram))
+        return lines
+
+
+class MetricsRegistry:
+    """Every metric the bot exposes, rendered in the Prometheus text format.
+
+    Getting a metric by name returns the existing one, so cogs can register
+    at import time and again after a hot reload without duplicating series.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = {}  # name -> function returning exposition lines
+
+    def get_or_create(self, cls, name, documentation, labelnames=(), **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, documentation, labelnames, **kwargs)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), function=None):
+        metric = self.get_or_create(Gauge, name, documentation, labelnames)
+        if function is not None:
+            metric.set_function(function)  # A reloaded cog replaces the old callback
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.get_or_create(HistogramMetric, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, name, function):
+        """Add (or replace) a function producing extra exposition lines at scrape time"""
+        self.collectors[name] = function
+
+    def render(self):
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.lines())
+        for name, collector in list(self.collectors.items()):
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                log.warning(f"Metrics collector {name} failed: {e}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# Shared by every cog that writes a moderation data file, labelled by file
+MODERATION_WRITES = REGISTRY.counter('moderation_writes_total', 'Writes to moderation data files', ('store',))
+MODERATION_WRITE_SECONDS = REGISTRY.histogram('moderation_write_seconds', 'Time to write a moderation data file', ('store',))
+
+
+def stage_timings_collector(name, documentation, timings):
+    """Collector exposing a StageTimings as a histogram labelled by stage and cache"""
+    def collect():
+        with timings.lock:
+            items = sorted(timings.histograms.items())
+        lines = [f"# HELP {name} {documentation}", f"# TYPE {name} histogram"]
+        for (stage, label), histogram in items:
+            lines.extend(histogram_lines(name, ('stage', 'cache'), (stage, label), histogram))
+        return lines
+    return collect
+
+
+def histogram_collector(name, documentation, get_histogram):
+    """Collector exposing a single unlabelled Histogram owned elsewhere"""
+    def collect():
+        return [f"# HELP {name} {documentation}", f"# TYPE {name} histogram"] + \
+            histogram_lines(name, (), (), get_histogram())
+    return collect
+
+
+async def start_metrics_server(host, port, registry=REGISTRY):
+    """Serve /metrics over HTTP; returns the aiohttp runner (call cleanup() to stop)"""
+    from aiohttp import web
+
+    async def handle_metrics(request):
+        return web.Response(text=registry.render(), content_type='text/plain', charset='utf-8',
+                            headers={'X-Content-Type-Options': 'nosniff'})
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,172 @@
+import asyncio
+import datetime
+import logging
+import os
+import time
+
+import discord
+
+from utils.metrics import REGISTRY
+
+log = logging.getLogger(__name__)
+
+# Discord only bulk-deletes messages younger than 14 days; keep a margin for long runs
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=10)
+BULK_DELETE_SIZE = 100
+# Older messages are deleted one at a time, this far apart
+SINGLE_DELETE_INTERVAL = float(os.getenv('PURGE_SINGLE_DELETE_INTERVAL', '1.0'))
+# Old messages waiting for the single-delete lane; the history scan pauses when it is full
+SINGLE_QUEUE_SIZE = 200
+# Messages looked at before giving up on finding `limit` matches
+MAX_SCAN = int(os.getenv('PURGE_MAX_SCAN', '100000'))
+PROGRESS_INTERVAL = 2.0
+
+PURGE_DELETED = REGISTRY.counter('purge_deleted_total', 'Messages deleted by /clear', ('lane',))
+PURGE_SCANNED = REGISTRY.counter('purge_scanned_total', 'Messages scanned by /clear')
+
+
+def text_matcher(pattern):
+    """A case-insensitive "contains" check where * in pattern matches any run of text.
+
+    Moderator input is never compiled as a regular expression: a pattern
+    like (a+)+$ can backtrack for minutes on one long message, and the
+    check runs on the event loop. Pieces between the *s are found left to
+    right with str.find, so a check is linear in the message length.
+    """
+    pieces = [piece for piece in pattern.casefold().split('*') if piece]
+
+    def matches(text):
+        text = text.casefold()
+        position = 0
+        for piece in pieces:
+            position = text.find(piece, position)
+            if position < 0:
+                return False
+            position += len(piece)
+        return True
+
+    return matches
+
+
+class PurgeJob:
+    """Deletes up to `limit` matching messages from a channel's history.
+
+    History is streamed page by page, so memory stays bounded by one
+    bulk-delete batch plus the single-delete queue no matter how far back
+    the scan goes. Messages young enough are bulk-deleted 100 at a time;
+    older ones go to a paced lane that deletes them individually while the
+    scan continues.
+    """
+
+    def __init__(self, channel, limit, check, before=None, reason=None):
+        self.channel = channel
+        self.limit = limit
+        self.check = check
+        self.before = before
+        self.reason = reason
+        self.scanned = 0
+        self.matched = 0
+        self.bulk_deleted = 0
+        self.single_deleted = 0
+        self.failed = 0
+        self.cancelled = False
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def deleted(self):
+        return self.bulk_deleted + self.single_deleted
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def cancel(self):
+        self.cancelled = True
+
+    async def run(self, on_progress=None):
+        self.started_at = time.monotonic()
+        reporter = asyncio.create_task(self.report(on_progress)) if on_progress else None
+        old_messages = asyncio.Queue(maxsize=SINGLE_QUEUE_SIZE)
+        single_lane = asyncio.create_task(self.delete_singly(old_messages))
+        try:
+            batch = []
+            async for message in self.channel.history(limit=MAX_SCAN, before=self.before):
+                if self.cancelled:
+                    break
+                self.scanned += 1
+                PURGE_SCANNED.inc()
+                if not self.check(message):
+                    continue
+                self.matched += 1
+                if self.bulk_deletable(message):
+                    batch.append(message)
+                    if len(batch) == BULK_DELETE_SIZE:
+                        await self.delete_batch(batch, old_messages)
+                        batch = []
+                else:
+                    await old_messages.put(message)  # Waits while the lane is behind
+                if self.matched >= self.limit:
+                    break
+            if batch and not self.cancelled:
+                await self.delete_batch(batch, old_messages)
+            await old_messages.put(None)
+            await single_lane
+        finally:
+            single_lane.cancel()
+            self.finished_at = time.monotonic()
+            if reporter:
+                reporter.cancel()
+        return self
+
+    @staticmethod
+    def bulk_deletable(message):
+        return discord.utils.utcnow() - message.created_at < BULK_DELETE_MAX_AGE
+
+    async def delete_batch(self, batch, old_messages):
+        # A long run can age messages past the bulk-delete limit while they wait
+        young = []
+        for message in batch:
+            if self.bulk_deletable(message):
+                young.append(message)
+            else:
+                await old_messages.put(message)
+        if not young:
+            return
+        try:
+            await self.channel.delete_messages(young, reason=self.reason)
+            self.bulk_deleted += len(young)
+            PURGE_DELETED.inc('bulk', amount=len(young))
+        except discord.HTTPException as e:
+            self.failed += len(young)
+            log.warning(f"Bulk delete of {len(young)} messages failed: {e}", extra={'guild': self.channel.guild.id})
+
+    async def delete_singly(self, old_messages):
+        """The paced lane for messages too old to bulk-delete"""
+        while True:
+            message = await old_messages.get()
+            if message is None:
+                return
+            if self.cancelled:
+                continue  # Keep draining so the scan is never stuck on a full queue
+            started = time.monotonic()
+            try:
+                await message.delete(reason=self.reason)
+                self.single_deleted += 1
+                PURGE_DELETED.inc('single')
+            except discord.NotFound:
+                pass  # Already gone
+            except discord.HTTPException as e:
+                self.failed += 1
+                log.debug(f"Single delete failed: {e}")
+            await asyncio.sleep(max(0.0, SINGLE_DELETE_INTERVAL - (time.monotonic() - started)))
+
+    async def report(self, on_progress):
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            try:
+                await on_progress(self)
+            except Exception as e:
+                log.debug(f"Purge progress update failed: {e}")
@@ -0,0 +1,178 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+# Rebuild the heap once this share of its entries are cancelled leftovers
+COMPACT_RATIO = 0.5
+
+
+class ScheduledJob:
+    """A single deferred call registered with the Scheduler"""
+    __slots__ = ('key', 'when', 'seq', 'callback', 'args', 'cancelled')
+
+    def __init__(self, key, when, seq, callback, args):
+        self.key = key
+        self.when = when
+        self.seq = seq
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.when, self.seq) < (other.when, other.seq)
+
+    @property
+    def kind(self):
+        return self.key[0] if isinstance(self.key, tuple) else str(self.key)
+
+
+class Scheduler:
+    """Heap-based timer service with a single wakeup loop for all deferred work.
+
+    Jobs are identified by a key (usually a tuple whose first item is the job
+    kind, e.g. ``('file_expiry', guild_id, url)``). Scheduling a key that is
+    already pending replaces it. Scheduling is O(log n); cancellation marks the
+    job and leaves it for the loop to discard, with periodic compaction.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.jobs = {}
+        self.counter = itertools.count()
+        self.cancelled_count = 0
+        self.running = set()  # Coroutines started by due jobs
+        self.wakeup = None
+        self.task = None
+        self.fired = 0
+
+    def schedule(self, key, delay, callback, *args):
+        """Run callback(*args) after delay seconds, replacing any job with the same key"""
+        self.cancel(key)
+        job = ScheduledJob(key, time.monotonic() + max(0, delay), next(self.counter), callback, args)
+        self.jobs[key] = job
+        heapq.heappush(self.heap, job)
+        self.ensure_running()
+        if self.heap[0] is job:
+            self.wakeup.set()
+        return job
+
+    def cancel(self, key):
+        """Cancel a pending job, returning True if there was one"""
+        job = self.jobs.pop(key, None)
+        if job is None:
+            return False
+        job.cancelled = True
+        self.cancelled_count += 1
+        if self.cancelled_count > len(self.heap) * COMPACT_RATIO:
+            self.compact()
+        return True
+
+    def cancel_prefix(self, *prefix):
+        """Cancel every job whose tuple key starts with prefix"""
+        size = len(prefix)
+        keys = [key for key in self.jobs if isinstance(key, tuple) and key[:size] == prefix]
+        for key in keys:
+            self.cancel(key)
+        return len(keys)
+
+    def is_scheduled(self, key):
+        return key in self.jobs
+
+    def compact(self):
+        """Drop cancelled jobs from the heap"""
+        self.heap = [job for job in self.heap if not job.cancelled]
+        heapq.heapify(self.heap)
+        self.cancelled_count = 0
+
+    def pending_counts(self):
+        """Number of pending jobs per kind"""
+        counts = {}
+        for job in self.jobs.values():
+            counts[job.kind] = counts.get(job.kind, 0) + 1
+        return counts
+
+    def next_due_in(self):
+        """Seconds until the next pending job, or None"""
+        while self.heap and self.heap[0].cancelled:
+            heapq.heappop(self.heap)
+            self.cancelled_count -= 1
+        if not self.heap:
+            return None
+        return max(0.0, self.heap[0].when - time.monotonic())
+
+    def stats(self):
+        return {
+            'pending': len(self.jobs),
+            'by_kind': self.pending_counts(),
+            'heap_size': len(self.heap),
+            'running': len(self.running),
+            'fired': self.fired,
+            'next_due_in': self.next_due_in(),
+        }
+
+    def ensure_running(self):
+        """Start the wakeup loop on the current event loop if needed"""
+        if self.wakeup is None:
+            self.wakeup = asyncio.Event()
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self):
+        """Sleep until the earliest job is due, run everything due, repeat"""
+        while True:
+            self.wakeup.clear()
+            delay = self.next_due_in()
+            if delay is None:
+                await self.wakeup.wait()
+                continue
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                    continue  # An earlier job was added
+                except asyncio.TimeoutError:
+                    pass
+
+            now = time.monotonic()
+            while self.heap and self.heap[0].when <= now:
+                job = heapq.heappop(self.heap)
+                if job.cancelled:
+                    self.cancelled_count -= 1
+                    continue
+                if self.jobs.get(job.key) is job:
+                    del self.jobs[job.key]
+                self.fire(job)
+
+    def fire(self, job):
+        self.fired += 1
+        try:
+            result = job.callback(*job.args)
+            if inspect.isawaitable(result):
+                task = asyncio.ensure_future(result)
+                self.running.add(task)
+                task.add_done_callback(self.job_done)
+        except Exception as e:
+            log.exception(f"Scheduled job {job.key} failed: {e}")
+
+    def job_done(self, task):
+        self.running.discard(task)
+        if not task.cancelled() and task.exception():
+            log.error(f"Scheduled job failed: {task.exception()}", exc_info=task.exception())
+
+
+def get_scheduler(bot):
+    """Return the bot-wide scheduler, creating it on first use"""
+    scheduler = getattr(bot, 'scheduler', None)
+    if scheduler is None:
+        scheduler = Scheduler()
+        bot.scheduler = scheduler
+    return scheduler
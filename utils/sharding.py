@@ -0,0 +1,163 @@
+import json
+import os
+import time
+
+
+def parse_shard_ids(value):
+    """Parse "0-3,8" into [0, 1, 2, 3, 8]; None or empty means all shards"""
+    if not value:
+        return None
+    shard_ids = []
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            shard_ids.extend(range(int(start), int(end) + 1))
+        else:
+            shard_ids.append(int(part))
+    return sorted(set(shard_ids))
+
+
+def format_shard_ids(shard_ids):
+    """Format [0, 1, 2, 3, 8] back into "0-3,8\""""
+    if not shard_ids:
+        return ''
+    ranges = []
+    start = prev = shard_ids[0]
+    for shard_id in shard_ids[1:] + [None]:
+        if shard_id is not None and shard_id == prev + 1:
+            prev = shard_id
+            continue
+        ranges.append(f"{start}-{prev}" if start != prev else str(start))
+        if shard_id is not None:
+            start = prev = shard_id
+    return ','.join(ranges)
+
+
+def split_shards(shard_count, processes):
+    """Split shard ids into contiguous ranges, one per process"""
+    processes = max(1, min(processes, shard_count))
+    size, extra = divmod(shard_count, processes)
+    ranges = []
+    start = 0
+    for index in range(processes):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+def shard_id_for(guild_id, shard_count):
+    """The shard Discord routes a guild to"""
+    return (guild_id >> 22) % max(1, shard_count)
+
+
+def get_shard_config():
+    """Read sharding settings from the environment.
+
+    AUTOSHARD=1 lets Discord pick the shard count; SHARD_COUNT and SHARD_IDS pin
+    this process to specific shards (launcher.py sets both). Raises ValueError
+    for SHARD_IDS without SHARD_COUNT, which would otherwise be ignored.
+    """
+    shard_count = os.getenv('SHARD_COUNT')
+    config = {
+        'autoshard': os.getenv('AUTOSHARD', '').lower() in ('1', 'true', 'yes'),
+        'shard_count': int(shard_count) if shard_count else None,
+        'shard_ids': parse_shard_ids(os.getenv('SHARD_IDS')),
+    }
+    if config['shard_ids'] is not None:
+        if not config['shard_count']:
+            raise ValueError("SHARD_IDS needs SHARD_COUNT (the total number of shards) to be set too")
+        if config['shard_ids'][-1] >= config['shard_count']:
+            raise ValueError(f"SHARD_IDS must be below SHARD_COUNT ({config['shard_count']})")
+    return config
+
+
+def shard_latencies(bot):
+    """[(shard_id, latency_seconds)] for sharded and unsharded bots"""
+    latencies = getattr(bot, 'latencies', None)
+    if latencies is not None:
+        return list(latencies)
+    return [(bot.shard_id or 0, bot.latency)]
+
+
+def guilds_by_shard(bot):
+    """{shard_id: [guild, ...]} for the guilds this process serves"""
+    shard_count = bot.shard_count or 1
+    grouped = {}
+    for guild in bot.guilds:
+        shard_id = guild.shard_id if guild.shard_id is not None else shard_id_for(guild.id, shard_count)
+        grouped.setdefault(shard_id, []).append(guild)
+    return grouped
+
+
+def owns_guild(bot, guild_id):
+    """True if the guild's shard runs in this process (always, for an unsharded bot)"""
+    shard_ids = getattr(bot, 'shard_ids', None)
+    if not shard_ids:
+        return True
+    return shard_id_for(guild_id, bot.shard_count) in shard_ids
+
+
+def is_primary_process(bot):
+    """True for the process that owns shard 0 (or an unsharded bot).
+
+    Work on state shared between shard processes, like the music library
+    index, runs only here so processes don't repeat it.
+    """
+    shard_ids = getattr(bot, 'shard_ids', None)
+    return not shard_ids or 0 in shard_ids
+
+
+def shard_status(bot):
+    """Per-shard snapshot of this process: latency, guilds and voice sessions"""
+    guilds = guilds_by_shard(bot)
+    voice = {}
+    for voice_client in bot.voice_clients:
+        guild = getattr(voice_client, 'guild', None)
+        if guild is not None:
+            shard_id = guild.shard_id if guild.shard_id is not None else shard_id_for(guild.id, bot.shard_count or 1)
+            voice[shard_id] = voice.get(shard_id, 0) + 1
+    shards = []
+    for shard_id, latency in shard_latencies(bot):
+        shards.append({
+            'shard_id': shard_id,
+            'latency_ms': round(latency * 1000, 1) if latency == latency and latency != float('inf') else None,
+            'guilds': len(guilds.get(shard_id, [])),
+            'voice_sessions': voice.get(shard_id, 0),
+        })
+    return {
+        'pid': os.getpid(),
+        'shard_count': bot.shard_count or 1,
+        'shards': shards,
+        'updated_at': time.time(),
+    }
+
+
+def write_shard_status(bot, directory):
+    """Write this process's shard status where launcher.py can collect it"""
+    os.makedirs(directory, exist_ok=True)
+    status = shard_status(bot)
+    label = format_shard_ids([shard['shard_id'] for shard in status['shards']]) or '0'
+    path = os.path.join(directory, f"shards_{label}.json")
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(status, f)
+    os.replace(tmp_path, path)
+
+
+def read_shard_status(directory):
+    """Collect the status files written by every shard process"""
+    statuses = []
+    if not os.path.isdir(directory):
+        return statuses
+    for filename in sorted(os.listdir(directory)):
+        if filename.startswith('shards_') and filename.endswith('.json'):
+            try:
+                with open(os.path.join(directory, filename)) as f:
+                    statuses.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return statuses
@@ -0,0 +1,96 @@
+import json
+import logging
+import os
+import resource
+import time
+
+log = logging.getLogger(__name__)
+
+STARTUP_REPORT_FILE = os.getenv('STARTUP_REPORT_FILE', 'startup_report.json')
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """Peak resident set size in MB (ru_maxrss is KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def collect_startup_stats(bot, started_at):
+    """Time to on_ready, memory and cache sizes for the current run"""
+    return {
+        'startup_seconds': round(time.perf_counter() - started_at, 3),
+        'rss_mb': round(current_rss_mb(), 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'guilds': len(bot.guilds),
+        'cached_members': sum(len(guild.members) for guild in bot.guilds),
+        'cached_users': len(bot.users),
+        'recorded_at': time.time(),
+    }
+
+
+def record_startup(label, stats, path=STARTUP_REPORT_FILE):
+    """Store this run's stats under its label and return every stored run"""
+    try:
+        with open(path) as f:
+            runs = json.load(f)
+    except (OSError, ValueError):
+        runs = {}
+    runs[label] = stats
+    try:
+        with open(path, 'w') as f:
+            json.dump(runs, f, indent=2)
+    except OSError as e:
+        log.warning(f"⚠️ Could not write startup report: {e}")
+    return runs
+
+
+def format_comparison(label, runs):
+    """Lines comparing this run with the last run of every other label"""
+    current = runs[label]
+    lines = [f"⏱️ [{label}] on_ready in {current['startup_seconds']}s • RSS {current['rss_mb']} MB "
+             f"(peak {current['peak_rss_mb']} MB) • {current['cached_members']} members cached"]
+    for other, stats in sorted(runs.items()):
+        if other == label:
+            continue
+        time_delta = current['startup_seconds'] - stats['startup_seconds']
+        rss_delta = current['rss_mb'] - stats['rss_mb']
+        lines.append(f"   vs [{other}]: {stats['startup_seconds']}s ({time_delta:+.2f}s), "
+                     f"{stats['rss_mb']} MB ({rss_delta:+.1f} MB), {stats['cached_members']} members")
+    return lines
+
+
+def record_cog_load(stats, name, module, started_at, load_seconds):
+    """Remember when an extension finished loading and which lazy modules it uses"""
+    from utils.lazy import LazyModule
+    stats[name] = {
+        'load_seconds': round(load_seconds, 3),
+        'loaded_at': round(time.perf_counter() - started_at, 3),
+        'lazy_modules': sorted(value.name for value in vars(module).values() if isinstance(value, LazyModule)),
+    }
+
+
+def format_cog_report(cog_stats, ready_seconds, warm_up_results=None):
+    """Per-cog lines: import time, and when each cog was fully usable relative to on_ready"""
+    lines = []
+    for name, stats in sorted(cog_stats.items(), key=lambda item: -item[1]['load_seconds']):
+        line = f"   {name}: loaded in {stats['load_seconds']}s (at {stats['loaded_at']}s, on_ready at {ready_seconds}s)"
+        if stats['lazy_modules']:
+            if warm_up_results is None:
+                line += f" • deferred: {', '.join(stats['lazy_modules'])}"
+            else:
+                parts = []
+                for module_name in stats['lazy_modules']:
+                    result = warm_up_results.get(module_name)
+                    parts.append(f"{module_name} {result}s" if isinstance(result, float) else f"{module_name} ({result})")
+                line += f" • warmed: {', '.join(parts)}"
+        lines.append(line)
+    return lines
@@ -0,0 +1,69 @@
+import re
+
+# {name} or {name.attribute}; anything else in braces is left as literal text
+PLACEHOLDER = re.compile(r'\{([a-z_]+(?:\.[a-z_]+)?)\}')
+
+
+class TemplateError(ValueError):
+    """A message template uses placeholders that are not available"""
+
+    def __init__(self, unknown, available):
+        self.unknown = unknown
+        self.available = available
+        super().__init__(
+            f"Unknown placeholder{'s' if len(unknown) > 1 else ''} "
+            f"{', '.join('{' + name + '}' for name in unknown)}"
+        )
+
+
+class Template:
+    """A message compiled once into a format string plus the getters that fill it.
+
+    render(subject) is a single str.format call over the getters applied to
+    one object (e.g. the member who joined), so nothing is parsed per event.
+    """
+    __slots__ = ('source', 'names', 'getters', 'format')
+
+    def __init__(self, source, names, getters, format_string):
+        self.source = source
+        self.names = names
+        self.getters = getters
+        self.format = format_string.format
+
+    def render(self, subject):
+        return self.format(*[getter(subject) for getter in self.getters])
+
+
+def escape(text):
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def compile_template(source, variables, strict=True):
+    """Compile source against {placeholder: getter}.
+
+    Unknown placeholders raise TemplateError when strict, otherwise they are
+    kept as literal text (for messages saved before validation existed).
+    """
+    pieces, names, getters, unknown = [], [], [], []
+    position = 0
+    for match in PLACEHOLDER.finditer(source):
+        name = match.group(1)
+        getter = variables.get(name)
+        if getter is None:
+            unknown.append(name)
+            continue
+        pieces.append(escape(source[position:match.start()]))
+        pieces.append('{}')
+        names.append(name)
+        getters.append(getter)
+        position = match.end()
+    pieces.append(escape(source[position:]))
+
+    if unknown and strict:
+        raise TemplateError(unknown, sorted(variables))
+    return Template(source, tuple(names), tuple(getters), ''.join(pieces))
+
+
+def format_placeholders(variables):
+    """Placeholder list for help text and error messages"""
+    return ', '.join(f"`{{{name}}}`" for name in variables)
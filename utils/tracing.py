@@ -0,0 +1,280 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+import discord
+from discord.ext import commands
+
+from utils.metrics import Histogram, REGISTRY
+
+log = logging.getLogger(__name__)
+
+# Discord drops an interaction that has no response 3 seconds after it was created
+INTERACTION_DEADLINE = 3.0
+# Defer on the command's behalf if it has not responded this long after creation
+AUTO_DEFER_AT = float(os.getenv('AUTO_DEFER_AT', '2.2'))
+# Defer straight away for commands whose recent p90 time-to-first-response is above this
+PREDEFER_P90 = 1.5
+PREDEFER_MIN_SAMPLES = 5
+
+COMMANDS = REGISTRY.counter('bot_commands_total', 'Application commands invoked', ('command',))
+COMMAND_ERRORS = REGISTRY.counter('bot_command_errors_total', 'Application commands that raised', ('command',))
+COMMAND_SECONDS = REGISTRY.histogram('bot_command_seconds', 'Application command run time', ('command',))
+FIRST_RESPONSE_SECONDS = REGISTRY.histogram('bot_command_first_response_seconds',
+                                            'Time from interaction creation to the first response', ('command',))
+COMMAND_DEFERS = REGISTRY.counter('bot_command_defers_total', 'Deferred command responses', ('command', 'kind'))
+DEADLINE_MISSES = REGISTRY.counter('bot_command_deadline_misses_total',
+                                   'Commands that did not respond within the interaction deadline', ('command',))
+
+
+class CommandStats:
+    """Latency and outcome counters for one slash command"""
+
+    def __init__(self):
+        self.invocations = 0
+        self.failures = 0
+        self.deferred = 0
+        self.auto_deferred = 0
+        self.deadline_misses = 0
+        self.ephemeral = False  # Whether the command's last own first response was ephemeral
+        self.first_response = Histogram()
+        self.completion = Histogram()
+
+    def snapshot(self):
+        return {
+            'invocations': self.invocations,
+            'failures': self.failures,
+            'deferred': self.deferred,
+            'auto_deferred': self.auto_deferred,
+            'deadline_misses': self.deadline_misses,
+            'first_response': self.first_response.snapshot(),
+            'completion': self.completion.snapshot(),
+        }
+
+
+class CommandTracer:
+    """Per-command time-to-first-response, completion time, deferrals and failures"""
+
+    def __init__(self):
+        self.commands = {}
+        self.lock = threading.Lock()
+
+    def stats_for(self, name):
+        with self.lock:
+            stats = self.commands.get(name)
+            if stats is None:
+                stats = self.commands[name] = CommandStats()
+            return stats
+
+    def should_predefer(self, name):
+        """Whether a command has been responding close enough to the deadline to defer up front"""
+        stats = self.commands.get(name)
+        return (stats is not None and stats.first_response.count >= PREDEFER_MIN_SAMPLES
+                and stats.first_response.percentile(0.9) >= PREDEFER_P90)
+
+    def snapshot(self):
+        with self.lock:
+            return {name: stats.snapshot() for name, stats in self.commands.items()}
+
+    def reset(self):
+        with self.lock:
+            self.commands.clear()
+
+
+def get_command_tracer(bot):
+    """Return the bot-wide command tracer, creating it on first use"""
+    tracer = getattr(bot, 'command_tracer', None)
+    if tracer is None:
+        tracer = CommandTracer()
+        bot.command_tracer = tracer
+    return tracer
+
+
+class CommandTrace:
+    """Timing of a single command invocation"""
+
+    def __init__(self, tracer, interaction):
+        self.tracer = tracer
+        self.received = time.perf_counter()
+        # Interaction ids are snowflakes, so they carry Discord's creation time;
+        # clamp the age to absorb clock skew between us and Discord
+        age = time.time() - discord.utils.snowflake_time(interaction.id).timestamp()
+        self.created = self.received - min(max(age, 0.0), INTERACTION_DEADLINE / 2)
+        self.command = None
+        self.first_response_at = None
+        self.first_response_kind = None
+        self.auto_deferred = False
+        self.deferred_answered = False
+        self.deferred_ephemeral = False
+        self.auto_defer_task = None
+
+    def mark_response(self, kind, ephemeral=None):
+        """Record the first response to Discord (message, defer or modal)"""
+        if self.first_response_at is not None:
+            return
+        if ephemeral is not None and self.command is not None and not self.auto_deferred:
+            self.tracer.stats_for(self.command).ephemeral = ephemeral
+        self.first_response_at = time.perf_counter()
+        self.first_response_kind = kind
+        if self.command is not None:
+            elapsed = self.first_response_at - self.created
+            stats = self.tracer.stats_for(self.command)
+            stats.first_response.observe(elapsed)
+            FIRST_RESPONSE_SECONDS.observe(elapsed, self.command)
+            if kind == 'defer':
+                kind_label = 'auto' if self.auto_deferred else 'manual'
+                if self.auto_deferred:
+                    stats.auto_deferred += 1
+                else:
+                    stats.deferred += 1
+                COMMAND_DEFERS.inc(self.command, kind_label)
+            if elapsed > INTERACTION_DEADLINE:
+                stats.deadline_misses += 1
+                DEADLINE_MISSES.inc(self.command)
+
+
+class TracedInteractionResponse(discord.InteractionResponse):
+    """Interaction response that reports the first response to its trace.
+
+    After the tracer deferred on a command's behalf, a later send_message is
+    turned into an edit of the deferred "thinking" message (or an ephemeral
+    followup), so command code written for a fast response keeps working.
+    """
+
+    def __init__(self, parent, trace):
+        super().__init__(parent)
+        self.trace = trace
+        self.lock = asyncio.Lock()
+
+    async def defer(self, *args, **kwargs):
+        async with self.lock:
+            if self.trace.auto_deferred and self.is_done():
+                return None  # Already deferred for this command
+            result = await super().defer(*args, **kwargs)
+            self.trace.mark_response('defer', kwargs.get('ephemeral', False))
+            return result
+
+    async def send_message(self, content=None, **kwargs):
+        async with self.lock:
+            if self.trace.auto_deferred and self.is_done():
+                return await self.answer_deferred(content, **kwargs)
+            result = await super().send_message(content, **kwargs)
+            self.trace.mark_response('message', kwargs.get('ephemeral', False))
+            return result
+
+    async def edit_message(self, **kwargs):
+        async with self.lock:
+            if self.trace.auto_deferred and self.is_done():
+                return await self._parent.edit_original_response(**kwargs)
+            result = await super().edit_message(**kwargs)
+            self.trace.mark_response('edit')
+            return result
+
+    async def send_modal(self, modal):
+        async with self.lock:
+            result = await super().send_modal(modal)
+            self.trace.mark_response('modal')
+            return result
+
+    async def answer_deferred(self, content=None, ephemeral=False, delete_after=None, **kwargs):
+        """Deliver the command's first response after an automatic defer"""
+        parent = self._parent
+        self.trace.deferred_answered = True
+        kwargs.pop('tts', None)
+        if ephemeral and not self.trace.deferred_ephemeral:
+            # The placeholder is public; remove it first so the followup is a new, private message
+            try:
+                await parent.delete_original_response()
+            except discord.HTTPException:
+                pass
+            return await parent.followup.send(content, ephemeral=True, **kwargs)
+        edit_kwargs = {key: value for key, value in kwargs.items()
+                       if key in ('embed', 'embeds', 'view', 'file', 'files', 'allowed_mentions')}
+        message = await parent.edit_original_response(content=content, **edit_kwargs)
+        if delete_after is not None:
+            await message.delete(delay=delete_after)
+        return message
+
+    async def auto_defer(self, delay):
+        """Defer if the command has not responded by the time delay runs out"""
+        await asyncio.sleep(max(0.0, delay))
+        async with self.lock:
+            if self.is_done():
+                return
+            self.trace.auto_deferred = True
+            # Defer the way this command usually answers, so the placeholder matches
+            self.trace.deferred_ephemeral = self.trace.tracer.stats_for(self.trace.command).ephemeral
+            try:
+                await discord.InteractionResponse.defer(self, ephemeral=self.trace.deferred_ephemeral)
+                self.trace.mark_response('defer')
+            except discord.HTTPException as e:
+                self.trace.auto_deferred = False
+                log.warning(f"Auto-defer failed: {e}", extra={'command': self.trace.command})
+
+
+class TracedContext(discord.ApplicationContext):
+    """Application context that traces response latency for its command"""
+
+    def __init__(self, bot, interaction):
+        super().__init__(bot, interaction)
+        self.trace = CommandTrace(get_command_tracer(bot), interaction)
+        # Interaction.response is a cached slot; seed it with the traced version
+        interaction._cs_response = TracedInteractionResponse(interaction, self.trace)
+
+    @property
+    def respond(self):
+        # After an automatic defer the command's first respond() still has to
+        # replace the placeholder, which a plain followup would not do for
+        # ephemeral replies
+        if self.trace.auto_deferred and not self.trace.deferred_answered:
+            return self.interaction.response.answer_deferred
+        return super().respond
+
+
+class TracedBotMixin:
+    """Wraps every application command with latency tracing and automatic deferral"""
+
+    async def get_application_context(self, interaction, cls=None):
+        return await super().get_application_context(interaction, cls=cls or TracedContext)
+
+    async def invoke_application_command(self, ctx):
+        trace = getattr(ctx, 'trace', None)
+        if trace is None or ctx.command is None:
+            return await super().invoke_application_command(ctx)
+
+        name = ctx.command.qualified_name
+        trace.command = name
+        tracer = trace.tracer
+        stats = tracer.stats_for(name)
+        stats.invocations += 1
+        COMMANDS.inc(name)
+
+        response = ctx.interaction.response
+        if isinstance(response, TracedInteractionResponse):
+            delay = 0.0 if tracer.should_predefer(name) else AUTO_DEFER_AT - (time.perf_counter() - trace.created)
+            trace.auto_defer_task = asyncio.create_task(response.auto_defer(delay))
+
+        try:
+            await super().invoke_application_command(ctx)
+        finally:
+            if trace.auto_defer_task is not None and not trace.auto_deferred:
+                trace.auto_defer_task.cancel()
+            elapsed = time.perf_counter() - trace.created
+            stats.completion.observe(elapsed)
+            COMMAND_SECONDS.observe(elapsed, name)
+            if getattr(ctx, 'command_failed', False):
+                stats.failures += 1
+                COMMAND_ERRORS.inc(name)
+            if trace.first_response_at is None:
+                stats.deadline_misses += 1
+                DEADLINE_MISSES.inc(name)
+
+
+class TracedBot(TracedBotMixin, commands.Bot):
+    pass
+
+
+class TracedAutoShardedBot(TracedBotMixin, commands.AutoShardedBot):
+    pass
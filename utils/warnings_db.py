@@ -0,0 +1,282 @@
+"""SQLite storage for moderation warnings, with a write-behind cache in front.
+
+Import an existing warnings.json (also done automatically when the table is empty):
+
+    python -m utils.warnings_db import Cogs/Moderation/warnings.json
+"""
+import argparse
+import asyncio
+import atexit
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from utils.metrics import REGISTRY
+
+log = logging.getLogger(__name__)
+
+# Journaled warnings reach disk at most FLUSH_DELAY seconds after they were
+# added, or straight away once FLUSH_BATCH of them are waiting
+FLUSH_DELAY = float(os.getenv('WARNINGS_FLUSH_DELAY', '2'))
+FLUSH_BATCH = int(os.getenv('WARNINGS_FLUSH_BATCH', '200'))
+BATCH_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+FLUSHES = REGISTRY.counter('moderation_warnings_flushes_total', 'Batched warning flushes to SQLite', ('result',))
+FLUSH_BATCH_SIZE = REGISTRY.histogram('moderation_warnings_flush_batch_size', 'Warnings written per flush',
+                                      buckets=BATCH_BUCKETS)
+FLUSH_LAG = REGISTRY.histogram('moderation_warnings_flush_lag_seconds',
+                               'Time the oldest warning in a flush waited in the journal')
+FLUSH_SECONDS = REGISTRY.histogram('moderation_warnings_flush_seconds', 'Time to write one flush batch')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS warnings (
+    id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    moderator_id INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_warnings_guild_user ON warnings (guild_id, user_id, id);
+"""
+
+
+def connect(db_path, schema):
+    """Open a moderation database in WAL mode and make sure its tables exist"""
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    db = sqlite3.connect(db_path, check_same_thread=False)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints, no fsync per commit
+    db.executescript(schema)
+    db.commit()
+    return db
+
+
+class WarningsStore:
+    """Warnings per guild and user, in SQLite with write-ahead logging"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.db = connect(db_path, SCHEMA)
+
+    @staticmethod
+    def to_warning(row):
+        """Convert a row into the dict shape warnings.json used"""
+        return {
+            'reason': row['reason'],
+            'moderator': str(row['moderator_id']),
+            'timestamp': row['created_at'],
+        }
+
+    def add_many(self, rows):
+        """Insert (guild_id, user_id, moderator_id, reason, timestamp) rows in one transaction"""
+        with self.lock, self.db:
+            self.db.executemany(
+                "INSERT INTO warnings (guild_id, user_id, moderator_id, reason, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def all_warnings(self):
+        """Every warning as (guild_id, user_id, warning), oldest first"""
+        with self.lock:
+            rows = self.db.execute("SELECT * FROM warnings ORDER BY id").fetchall()
+        return [(row['guild_id'], row['user_id'], self.to_warning(row)) for row in rows]
+
+    def delete_before(self, guild_id, cutoff):
+        """Delete a guild's warnings created before cutoff (ISO time)"""
+        with self.lock, self.db:
+            return self.db.execute(
+                "DELETE FROM warnings WHERE guild_id=? AND created_at<?", (guild_id, cutoff)
+            ).rowcount
+
+    def is_empty(self):
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM warnings LIMIT 1").fetchone() is None
+
+    def import_json(self, json_path):
+        """Copy every warning from a warnings.json file; returns how many were imported"""
+        with open(json_path) as f:
+            data = json.load(f)
+        rows = []
+        for guild_id, users in data.items():
+            for user_id, warnings in users.items():
+                for warning in warnings:
+                    rows.append((int(guild_id), int(user_id), int(warning.get('moderator', 0)),
+                                 warning.get('reason', 'No reason provided'),
+                                 warning.get('timestamp') or datetime.datetime.now().isoformat()))
+        self.add_many(rows)
+        return len(rows)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class WarningsCache:
+    """Authoritative in-memory warnings, written behind to a WarningsStore.
+
+    Reads and counts never touch the database. Each new warning goes into
+    memory and a journal; a scheduler job writes the journal out in a single
+    transaction on the thread pool. Whatever is still journaled at shutdown
+    is flushed synchronously.
+    """
+
+    def __init__(self, store, scheduler, delay=FLUSH_DELAY, batch=FLUSH_BATCH):
+        self.store = store
+        self.scheduler = scheduler
+        self.delay = delay
+        self.batch = batch
+        self.warnings = {}  # (guild_id, user_id) -> [warning], oldest first
+        self.journal = []  # Rows for WarningsStore.add_many, not yet on disk
+        self.journal_since = None  # When the oldest journaled row was added
+        self.flush_lock = asyncio.Lock()
+        self.flushing = False
+        self.closed = False
+
+        for guild_id, user_id, warning in store.all_warnings():
+            self.warnings.setdefault((guild_id, user_id), []).append(warning)
+
+        REGISTRY.gauge('moderation_warnings_pending', 'Warnings journaled but not yet on disk',
+                       function=lambda: len(self.journal))
+        atexit.register(self.flush_sync)
+
+    def add_warning(self, guild_id, user_id, moderator_id, reason):
+        """Record a warning and return the user's new warning count"""
+        timestamp = datetime.datetime.now().isoformat()
+        warnings = self.warnings.setdefault((guild_id, user_id), [])
+        warnings.append({'reason': reason, 'moderator': str(moderator_id), 'timestamp': timestamp})
+
+        if not self.journal:
+            self.journal_since = time.monotonic()
+        self.journal.append((guild_id, user_id, moderator_id, reason, timestamp))
+        if len(self.journal) >= self.batch:
+            self.scheduler.schedule(('warnings_flush',), 0, self.flush)
+        elif not self.scheduler.is_scheduled(('warnings_flush',)):
+            self.scheduler.schedule(('warnings_flush',), self.delay, self.flush)
+        return len(warnings)
+
+    def get_warnings(self, guild_id, user_id, limit=None):
+        """A user's warnings, oldest first (only the newest `limit` if given)"""
+        warnings = self.warnings.get((guild_id, user_id), [])
+        return list(warnings[-limit:] if limit else warnings)
+
+    def count_warnings(self, guild_id, user_id):
+        return len(self.warnings.get((guild_id, user_id), ()))
+
+    async def expire(self, guild_id, cutoff):
+        """Drop a guild's warnings created before cutoff (ISO time).
+
+        Returns the timestamp of the oldest warning the guild has left, or None.
+        """
+        oldest = None
+        for key in [key for key in self.warnings if key[0] == guild_id]:
+            kept = [warning for warning in self.warnings[key] if warning['timestamp'] >= cutoff]
+            if kept:
+                self.warnings[key] = kept
+                oldest = min(oldest or kept[0]['timestamp'], kept[0]['timestamp'])
+            else:
+                del self.warnings[key]
+        # Journaled warnings are seconds old, so none of them can be past the cutoff
+        async with self.flush_lock:
+            await asyncio.get_running_loop().run_in_executor(None, self.store.delete_before, guild_id, cutoff)
+        return oldest
+
+    def take_journal(self):
+        rows, since = self.journal, self.journal_since
+        self.journal, self.journal_since = [], None
+        return rows, since
+
+    def write(self, rows, since):
+        """Write one batch (on any thread) and record the flush metrics"""
+        with FLUSH_SECONDS.time():
+            self.store.add_many(rows)
+        FLUSHES.inc('ok')
+        FLUSH_BATCH_SIZE.observe(len(rows))
+        FLUSH_LAG.observe(time.monotonic() - since)
+
+    async def flush(self):
+        """Write the journal to disk; on failure it is put back and retried"""
+        async with self.flush_lock:
+            if not self.journal:
+                return
+            rows, since = self.take_journal()
+            self.flushing = True
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.write, rows, since)
+            except Exception as e:
+                FLUSHES.inc('failed')
+                log.error(f"❌ Failed to flush {len(rows)} warnings: {e}")
+                self.journal[:0] = rows
+                self.journal_since = since
+                if not self.closed:
+                    self.scheduler.schedule(('warnings_flush',), self.delay, self.flush)
+            finally:
+                self.flushing = False
+            if self.closed:
+                self.close()
+
+    def flush_sync(self):
+        """Write the journal from the calling thread; used at unload and exit"""
+        if not self.journal or self.flushing:
+            return
+        rows, since = self.take_journal()
+        try:
+            self.write(rows, since)
+        except Exception as e:
+            FLUSHES.inc('failed')
+            log.error(f"❌ Failed to flush {len(rows)} warnings: {e}")
+            self.journal[:0] = rows
+            self.journal_since = since
+
+    def close(self):
+        """Flush what is left and close the store (after a flush in progress finishes)"""
+        self.closed = True
+        self.scheduler.cancel(('warnings_flush',))
+        if self.flushing:
+            return
+        self.flush_sync()
+        atexit.unregister(self.flush_sync)
+        self.store.close()
+
+
+def import_if_empty(store, json_path):
+    """Seed an empty store from the legacy JSON file, if there is one"""
+    if not os.path.exists(json_path) or not store.is_empty():
+        return 0
+    try:
+        count = store.import_json(json_path)
+    except (OSError, ValueError) as e:
+        log.warning(f"⚠️ Could not import {json_path}: {e}")
+        return 0
+    if count:
+        log.info(f"📥 Imported {count} warnings from {json_path}")
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the warnings database")
+    parser.add_argument('--db', default=os.getenv('MODERATION_DB', 'Cogs/Moderation/data/moderation.db'))
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    import_parser = subcommands.add_parser('import', help="Import warnings from a warnings.json file")
+    import_parser.add_argument('json_path')
+    import_parser.add_argument('--force', action='store_true', help="Import even if the database already has warnings")
+    args = parser.parse_args(argv)
+
+    store = WarningsStore(args.db)
+    if not store.is_empty() and not args.force:
+        print(f"❌ {args.db} already has warnings; use --force to import anyway (duplicates are not detected)")
+        return 1
+    count = store.import_json(args.json_path)
+    print(f"✅ Imported {count} warnings into {args.db}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
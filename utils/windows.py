@@ -0,0 +1,62 @@
+class SlidingWindowCounter:
+    """Events over the last `window` seconds, kept in a fixed ring of buckets.
+
+    The window slides one bucket at a time, so counts are exact to within
+    window/buckets seconds. Memory is fixed per counter and each call
+    clears at most `buckets` slots, i.e. O(1) per event.
+    """
+    __slots__ = ('width', 'counts', 'total', 'head', 'head_tick')
+
+    def __init__(self, window, buckets=8):
+        self.width = window / buckets
+        self.counts = [0] * buckets
+        self.total = 0
+        self.head = 0  # Slot of the current bucket
+        self.head_tick = 0  # int(time / width) of the current bucket
+
+    def advance(self, now):
+        tick = int(now / self.width)
+        steps = tick - self.head_tick
+        if steps <= 0:
+            return
+        size = len(self.counts)
+        if steps >= size:
+            for i in range(size):
+                self.counts[i] = 0
+            self.total = 0
+            self.head = tick % size
+        else:
+            for _ in range(steps):
+                self.head = (self.head + 1) % size
+                self.total -= self.counts[self.head]
+                self.counts[self.head] = 0
+        self.head_tick = tick
+
+    def add(self, now, amount=1):
+        """Record `amount` events at `now` and return the count in the window"""
+        self.advance(now)
+        self.counts[self.head] += amount
+        self.total += amount
+        return self.total
+
+    def count(self, now):
+        self.advance(now)
+        return self.total
+
+
+class RecentValues:
+    """The last `size` values with the time they were seen, in a ring"""
+    __slots__ = ('times', 'values', 'index')
+
+    def __init__(self, size):
+        self.times = [0.0] * size
+        self.values = [None] * size
+        self.index = 0
+
+    def add(self, now, value, window):
+        """Record value and return how many of the kept values equal it within the window"""
+        self.times[self.index] = now
+        self.values[self.index] = value
+        self.index = (self.index + 1) % len(self.values)
+        cutoff = now - window
+        return sum(1 for seen, kept in zip(self.times, self.values) if kept == value and seen >= cutoff)
@@ -0,0 +1,182 @@
+import collections
+import itertools
+import re
+
+# Entries containing these are wildcard patterns (* = any letters, ? = one letter)
+WILDCARDS = ('*', '?')
+
+
+class AhoCorasick:
+    """Aho–Corasick automaton: finds every term in one pass over the text.
+
+    The cost of a scan depends on the text length (plus matches found),
+    not on how many terms were compiled in.
+    """
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self.goto = [{}]  # node -> {character: node}
+        self.fail = [0]
+        self.output = [()]  # node -> indexes of the terms ending at this node
+
+        for index, term in enumerate(self.terms):
+            node = 0
+            for character in term:
+                child = self.goto[node].get(character)
+                if child is None:
+                    child = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                    self.goto[node][character] = child
+                node = child
+            self.output[node] += (index,)
+
+        # Breadth-first, so every node's fail link is final before its children need it
+        queue = collections.deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for character, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and character not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(character, 0)
+                self.output[child] += self.output[self.fail[child]]
+
+    def matches(self, text):
+        """Yield (term index, start, end) for every occurrence, in order of end position"""
+        goto, fail, output, terms = self.goto, self.fail, self.output, self.terms
+        node = 0
+        for position, character in enumerate(text):
+            while node and character not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(character, 0)
+            for index in output[node]:
+                yield index, position + 1 - len(terms[index]), position + 1
+
+
+def normalize_term(term):
+    return ' '.join(term.casefold().split())
+
+
+def is_word_character(character):
+    # Used by both lanes, so plain and wildcard terms agree on what a word is
+    return character.isalnum() or character == '_'
+
+
+def is_word_boundary(text, start, end):
+    return ((start == 0 or not is_word_character(text[start - 1]))
+            and (end == len(text) or not is_word_character(text[end])))
+
+
+def split_runs(text, is_word):
+    """Split text into alternating (is word, run) pieces"""
+    return [(word, ''.join(run)) for word, run in itertools.groupby(text, is_word)]
+
+
+class WordGlob:
+    """Matches one whole word against a pattern where * is any letters and ? one letter.
+
+    The pattern is split on * into fixed-length pieces: the first must
+    start the word, the last must end it, and the ones between are found
+    left to right. Taking the leftmost match of each piece is always safe,
+    so nothing is retried and a check is linear in the word's length.
+    """
+
+    def __init__(self, pattern):
+        self.pieces = [(len(piece), re.compile(re.escape(piece).replace(r'\?', r'\w')))
+                       for piece in pattern.split('*')]
+
+    def matches(self, word):
+        if len(self.pieces) == 1:
+            return self.pieces[0][1].fullmatch(word) is not None
+        (first_length, first), *middle, (last_length, last) = self.pieces
+        start, end = first_length, len(word) - last_length
+        if end < start or not first.match(word) or not last.fullmatch(word, end):
+            return False
+        for _, piece in middle:
+            found = piece.search(word, start, end)
+            if found is None:
+                return False
+            start = found.end()
+        return True
+
+
+class WildcardTerm:
+    """A filter entry with * or ?, matched run by run against the text.
+
+    Wildcards only stand for word characters, so each word in the entry
+    lines up with exactly one word of the text, and the punctuation or
+    spaces between them must match literally.
+    """
+
+    def __init__(self, term):
+        self.term = term
+        is_word = lambda character: character in WILDCARDS or is_word_character(character)
+        self.runs = [(word, WordGlob(re.sub(r'\*+', '*', run)) if word else run)
+                     for word, run in split_runs(term, is_word)]
+
+    def find(self, runs):
+        """The matched text, given the message already split with split_runs"""
+        size = len(self.runs)
+        last = size - 1
+        for offset in range(len(runs) - size + 1):
+            for index, (word, matcher) in enumerate(self.runs):
+                text_word, text = runs[offset + index]
+                if word != text_word:
+                    break
+                if word:
+                    if not matcher.matches(text):
+                        break
+                elif size == 1:
+                    if matcher not in text:
+                        break
+                # Separators at the ends only need to touch the words next to them
+                elif index == 0:
+                    if not text.endswith(matcher):
+                        break
+                elif index == last:
+                    if not text.startswith(matcher):
+                        break
+                elif text != matcher:
+                    break
+            else:
+                matched = [runs[offset + index][1] if word else matcher
+                           for index, (word, matcher) in enumerate(self.runs)]
+                return ''.join(matched)
+        return None
+
+
+class WordFilter:
+    """A guild's banned terms, compiled once.
+
+    Plain terms go into an Aho–Corasick automaton and match whole words
+    only, so "ass" does not fire on "class". Entries with * or ? are
+    matched word by word (see WildcardTerm); they are never turned into a
+    backtracking regex, since an entry like *a*a*a*a could then take
+    seconds on a single message.
+    """
+
+    def __init__(self, terms):
+        terms = [normalize_term(term) for term in terms]
+        plain = [term for term in terms if term and not any(wildcard in term for wildcard in WILDCARDS)]
+        wild = [term for term in terms if term and any(wildcard in term for wildcard in WILDCARDS)]
+        self.size = len(plain) + len(wild)
+        self.automaton = AhoCorasick(plain) if plain else None
+        self.wildcards = [WildcardTerm(term) for term in wild]
+
+    def find(self, text):
+        """The first banned term (or wildcard match) in text, or None"""
+        text = normalize_term(text)  # Same folding as the terms, so extra spacing can't split one
+        if self.automaton is not None:
+            for index, start, end in self.automaton.matches(text):
+                if is_word_boundary(text, start, end):
+                    return self.automaton.terms[index]
+        if self.wildcards:
+            runs = split_runs(text, is_word_character)
+            for term in self.wildcards:
+                match = term.find(runs)
+                if match is not None:
+                    return match
+        return None